@@ -1,3 +1,38 @@
-from .engine import BattleEngine, CharacterFactory
+from .cache import ResultCache
+from .engine import BattleEngine
+from .estimation import PairedComparison, WinRateEstimate, wilson_interval
+from .factory import CharacterFactory, factory_name, spawn_fighter
+from .melee import Team, free_for_all
+from .metrics import MetricsCollector
+from .recording import BattleRecorder, BattleRecording
+from .rng import BlockRandom, derive_seed
+from .snapshot import BattleSnapshot
+from .solver import ExactSolver, solve_exact
+from .streaming import CsvSink, JsonlSink, SimulationProgress
+from .tracing import BattleSummary, BattleTracer
 
-__all__ = ["BattleEngine", "CharacterFactory"]
+__all__ = [
+    "BattleEngine",
+    "BattleRecorder",
+    "BattleRecording",
+    "BattleSnapshot",
+    "BattleSummary",
+    "BattleTracer",
+    "BlockRandom",
+    "CharacterFactory",
+    "CsvSink",
+    "ExactSolver",
+    "JsonlSink",
+    "MetricsCollector",
+    "PairedComparison",
+    "ResultCache",
+    "SimulationProgress",
+    "Team",
+    "WinRateEstimate",
+    "derive_seed",
+    "factory_name",
+    "free_for_all",
+    "solve_exact",
+    "spawn_fighter",
+    "wilson_interval",
+]
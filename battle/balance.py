@@ -0,0 +1,256 @@
+from __future__ import annotations
+
+import argparse
+import itertools
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import dataclass, field, fields
+from typing import Dict, List, Sequence, Tuple, Type
+
+from characters.base import Character, Stats
+
+from .engine import BattleEngine
+from .factory import CharacterFactory, factory_name
+from .parallel import CHUNKS_PER_WORKER, merge_counts, plan_chunks, resolve_workers, simulate_chunk, simulate_range
+
+STAT_FIELDS = tuple(item.name for item in fields(Stats))
+
+
+@dataclass(frozen=True)
+class StatOverride:
+    """在角色构造完成后改写 Stats 字段的 factory，可 pickle，供进程池使用。
+
+    values 直接设为给定值，scales 按倍数缩放（适合 __init__ 中已有加成的字段，如晨雪
+    生存强化后的 max_hp）。max_hp 变化时当前 HP 按同一比例调整，保持原有的开局血量比例。
+    """
+
+    cls: Type[Character]
+    values: Tuple[Tuple[str, float], ...] = ()
+    scales: Tuple[Tuple[str, float], ...] = ()
+
+    def __post_init__(self) -> None:
+        for key, _ in (*self.values, *self.scales):
+            if key not in STAT_FIELDS:
+                raise ValueError(f"未知的属性 {key}，可选：{', '.join(STAT_FIELDS)}")
+
+    @property
+    def name(self) -> str:
+        return self.cls.name
+
+    def __call__(self) -> Character:
+        fighter = self.cls()
+        stats = fighter.stats
+        old_max_hp = stats.max_hp
+        for key, value in self.values:
+            setattr(stats, key, float(value))
+        for key, factor in self.scales:
+            setattr(stats, key, getattr(stats, key) * factor)
+        if stats.max_hp != old_max_hp and old_max_hp > 0:
+            fighter.hp *= stats.max_hp / old_max_hp
+        return fighter
+
+
+@dataclass
+class BalancePoint:
+    parameters: Dict[str, float]
+    counts: Dict[str, int]
+    battles: int
+    win_rate: float
+
+
+@dataclass
+class BisectionResult:
+    field: str
+    value: float
+    win_rate: float
+    target: float
+    history: List[BalancePoint] = field(default_factory=list)
+
+
+def _override(cls: Type[Character], parameters: Dict[str, float], scale: bool) -> StatOverride:
+    items = tuple(sorted(parameters.items()))
+    return StatOverride(cls, scales=items) if scale else StatOverride(cls, values=items)
+
+
+def evaluate_points(
+    engine: BattleEngine,
+    factories: Sequence[CharacterFactory],
+    opponent: CharacterFactory,
+    battles: int,
+    *,
+    base_seed: int | None = None,
+    workers: int | None = None,
+    executor: Executor | None = None,
+) -> List[Tuple[Dict[str, int], float]]:
+    """让每个 factory 与 opponent 各进行 battles 场对局，返回 (胜负计数, factory 一方胜率)。
+
+    所有候选共用同一个基准种子（公共随机数），第 i 场对局在各候选下使用相同的种子，
+    相邻候选之间的差异主要来自属性本身而非抽样噪声。所有候选的分块共用一个进程池；
+    传入 executor 时复用该进程池。
+    """
+    if base_seed is None:
+        base_seed = engine.spawn_seed()
+    worker_count = resolve_workers(workers)
+    ranges = plan_chunks(0, battles, max(1, worker_count * CHUNKS_PER_WORKER // max(1, len(factories))))
+    counts: List[Dict[str, int]] = [{} for _ in factories]
+    if executor is None and worker_count <= 1:
+        for slot, factory in enumerate(factories):
+            for start, stop in ranges:
+                merge_counts(counts[slot], simulate_range(engine, factory, opponent, base_seed, start, stop))
+    elif executor is None:
+        with ProcessPoolExecutor(max_workers=worker_count) as pool:
+            return evaluate_points(engine, factories, opponent, battles, base_seed=base_seed, executor=pool)
+    else:
+        futures = [
+            (slot, executor.submit(simulate_chunk, engine, factory, opponent, base_seed, start, stop))
+            for slot, factory in enumerate(factories)
+            for start, stop in ranges
+        ]
+        for slot, future in futures:
+            future.result().merge_into(engine, counts[slot])
+    return [
+        (result, result.get(factory_name(factory), 0) / battles if battles else 0.0)
+        for factory, result in zip(factories, counts)
+    ]
+
+
+def grid_search(
+    engine: BattleEngine,
+    cls: Type[Character],
+    opponent: CharacterFactory,
+    grid: Dict[str, Sequence[float]],
+    *,
+    battles: int = 2_000,
+    scale: bool = False,
+    workers: int | None = None,
+) -> List[BalancePoint]:
+    """对 grid 中各字段取值的笛卡尔积逐点评估 cls 对 opponent 的胜率。
+
+    scale 为 True 时 grid 中的数值为相对默认属性的倍数。
+    """
+    keys = sorted(grid)
+    combos = [dict(zip(keys, values)) for values in itertools.product(*(grid[key] for key in keys))]
+    factories = [_override(cls, parameters, scale) for parameters in combos]
+    results = evaluate_points(engine, factories, opponent, battles, workers=workers)
+    return [
+        BalancePoint(parameters, counts, battles, win_rate)
+        for parameters, (counts, win_rate) in zip(combos, results)
+    ]
+
+
+def bisect_stat(
+    engine: BattleEngine,
+    cls: Type[Character],
+    opponent: CharacterFactory,
+    stat: str,
+    target: float,
+    low: float,
+    high: float,
+    *,
+    battles: int = 2_000,
+    scale: bool = False,
+    tolerance: float = 0.005,
+    resolution: float | None = None,
+    max_steps: int = 20,
+    workers: int | None = None,
+) -> BisectionResult:
+    """二分查找使 cls 对 opponent 胜率最接近 target 的 stat 取值。
+
+    假定胜率随 stat 大致单调（增减方向由两端点的胜率自动判断）。每一步都使用同一个
+    基准种子，胜率只随属性变化，不会因重新抽样而来回抖动。胜率与 target 相差不超过
+    tolerance，或区间宽度小于 resolution（默认为初始区间的千分之一）时停止。
+    伤害取整等离散效应会让胜率在阈值附近跳变，此时返回区间内最接近目标的取值。
+    """
+    base_seed = engine.spawn_seed()
+    if resolution is None:
+        resolution = abs(high - low) / 1000.0
+    history: List[BalancePoint] = []
+    worker_count = resolve_workers(workers)
+    pool = ProcessPoolExecutor(max_workers=worker_count) if worker_count > 1 else None
+
+    def evaluate(value: float) -> float:
+        parameters = {stat: value}
+        ((counts, win_rate),) = evaluate_points(
+            engine, [_override(cls, parameters, scale)], opponent, battles, base_seed=base_seed, executor=pool
+        )
+        history.append(BalancePoint(parameters, counts, battles, win_rate))
+        return win_rate
+
+    try:
+        rate_low = evaluate(low)
+        rate_high = evaluate(high)
+        increasing = rate_high >= rate_low
+        best_value, best_rate = min(((low, rate_low), (high, rate_high)), key=lambda item: abs(item[1] - target))
+        for _ in range(max_steps):
+            if abs(best_rate - target) <= tolerance or abs(high - low) <= resolution:
+                break
+            middle = (low + high) / 2.0
+            rate = evaluate(middle)
+            if abs(rate - target) < abs(best_rate - target):
+                best_value, best_rate = middle, rate
+            if (rate < target) == increasing:
+                low = middle
+            else:
+                high = middle
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    return BisectionResult(stat, best_value, best_rate, target, history)
+
+
+def _parse_grid(items: Sequence[str]) -> Dict[str, List[float]]:
+    grid: Dict[str, List[float]] = {}
+    for item in items:
+        key, _, values = item.partition("=")
+        grid[key] = [float(value) for value in values.split(",") if value]
+    return grid
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    from characters.registry import REGISTRY
+
+    names = sorted(REGISTRY.keys())
+    parser = argparse.ArgumentParser(description="搜索使胜率达到目标的属性取值")
+    parser.add_argument("character", choices=names)
+    parser.add_argument("opponent", choices=names)
+    parser.add_argument("--grid", nargs="+", metavar="FIELD=V1,V2", help="网格搜索，如 attack=20,22,24")
+    parser.add_argument("--field", choices=STAT_FIELDS, help="二分查找的属性")
+    parser.add_argument("--low", type=float)
+    parser.add_argument("--high", type=float)
+    parser.add_argument("--target", type=float, default=0.5, help="目标胜率")
+    parser.add_argument("--scale", action="store_true", help="取值为相对默认属性的倍数")
+    parser.add_argument("--battles", type=int, default=2_000, help="每个取值的对局数")
+    parser.add_argument("--max-rounds", type=int, default=150)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--workers", type=int, default=None, help="进程数，默认使用全部 CPU 核心")
+    args = parser.parse_args(argv)
+
+    engine = BattleEngine(max_rounds=args.max_rounds, seed=args.seed)
+    cls, opponent = REGISTRY.load(args.character), REGISTRY.load(args.opponent)
+    if args.grid:
+        points = grid_search(
+            engine, cls, opponent, _parse_grid(args.grid), battles=args.battles, scale=args.scale, workers=args.workers
+        )
+        for point in points:
+            print(f"{point.parameters} 胜率 {point.win_rate:.2%}")
+        return
+    if args.field is None or args.low is None or args.high is None:
+        parser.error("需要 --grid，或同时给出 --field、--low 与 --high")
+    result = bisect_stat(
+        engine,
+        cls,
+        opponent,
+        args.field,
+        args.target,
+        args.low,
+        args.high,
+        battles=args.battles,
+        scale=args.scale,
+        workers=args.workers,
+    )
+    for point in result.history:
+        print(f"{args.field}={point.parameters[args.field]:.4g} 胜率 {point.win_rate:.2%}")
+    print(f"结果：{cls.name} {args.field}={result.value:.4g}，胜率 {result.win_rate:.2%}（目标 {args.target:.2%}）")
+
+
+if __name__ == "__main__":
+    main()
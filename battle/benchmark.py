@@ -0,0 +1,313 @@
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from typing import Callable, Dict, List, Sequence, Tuple, Type
+
+from characters.base import Character
+
+from .engine import BattleEngine
+from .metrics import MetricsCollector
+from .parallel import resolve_workers
+from .rng import BlockRandomSource
+from .tournament import discover_roster
+
+Matchup = Tuple[Type[Character], Type[Character]]
+
+DEFAULT_THRESHOLD = 0.10
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+COLD_START_SNIPPET = (
+    "from battle import BattleEngine\n"
+    "from characters import Bronya, Kiana\n"
+    "BattleEngine(max_rounds=150, seed=0).simulate(Bronya, Kiana, 1)\n"
+)
+
+
+@dataclass
+class BenchmarkResult:
+    """一项基准测试的结果，seconds 为多次重复中的最短耗时。"""
+
+    case: str
+    matchup: str
+    battles: int
+    seconds: float
+    turns: int
+    peak_kib: float | None = None
+
+    @property
+    def key(self) -> str:
+        return f"{self.case}:{self.matchup}"
+
+    @property
+    def battles_per_sec(self) -> float:
+        return self.battles / self.seconds if self.seconds > 0 else 0.0
+
+    @property
+    def turns_per_sec(self) -> float:
+        return self.turns / self.seconds if self.seconds > 0 else 0.0
+
+    def to_dict(self) -> Dict[str, object]:
+        data = asdict(self)
+        data["battles_per_sec"] = self.battles_per_sec
+        data["turns_per_sec"] = self.turns_per_sec
+        return data
+
+
+def _best_of(repeat: int, run: Callable[[], None]) -> float:
+    best = float("inf")
+    for _ in range(max(1, repeat)):
+        started = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def _peak_kib(run: Callable[[], None]) -> float:
+    tracemalloc.start()
+    try:
+        run()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak / 1024.0
+
+
+def _count_turns(max_rounds: int, seed: int, run: Callable[[BattleEngine], None]) -> int:
+    engine = BattleEngine(max_rounds=max_rounds, seed=seed)
+    run(engine)
+    return engine.turns_played
+
+
+def bench_matchup(
+    cls_a: Type[Character],
+    cls_b: Type[Character],
+    *,
+    battles: int,
+    max_rounds: int,
+    workers: int,
+    repeat: int,
+    seed: int = 0,
+) -> List[BenchmarkResult]:
+    """对一组对局测量逐场 fight、verbose fight、串行与并行 simulate。
+
+    每个用例都使用固定 seed 的新引擎，因此各次重复以及串行/并行模式执行的是同一批对局，
+    行动次数只需统计一次。峰值内存在单独的 tracemalloc 轮次中测量，避免拖慢计时。
+    """
+    label = f"{cls_a.name} vs {cls_b.name}"
+    verbose_battles = max(1, battles // 20)
+    memory_battles = min(battles, 500)
+
+    def fight_loop(count: int, verbose: bool = False) -> Callable[[BattleEngine], None]:
+        def run(engine: BattleEngine) -> None:
+            for _ in range(count):
+                engine.fight(cls_a, cls_b, verbose=verbose)
+
+        return run
+
+    def quiet(run: Callable[[BattleEngine], None]) -> Callable[[BattleEngine], None]:
+        def wrapped(engine: BattleEngine) -> None:
+            with contextlib.redirect_stdout(io.StringIO()):
+                run(engine)
+
+        return wrapped
+
+    def simulate(count: int, worker_count: int) -> Callable[[BattleEngine], None]:
+        def run(engine: BattleEngine) -> None:
+            engine.simulate(cls_a, cls_b, count, workers=worker_count)
+
+        return run
+
+    def metered(count: int) -> Callable[[BattleEngine], None]:
+        def run(engine: BattleEngine) -> None:
+            engine.metrics = MetricsCollector()
+            engine.simulate(cls_a, cls_b, count, workers=1)
+
+        return run
+
+    def block_rng(count: int) -> Callable[[BattleEngine], None]:
+        def run(engine: BattleEngine) -> None:
+            engine.random_source = BlockRandomSource()
+            engine.simulate(cls_a, cls_b, count, workers=1)
+
+        return run
+
+    def generic(count: int) -> Callable[[BattleEngine], None]:
+        def run(engine: BattleEngine) -> None:
+            engine.specialize = False
+            engine.simulate(cls_a, cls_b, count, workers=1)
+
+        return run
+
+    # (用例名, 对局数, 按对局数生成运行函数, 是否在当前进程内执行)
+    cases: List[Tuple[str, int, Callable[[int], Callable[[BattleEngine], None]], bool]] = [
+        ("fight", battles, fight_loop, True),
+        ("fight-verbose", verbose_battles, lambda count: quiet(fight_loop(count, verbose=True)), True),
+        ("simulate", battles, lambda count: simulate(count, 1), True),
+        ("simulate-metrics", battles, metered, True),
+        ("simulate-block-rng", battles, block_rng, True),
+        ("simulate-generic", battles, generic, True),
+    ]
+    if workers > 1:
+        cases.append((f"simulate-x{workers}", battles, lambda count: simulate(count, workers), False))
+
+    results: List[BenchmarkResult] = []
+    serial_turns: Dict[int, int] = {}
+    for case, count, build, in_process in cases:
+        run = build(count)
+        seconds = _best_of(repeat, lambda: run(BattleEngine(max_rounds=max_rounds, seed=seed)))
+        if in_process:
+            turns = _count_turns(max_rounds, seed, run)
+            serial_turns.setdefault(count, turns)
+            memory_run = build(min(count, memory_battles))
+            peak = _peak_kib(lambda: memory_run(BattleEngine(max_rounds=max_rounds, seed=seed)))
+        else:
+            # 并行模式与串行 simulate 执行同一批对局，直接沿用其行动次数
+            turns = serial_turns.get(count, 0)
+            peak = None
+        results.append(BenchmarkResult(case, label, count, seconds, turns, peak))
+    return results
+
+
+def bench_cold_start(repeat: int) -> BenchmarkResult:
+    """启动新解释器、导入并完成一场对局的耗时。"""
+    seconds = _best_of(
+        repeat,
+        lambda: subprocess.run([sys.executable, "-c", COLD_START_SNIPPET], check=True, cwd=_PROJECT_ROOT),
+    )
+    return BenchmarkResult("cold-start", "-", 1, seconds, 0)
+
+
+def run_benchmarks(
+    matchups: Sequence[Matchup],
+    *,
+    battles: int = 1_000,
+    max_rounds: int = 150,
+    workers: int | None = None,
+    repeat: int = 3,
+    report: Callable[[BenchmarkResult], None] | None = None,
+) -> List[BenchmarkResult]:
+    worker_count = resolve_workers(workers)
+    results = [bench_cold_start(repeat)]
+    if report:
+        report(results[0])
+    for cls_a, cls_b in matchups:
+        for result in bench_matchup(
+            cls_a, cls_b, battles=battles, max_rounds=max_rounds, workers=worker_count, repeat=repeat
+        ):
+            results.append(result)
+            if report:
+                report(result)
+    return results
+
+
+def save_baseline(path: str, results: Sequence[BenchmarkResult]) -> None:
+    payload = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": [result.to_dict() for result in results],
+    }
+    with open(path, "w", encoding="utf-8") as handle:
+        json.dump(payload, handle, ensure_ascii=False, indent=2)
+
+
+def load_baseline(path: str) -> Dict[str, BenchmarkResult]:
+    with open(path, encoding="utf-8") as handle:
+        payload = json.load(handle)
+    baseline: Dict[str, BenchmarkResult] = {}
+    for item in payload.get("results", []):
+        result = BenchmarkResult(
+            case=item["case"],
+            matchup=item["matchup"],
+            battles=item["battles"],
+            seconds=item["seconds"],
+            turns=item["turns"],
+            peak_kib=item.get("peak_kib"),
+        )
+        baseline[result.key] = result
+    return baseline
+
+
+def find_regressions(
+    results: Sequence[BenchmarkResult],
+    baseline: Dict[str, BenchmarkResult],
+    threshold: float = DEFAULT_THRESHOLD,
+) -> List[str]:
+    """与基线相比单位耗时变慢超过 threshold（比例）的用例。"""
+    regressions: List[str] = []
+    for result in results:
+        previous = baseline.get(result.key)
+        if previous is None or previous.battles <= 0 or result.battles <= 0:
+            continue
+        before = previous.seconds / previous.battles
+        after = result.seconds / result.battles
+        if before > 0 and after > before * (1.0 + threshold):
+            regressions.append(
+                f"{result.key}: 每场 {before * 1e6:.1f}us -> {after * 1e6:.1f}us (+{after / before - 1.0:.1%})"
+            )
+    return regressions
+
+
+def format_result(result: BenchmarkResult) -> str:
+    if result.case == "cold-start":
+        return f"{result.case:<16} {result.seconds * 1000:.0f} ms"
+    peak = "-" if result.peak_kib is None else f"{result.peak_kib:.0f} KiB"
+    return (
+        f"{result.case:<16} {result.matchup:<20} battles/s {result.battles_per_sec:>10.0f}  "
+        f"turns/s {result.turns_per_sec:>10.0f}  peak {peak}"
+    )
+
+
+def _select_matchups(roster: Sequence[Type[Character]], names: Sequence[str] | None) -> List[Matchup]:
+    pairs = [(a, b) for index, a in enumerate(roster) for b in roster[index + 1:]]
+    if not names:
+        return pairs
+    wanted = set(names)
+    return [(a, b) for a, b in pairs if a.__name__ in wanted and b.__name__ in wanted]
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="模拟器性能基准测试")
+    parser.add_argument("--battles", type=int, default=1_000, help="每个用例的对局数")
+    parser.add_argument("--max-rounds", type=int, default=150)
+    parser.add_argument("--workers", type=int, default=None, help="并行用例的进程数，默认全部核心")
+    parser.add_argument("--repeat", type=int, default=3, help="每个用例重复次数，取最短耗时")
+    parser.add_argument("--only", nargs="*", metavar="CLASS", help="只测试这些角色类之间的对局")
+    parser.add_argument("--save", metavar="PATH", help="把结果写入 JSON 基线")
+    parser.add_argument("--compare", metavar="PATH", help="与已有 JSON 基线比较")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="判定为退化的变慢比例")
+    args = parser.parse_args(argv)
+
+    matchups = _select_matchups(discover_roster(), args.only)
+    results = run_benchmarks(
+        matchups,
+        battles=args.battles,
+        max_rounds=args.max_rounds,
+        workers=args.workers,
+        repeat=args.repeat,
+        report=lambda result: print(format_result(result), flush=True),
+    )
+    if args.save:
+        save_baseline(args.save, results)
+    if args.compare:
+        regressions = find_regressions(results, load_baseline(args.compare), args.threshold)
+        print("-" * 40)
+        if regressions:
+            print("性能退化：")
+            for line in regressions:
+                print(f"  {line}")
+            return 1
+        print("未发现超过阈值的性能退化")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
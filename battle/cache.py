@@ -0,0 +1,221 @@
+from __future__ import annotations
+
+import hashlib
+import inspect
+import sqlite3
+import sys
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Tuple, Type
+
+from characters.base import Character
+
+from .engine import BattleEngine
+from .parallel import CHUNKS_PER_WORKER, derive_seed, plan_chunks, resolve_workers, run_chunks
+
+DEFAULT_CACHE_PATH = ".bh3_results.sqlite"
+# 这些模块的改动会影响所有对局结果，其源码计入引擎指纹。
+ENGINE_MODULES = (
+    "battle.engine",
+    "battle.parallel",
+    "battle.rng",
+    "battle.specialize",
+    "characters.base",
+    "characters.effects",
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    fp_first TEXT NOT NULL,
+    fp_second TEXT NOT NULL,
+    engine_fp TEXT NOT NULL,
+    max_rounds INTEGER NOT NULL,
+    seed TEXT,
+    base_seed TEXT NOT NULL,
+    battles INTEGER NOT NULL,
+    wins_first INTEGER NOT NULL,
+    wins_second INTEGER NOT NULL,
+    draws INTEGER NOT NULL
+);
+CREATE UNIQUE INDEX IF NOT EXISTS runs_seeded ON runs (fp_first, fp_second, engine_fp, max_rounds, seed)
+    WHERE seed IS NOT NULL;
+CREATE INDEX IF NOT EXISTS runs_matchup ON runs (fp_first, fp_second, engine_fp, max_rounds);
+"""
+
+
+@lru_cache(maxsize=None)
+def class_fingerprint(cls: Type[Character]) -> str:
+    """角色类及其所有 Character 父类源码的哈希，任一方法改动都会得到新的指纹。"""
+    digest = hashlib.sha256()
+    for klass in cls.__mro__:
+        if not (isinstance(klass, type) and issubclass(klass, Character)):
+            continue
+        digest.update(klass.__qualname__.encode())
+        generated = vars(klass).get("spec_hash")
+        if generated:
+            # 由规格编译出的类，规格哈希已包含编译器源码
+            digest.update(generated.encode())
+            continue
+        try:
+            digest.update(inspect.getsource(klass).encode())
+        except (OSError, TypeError):
+            # 动态生成的类没有源码，退化为按限定名区分。
+            digest.update(klass.__module__.encode())
+    return digest.hexdigest()
+
+
+@lru_cache(maxsize=None)
+def engine_fingerprint() -> str:
+    digest = hashlib.sha256()
+    for name in ENGINE_MODULES:
+        digest.update(inspect.getsource(sys.modules[name]).encode())
+    return digest.hexdigest()
+
+
+@dataclass(frozen=True)
+class PendingRun:
+    """某组对局尚需补跑的编号区间，seeded 表示结果要合并进固定种子的那一行。"""
+
+    first: Type[Character]
+    second: Type[Character]
+    base_seed: int
+    start: int
+    stop: int
+    seeded: bool
+
+
+class ResultCache:
+    """按角色源码与引擎配置缓存胜负计数的 SQLite 结果库。
+
+    键为双方的 class_fingerprint、引擎源码指纹、max_rounds 与引擎 seed。固定 seed 时
+    每组对局只有一行，请求更多场次只会补跑新增的编号；不固定 seed 时每次补跑都以新的
+    基准种子追加一行，查询时合并所有行，样本量随使用不断增长。A/B 与 B/A 共用同一条记录。
+    """
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH) -> None:
+        self.path = path
+        self._conn = sqlite3.connect(path)
+        self._conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __enter__(self) -> "ResultCache":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def lookup(self, engine: BattleEngine, cls_a: Type[Character], cls_b: Type[Character]) -> Dict[str, int] | None:
+        """返回已缓存的全部胜负计数，没有记录时返回 None。"""
+        first, second = _canonical(cls_a, cls_b)
+        row = self._conn.execute(
+            "SELECT SUM(battles), SUM(wins_first), SUM(wins_second), SUM(draws) FROM runs "
+            "WHERE fp_first = ? AND fp_second = ? AND engine_fp = ? AND max_rounds = ? AND seed IS ?",
+            (*self._matchup_key(engine, first, second), _seed_text(engine.seed)),
+        ).fetchone()
+        if not row or not row[0]:
+            return None
+        _, wins_first, wins_second, draws = row
+        return {first.name: wins_first, second.name: wins_second, "draw": draws}
+
+    def pending(
+        self,
+        engine: BattleEngine,
+        cls_a: Type[Character],
+        cls_b: Type[Character],
+        battles: int,
+        *,
+        accumulate: bool = False,
+    ) -> PendingRun | None:
+        """计算为满足 battles 场样本还需运行的对局；缓存已足够时返回 None。
+
+        accumulate 为 True 时（仅对未固定 seed 的引擎有意义）总是追加 battles 场新样本。
+        """
+        first, second = _canonical(cls_a, cls_b)
+        cached = self.lookup(engine, first, second)
+        done = sum(cached.values()) if cached else 0
+        if engine.seed is not None:
+            if done >= battles:
+                return None
+            pair = f"{class_fingerprint(first)}:{class_fingerprint(second)}".encode()
+            token = int(hashlib.sha256(pair).hexdigest()[:16], 16)
+            return PendingRun(first, second, derive_seed(int(engine.seed), token), done, battles, True)
+        missing = battles if accumulate else battles - done
+        if missing <= 0:
+            return None
+        return PendingRun(first, second, engine.spawn_seed(), 0, missing, False)
+
+    def store(self, engine: BattleEngine, run: PendingRun, counts: Dict[str, int]) -> None:
+        """把 pending 对应的运行结果合并进缓存。"""
+        key = self._matchup_key(engine, run.first, run.second)
+        values = (
+            run.stop - run.start,
+            counts.get(run.first.name, 0),
+            counts.get(run.second.name, 0),
+            counts.get("draw", 0),
+        )
+        with self._conn:
+            if run.seeded:
+                self._conn.execute(
+                    "INSERT INTO runs VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT (fp_first, fp_second, engine_fp, max_rounds, seed) WHERE seed IS NOT NULL "
+                    "DO UPDATE SET "
+                    "battles = battles + excluded.battles, wins_first = wins_first + excluded.wins_first, "
+                    "wins_second = wins_second + excluded.wins_second, draws = draws + excluded.draws",
+                    (*key, _seed_text(engine.seed), str(run.base_seed), *values),
+                )
+            else:
+                self._conn.execute(
+                    "INSERT INTO runs VALUES (?, ?, ?, ?, NULL, ?, ?, ?, ?, ?)",
+                    (*key, str(run.base_seed), *values),
+                )
+
+    def simulate(
+        self,
+        engine: BattleEngine,
+        cls_a: Type[Character],
+        cls_b: Type[Character],
+        battles: int,
+        *,
+        workers: int | None = 1,
+        accumulate: bool = False,
+    ) -> Dict[str, int]:
+        """与 BattleEngine.simulate 相同的返回格式，只补跑缓存中缺少的对局。"""
+        run = self.pending(engine, cls_a, cls_b, battles, accumulate=accumulate)
+        if run is not None:
+            worker_count = resolve_workers(workers)
+            ranges = plan_chunks(run.start, run.stop, worker_count * CHUNKS_PER_WORKER)
+            counts = run_chunks(engine, run.first, run.second, run.base_seed, ranges, worker_count)
+            self.store(engine, run, counts)
+        return self.lookup(engine, cls_a, cls_b) or {cls_a.name: 0, cls_b.name: 0, "draw": 0}
+
+    def invalidate(self, cls: Type[Character]) -> int:
+        """删除与 cls 当前源码相关的所有记录，返回删除的行数。"""
+        fingerprint = class_fingerprint(cls)
+        with self._conn:
+            cursor = self._conn.execute(
+                "DELETE FROM runs WHERE fp_first = ? OR fp_second = ?", (fingerprint, fingerprint)
+            )
+        return cursor.rowcount
+
+    @staticmethod
+    def _matchup_key(
+        engine: BattleEngine, first: Type[Character], second: Type[Character]
+    ) -> Tuple[str, str, str, int]:
+        engine_fp = engine_fingerprint()
+        if engine.random_source.name != "mt":
+            # 不同随机源的同一种子对应不同的对局，不能共用缓存
+            engine_fp = f"{engine_fp}:{engine.random_source.name}"
+        return class_fingerprint(first), class_fingerprint(second), engine_fp, engine.max_rounds
+
+
+def _canonical(cls_a: Type[Character], cls_b: Type[Character]) -> Tuple[Type[Character], Type[Character]]:
+    """A/B 与 B/A 的胜负分布对称，统一按指纹排序后存储。"""
+    if (class_fingerprint(cls_a), cls_a.name) <= (class_fingerprint(cls_b), cls_b.name):
+        return cls_a, cls_b
+    return cls_b, cls_a
+
+
+def _seed_text(seed: int | None) -> str | None:
+    return None if seed is None else str(seed)
@@ -0,0 +1,231 @@
+from __future__ import annotations
+
+import argparse
+import random
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Sequence
+
+from .estimation import PairedComparison, paired_interval
+from .factory import CharacterFactory, factory_name, spawn_fighter
+from .parallel import CHUNKS_PER_WORKER, derive_seed, plan_chunks, resolve_workers
+
+if TYPE_CHECKING:
+    from .engine import BattleEngine
+    from .metrics import MetricsCollector
+    from .profiling import SkillProfiler
+
+
+class AntitheticRandom(random.Random):
+    """与同种子的 random.Random 互为对偶的随机流：random() 取 1 - u，randint 取区间内的镜像值。"""
+
+    def random(self) -> float:
+        return 1.0 - super().random()
+
+    def getrandbits(self, k: int) -> int:
+        # 在子类中声明 getrandbits，使 randrange 仍按位生成整数，而不是改走上面的 random()
+        return super().getrandbits(k)
+
+    def randint(self, a: int, b: int) -> int:
+        return a + b - super().randint(a, b)
+
+
+@dataclass
+class PairedTally:
+    """配对差值的充分统计量，各分块相加即可合并。
+
+    进程池中的分块另外带回本分块的指标与性能分析（见 compare_chunk），由 merge_into 并入引擎。
+    """
+
+    pairs: int = 0
+    wins_a: float = 0.0
+    wins_b: float = 0.0
+    total: float = 0.0
+    total_sq: float = 0.0
+    metrics: "MetricsCollector | None" = None
+    profiler: "SkillProfiler | None" = None
+
+    def merge(self, other: "PairedTally") -> "PairedTally":
+        self.pairs += other.pairs
+        self.wins_a += other.wins_a
+        self.wins_b += other.wins_b
+        self.total += other.total
+        self.total_sq += other.total_sq
+        return self
+
+    def merge_into(self, engine: "BattleEngine", tally: "PairedTally") -> None:
+        """把统计量并入 tally，指标与性能分析并入 engine 自身挂载的收集器。"""
+        tally.merge(self)
+        if self.metrics is not None and engine.metrics is not None:
+            engine.metrics.merge(self.metrics)
+        if self.profiler is not None and engine.profiler is not None:
+            engine.profiler.merge(self.profiler)
+
+
+def compare_range(
+    engine: "BattleEngine",
+    variant_a: CharacterFactory,
+    variant_b: CharacterFactory,
+    opponent: CharacterFactory,
+    base_seed: int,
+    start: int,
+    stop: int,
+    antithetic: bool = False,
+    metrics: "MetricsCollector | None" = None,
+    profiler: "SkillProfiler | None" = None,
+) -> PairedTally:
+    """对编号 [start, stop) 的每个种子，让两个变体分别与 opponent 对战并累计胜负差。
+
+    antithetic 为 True 时每个种子再用对偶随机流各打一场，配对差值取两者平均。
+    metrics、profiler 为 None 时记入 engine 自身挂载的收集器与分析器（若有）。
+    """
+    fighter_a = spawn_fighter(variant_a)
+    fighter_b = spawn_fighter(variant_b)
+    rival = spawn_fighter(opponent)
+    name_a, name_b = fighter_a.name, fighter_b.name
+    streams: Sequence[random.Random] = (random.Random(), AntitheticRandom()) if antithetic else (random.Random(),)
+    tally = PairedTally()
+    for index in range(start, stop):
+        seed = derive_seed(base_seed, index)
+        won_a = won_b = 0
+        for stream in streams:
+            fighter_a.reset()
+            rival.reset()
+            stream.seed(seed)
+            won_a += engine.run_battle(fighter_a, rival, stream, metrics=metrics, profiler=profiler) == name_a
+            fighter_b.reset()
+            rival.reset()
+            stream.seed(seed)
+            won_b += engine.run_battle(fighter_b, rival, stream, metrics=metrics, profiler=profiler) == name_b
+        count = len(streams)
+        diff = (won_a - won_b) / count
+        tally.pairs += 1
+        tally.wins_a += won_a / count
+        tally.wins_b += won_b / count
+        tally.total += diff
+        tally.total_sq += diff * diff
+    return tally
+
+
+def compare_chunk(
+    engine: "BattleEngine",
+    variant_a: CharacterFactory,
+    variant_b: CharacterFactory,
+    opponent: CharacterFactory,
+    base_seed: int,
+    start: int,
+    stop: int,
+    antithetic: bool = False,
+) -> PairedTally:
+    """进程池中执行的分块：指标与性能分析记入新的空收集器，随统计量一起返回，由主进程合并。"""
+    metrics = engine.metrics.spawn() if engine.metrics is not None else None
+    profiler = engine.profiler.spawn() if engine.profiler is not None else None
+    tally = compare_range(
+        engine, variant_a, variant_b, opponent, base_seed, start, stop, antithetic, metrics, profiler
+    )
+    tally.metrics = metrics
+    tally.profiler = profiler
+    return tally
+
+
+def compare_variants(
+    engine: "BattleEngine",
+    variant_a: CharacterFactory,
+    variant_b: CharacterFactory,
+    opponent: CharacterFactory,
+    pairs: int,
+    *,
+    antithetic: bool = False,
+    confidence: float = 0.95,
+    workers: int | None = 1,
+) -> PairedComparison:
+    worker_count = resolve_workers(workers)
+    base_seed = engine.spawn_seed()
+    ranges = plan_chunks(0, pairs, worker_count * CHUNKS_PER_WORKER)
+    tally = PairedTally()
+    if worker_count <= 1 or len(ranges) <= 1:
+        for start, stop in ranges:
+            tally.merge(compare_range(engine, variant_a, variant_b, opponent, base_seed, start, stop, antithetic))
+    else:
+        with ProcessPoolExecutor(max_workers=worker_count) as pool:
+            futures = [
+                pool.submit(compare_chunk, engine, variant_a, variant_b, opponent, base_seed, start, stop, antithetic)
+                for start, stop in ranges
+            ]
+            for future in futures:
+                future.result().merge_into(engine, tally)
+
+    difference, lower, upper = paired_interval(tally.total, tally.total_sq, tally.pairs, confidence)
+    rate_a = tally.wins_a / tally.pairs if tally.pairs else 0.0
+    rate_b = tally.wins_b / tally.pairs if tally.pairs else 0.0
+    paired_variance = (
+        (tally.total_sq - tally.pairs * difference * difference) / (tally.pairs - 1) if tally.pairs > 1 else 0.0
+    )
+    # 每对按各自场数计的独立伯努利方差；对偶模式下每个变体每对打两场
+    battles_per_pair = 2 if antithetic else 1
+    independent_variance = (rate_a * (1 - rate_a) + rate_b * (1 - rate_b)) / battles_per_pair
+    ratio = independent_variance / paired_variance if paired_variance > 0 else float("inf")
+    return PairedComparison(
+        name_a=factory_name(variant_a),
+        name_b=factory_name(variant_b),
+        opponent=factory_name(opponent),
+        pairs=tally.pairs,
+        battles=tally.pairs * battles_per_pair * 2,
+        antithetic=antithetic,
+        win_rate_a=rate_a,
+        win_rate_b=rate_b,
+        difference=difference,
+        lower=lower,
+        upper=upper,
+        confidence=confidence,
+        variance_ratio=ratio,
+    )
+
+
+def format_comparison(result: PairedComparison) -> str:
+    verdict = "差异显著" if result.significant else "差异不显著"
+    return "\n".join(
+        [
+            f"{result.name_a} vs {result.name_b}（对手 {result.opponent}，{result.pairs} 组配对，共 {result.battles} 场"
+            f"{'，对偶抽样' if result.antithetic else ''}）",
+            f"{result.name_a} 胜率 {result.win_rate_a:.2%}，{result.name_b} 胜率 {result.win_rate_b:.2%}",
+            f"胜率差 {result.difference:+.2%}，{result.confidence:.0%} 置信区间 "
+            f"[{result.lower:+.2%}, {result.upper:+.2%}]，{verdict}",
+            f"方差缩减倍数（相对独立抽样）：{result.variance_ratio:.1f}",
+        ]
+    )
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    from .engine import BattleEngine
+    from characters.registry import REGISTRY
+
+    names = sorted(REGISTRY.keys())
+    parser = argparse.ArgumentParser(description="公共随机数下比较两个角色变体对同一对手的胜率")
+    parser.add_argument("variant_a", choices=names)
+    parser.add_argument("variant_b", choices=names)
+    parser.add_argument("opponent", choices=names)
+    parser.add_argument("--pairs", type=int, default=2_000, help="配对数（每对使用同一个种子）")
+    parser.add_argument("--antithetic", action="store_true", help="每个种子再用对偶随机流各打一场")
+    parser.add_argument("--confidence", type=float, default=0.95)
+    parser.add_argument("--max-rounds", type=int, default=150)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--workers", type=int, default=None, help="进程数，默认使用全部 CPU 核心")
+    args = parser.parse_args(argv)
+
+    engine = BattleEngine(max_rounds=args.max_rounds, seed=args.seed)
+    result = compare_variants(
+        engine,
+        REGISTRY.load(args.variant_a),
+        REGISTRY.load(args.variant_b),
+        REGISTRY.load(args.opponent),
+        args.pairs,
+        antithetic=args.antithetic,
+        confidence=args.confidence,
+        workers=args.workers,
+    )
+    print(format_comparison(result))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,17 +1,60 @@
 from __future__ import annotations
 
+import os
 import random
-from typing import Callable, Dict, List, Tuple
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from typing import TYPE_CHECKING, Dict, Iterator, List, Sequence, TextIO, Tuple
 
 from characters.base import BattleContext, Character
 
-CharacterFactory = Callable[[], Character]
+from .estimation import PairedComparison, WinRateEstimate, wilson_interval
+from .factory import CharacterFactory, factory_name, spawn_fighter
+from .metrics import MetricsCollector
+from .parallel import CHUNKS_PER_WORKER, plan_chunks, resolve_workers, run_chunks
+from .recording import BattleRecorder
+from .rng import RandomSource, RandomStream, make_source
+from .streaming import RecordFileSink, SimulationProgress, StreamCheckpoint
+from .tracing import BattleTracer, SummarySink
+from .solver import solve_exact
+from .specialize import matchup_loop
+
+if TYPE_CHECKING:
+    from .melee import Team
+    from .profiling import SkillProfiler
+    from .snapshot import BattleSnapshot, SnapshotCondition
 
 
 class BattleEngine:
-    def __init__(self, max_rounds: int = 200, seed: int | None = None) -> None:
+    def __init__(
+        self,
+        max_rounds: int = 200,
+        seed: int | None = None,
+        *,
+        metrics: MetricsCollector | None = None,
+        profiler: SkillProfiler | None = None,
+        rng: str | RandomSource = "mt",
+        specialize: bool = True,
+    ) -> None:
         self.max_rounds = max_rounds
+        self.seed = seed
         self._rng = random.Random(seed)
+        # fight 与 simulate 的所有对局都会汇总到这里；为 None 时不收集
+        self.metrics = metrics
+        # 挂载后每场对局期间开启 sys.setprofile，按角色与技能统计耗时
+        self.profiler = profiler
+        # 本引擎实例（当前进程内）累计执行的行动次数，供基准测试统计 turns/sec
+        self.turns_played = 0
+        # 最近一场对局进行到的回合数
+        self.last_rounds = 0
+        # 每局对局的随机流来源："mt" 为标准库 Mersenne Twister，"block" 为预取的计数器式随机流
+        self.random_source = make_source(rng)
+        # 静默对局使用按角色类生成的专用主循环（见 battle.specialize），结果与通用路径一致
+        self.specialize = specialize
+
+    def spawn_seed(self) -> int:
+        """从引擎的随机流中取出一个新的 64 位基准种子，供一批对局派生各自的种子。"""
+        return self._rng.getrandbits(64)
 
     def fight(
         self,
@@ -19,26 +62,105 @@ class BattleEngine:
         factory_b: CharacterFactory,
         *,
         verbose: bool = False,
+        seed: int | None = None,
+        out: TextIO | None = None,
+    ) -> str:
+        source = self.random_source
+        if seed is not None:
+            rng = source.new(seed)
+        elif source.name == RandomSource.name:
+            rng = self._rng
+        else:
+            rng = source.new(self.spawn_seed())
+        return self.run_battle(factory_a(), factory_b(), rng, verbose=verbose, out=out)
+
+    def replay(
+        self,
+        factory_a: CharacterFactory,
+        factory_b: CharacterFactory,
+        seed: int,
+        *,
+        verbose: bool = True,
+        out: TextIO | None = None,
+    ) -> str:
+        """以相同的 max_rounds 与随机源重放种子为 seed 的一局，不计入本引擎的指标与行动数。"""
+        engine = BattleEngine(self.max_rounds, rng=self.random_source, specialize=self.specialize)
+        result = engine.run_battle(
+            spawn_fighter(factory_a), spawn_fighter(factory_b), self.random_source.new(seed), verbose=verbose, out=out
+        )
+        self.last_rounds = engine.last_rounds
+        return result
+
+    def run_battle(
+        self,
+        fighter_a: Character,
+        fighter_b: Character,
+        rng: RandomStream,
+        *,
+        verbose: bool = False,
+        out: TextIO | None = None,
+        metrics: MetricsCollector | None = None,
+        profiler: SkillProfiler | None = None,
     ) -> str:
-        fighter_a = factory_a()
-        fighter_b = factory_b()
-        context = BattleContext(self._rng)
+        """在给定的角色实例上进行一场对局，调用方负责提供初始状态的角色（如先调用 reset）。
+
+        verbose 时逐回合日志写入 out，默认为标准输出。
+        metrics、profiler 为 None 时使用引擎自身挂载的收集器与分析器。
+        """
+        if not verbose:
+            out = None
+        elif out is None:
+            out = sys.stdout
+        if metrics is None:
+            metrics = self.metrics
+        if profiler is None:
+            profiler = self.profiler
+        context = BattleContext(rng)
         context.set_logging(verbose)
+        context.metrics = metrics
+        if profiler is None:
+            play = None
+            if self.specialize and out is None and metrics is None:
+                play = matchup_loop(type(fighter_a), type(fighter_b))
+            if play is not None:
+                outcome = play(fighter_a, fighter_b, context, rng, self.max_rounds)
+            else:
+                outcome = self._play(fighter_a, fighter_b, context, rng, out)
+        else:
+            with profiler:
+                outcome = self._play(fighter_a, fighter_b, context, rng, out)
+        self.turns_played += context.turn_index
+        self.last_rounds = context.round_index
+        if metrics is not None:
+            metrics.on_battle_end(context, outcome, fighter_a, fighter_b)
+        return outcome
+
+    def _play(
+        self,
+        fighter_a: Character,
+        fighter_b: Character,
+        context: BattleContext,
+        rng: RandomStream,
+        out: TextIO | None,
+    ) -> str:
+        """对局主循环，out 不为 None 时输出逐回合日志。"""
         rounds = 0
 
         while fighter_a.is_alive() and fighter_b.is_alive() and rounds < self.max_rounds:
             rounds += 1
-            if verbose:
-                print(f"=== 第 {rounds} 回合 ===")
-            turn_order = self._decide_order(fighter_a, fighter_b)
+            context.round_index = rounds
+            if out is not None:
+                out.write(f"=== 第 {rounds} 回合 ===\n")
+            turn_order = self._decide_order(fighter_a, fighter_b, rng)
             for attacker, defender in turn_order:
                 if not attacker.is_alive():
                     continue
                 context.turn_index += 1
+                context.actor = attacker
                 attacker.take_turn(defender, context)
                 logs = context.consume_turn_log()
-                if verbose:
-                    self._print_turn_logs(attacker, defender, logs)
+                if out is not None:
+                    self._write_turn_logs(out, attacker, defender, logs)
                 attacker_alive = attacker.is_alive()
                 defender_alive = defender.is_alive()
                 if not defender_alive and not attacker_alive:
@@ -52,32 +174,280 @@ class BattleEngine:
             return "draw"
         return fighter_a.name if fighter_a.hp > fighter_b.hp else fighter_b.name
 
-    def simulate(self, factory_a: CharacterFactory, factory_b: CharacterFactory, battles: int) -> Dict[str, int]:
-        name_a = factory_a().name
-        name_b = factory_b().name
+    def simulate(
+        self,
+        factory_a: CharacterFactory,
+        factory_b: CharacterFactory,
+        battles: int,
+        *,
+        workers: int | None = 1,
+        record: str | None = None,
+        trace: BattleTracer | None = None,
+    ) -> Dict[str, int]:
+        """批量模拟对局并统计胜负。
+
+        每局的随机种子由本次模拟的基准种子与对局编号派生，因此固定 seed 时
+        无论 workers 取多少，统计结果都完全一致。workers 为 None 时使用全部 CPU 核心。
+        record 为文件路径时把每局的种子、回合数与结果写入二进制记录，之后可用
+        battle.recording.BattleRecording 按编号重放。trace 用于只为满足条件的对局输出完整
+        日志（见 battle.tracing.BattleTracer），模拟本身仍然静默进行。
+        """
+        name_a = factory_name(factory_a)
+        name_b = factory_name(factory_b)
         results = {name_a: 0, name_b: 0, "draw": 0}
-        for _ in range(battles):
-            outcome = self.fight(factory_a, factory_b)
-            if outcome not in results:
-                results[outcome] = 0
-            results[outcome] += 1
+        worker_count = resolve_workers(workers)
+        base_seed = self.spawn_seed()
+        ranges = plan_chunks(0, battles, worker_count * CHUNKS_PER_WORKER)
+        recorder = (
+            BattleRecorder(record, factory_a, factory_b, self.max_rounds, self.random_source.name) if record else None
+        )
+        if trace is not None:
+            trace.open()
+        try:
+            counts = run_chunks(
+                self, factory_a, factory_b, base_seed, ranges, worker_count, recorder=recorder, tracer=trace
+            )
+        finally:
+            if recorder is not None:
+                recorder.close()
+            if trace is not None:
+                trace.close()
+        for outcome, count in counts.items():
+            results[outcome] = results.get(outcome, 0) + count
         return results
 
-    def _decide_order(self, fighter_a: Character, fighter_b: Character) -> List[Tuple[Character, Character]]:
+    def simulate_stream(
+        self,
+        factory_a: CharacterFactory,
+        factory_b: CharacterFactory,
+        battles: int,
+        *,
+        every: int = 1_000,
+        workers: int | None = 1,
+        sink: SummarySink | None = None,
+        checkpoint: str | None = None,
+    ) -> Iterator[SimulationProgress]:
+        """与 simulate 相同的对局，但每完成 every 场就产出一次累计结果。
+
+        sink（如 streaming.JsonlSink/CsvSink）按对局编号顺序收到每场的概要。传入 checkpoint
+        路径时每批结束后写入检查点；该文件已存在时从中记录的位置继续，输出文件也会截断到
+        检查点时的长度再续写，因此中断后重新运行得到的结果与一次跑完完全相同。
+        内存占用只与 every 有关，与总场数无关。
+        """
+        if every <= 0:
+            raise ValueError("every 必须为正数")
+        name_a = factory_name(factory_a)
+        name_b = factory_name(factory_b)
+        if checkpoint and os.path.exists(checkpoint):
+            state = StreamCheckpoint.load(checkpoint)
+            if (state.name_a, state.name_b, state.max_rounds) != (name_a, name_b, self.max_rounds):
+                raise ValueError(f"检查点 {checkpoint} 属于另一组对局或配置")
+            if state.rng != self.random_source.name:
+                # 同一基准种子在不同随机源下是另一组对局，续跑会把两者混在一起
+                raise ValueError(
+                    f"检查点 {checkpoint} 使用随机源 {state.rng!r}，与当前的 {self.random_source.name!r} 不同"
+                )
+        else:
+            counts = {name_a: 0, name_b: 0, "draw": 0}
+            state = StreamCheckpoint(
+                name_a, name_b, self.max_rounds, self.spawn_seed(), 0, counts, rng=self.random_source.name
+            )
+            if checkpoint:
+                # 先落盘基准种子，之后即使第一批就中断也能按同一种子恢复
+                state.save(checkpoint)
+        if sink is not None:
+            if isinstance(sink, RecordFileSink):
+                sink.open(state.sink_offset)
+            else:
+                sink.open()
+        worker_count = resolve_workers(workers)
+        pool = ProcessPoolExecutor(max_workers=worker_count) if worker_count > 1 else None
+        try:
+            while state.battles < battles:
+                stop = min(battles, state.battles + every)
+                ranges = plan_chunks(state.battles, stop, worker_count * CHUNKS_PER_WORKER)
+                batch = run_chunks(
+                    self, factory_a, factory_b, state.base_seed, ranges, worker_count, pool, tracer=sink
+                )
+                for outcome, count in batch.items():
+                    state.counts[outcome] = state.counts.get(outcome, 0) + count
+                state.battles = stop
+                if checkpoint:
+                    if isinstance(sink, RecordFileSink):
+                        state.sink_offset = sink.position()
+                    state.save(checkpoint)
+                yield SimulationProgress(state.battles, battles, dict(state.counts), state.base_seed)
+        finally:
+            if pool is not None:
+                pool.shutdown()
+            if sink is not None:
+                sink.close()
+
+    def simulate_until(
+        self,
+        factory_a: CharacterFactory,
+        factory_b: CharacterFactory,
+        *,
+        precision: float = 0.01,
+        confidence: float = 0.95,
+        batch_size: int = 500,
+        max_battles: int = 1_000_000,
+        workers: int | None = 1,
+    ) -> WinRateEstimate:
+        """分批模拟，直到 factory_a 一方胜率的 Wilson 区间半宽不超过 precision。
+
+        实力悬殊的对局几百场即可停止，势均力敌的对局则会一直运行到 max_battles。
+        对局编号连续递增，固定 seed 时结果与 workers 无关。
+        """
+        if batch_size <= 0:
+            raise ValueError("batch_size 必须为正数")
+        name_a = factory_name(factory_a)
+        name_b = factory_name(factory_b)
+        counts = {name_a: 0, name_b: 0, "draw": 0}
+        worker_count = resolve_workers(workers)
+        base_seed = self.spawn_seed()
+        pool = ProcessPoolExecutor(max_workers=worker_count) if worker_count > 1 else None
+        battles = 0
+        try:
+            while True:
+                stop = min(max_battles, battles + batch_size)
+                ranges = plan_chunks(battles, stop, worker_count * CHUNKS_PER_WORKER)
+                batch = run_chunks(self, factory_a, factory_b, base_seed, ranges, worker_count, pool)
+                for outcome, count in batch.items():
+                    counts[outcome] = counts.get(outcome, 0) + count
+                battles = stop
+                lower, upper = wilson_interval(counts[name_a], battles, confidence)
+                if (upper - lower) / 2.0 <= precision or battles >= max_battles:
+                    break
+        finally:
+            if pool is not None:
+                pool.shutdown()
+        return WinRateEstimate(
+            name=name_a,
+            counts=counts,
+            battles=battles,
+            win_rate=counts[name_a] / battles if battles else 0.0,
+            lower=lower,
+            upper=upper,
+            confidence=confidence,
+        )
+
+    def compare(
+        self,
+        variant_a: CharacterFactory,
+        variant_b: CharacterFactory,
+        opponent: CharacterFactory,
+        pairs: int,
+        *,
+        antithetic: bool = False,
+        confidence: float = 0.95,
+        workers: int | None = 1,
+    ) -> PairedComparison:
+        """配对比较两个变体对同一 opponent 的胜率。
+
+        每组配对中两个变体使用同一个种子（公共随机数），胜率差按配对差值估计方差，
+        变体行为相近时置信区间远窄于两次独立 simulate。antithetic 为 True 时每个种子
+        再用对偶随机流各打一场。
+        """
+        from .comparison import compare_variants
+
+        return compare_variants(
+            self, variant_a, variant_b, opponent, pairs, antithetic=antithetic, confidence=confidence, workers=workers
+        )
+
+    def melee(
+        self,
+        teams: Sequence[Team],
+        *,
+        seed: int | None = None,
+        verbose: bool = False,
+        out: TextIO | None = None,
+    ) -> str:
+        """多支队伍（见 battle.melee.Team 与 free_for_all）之间的一场对局，返回获胜队伍名或 "draw"。
+
+        不收集指标；两人对局请使用 fight。
+        """
+        from .melee import Melee
+
+        rng = self.random_source.new(self.spawn_seed() if seed is None else seed)
+        if verbose and out is None:
+            out = sys.stdout
+        fighters = [[factory() for factory in team.members] for team in teams]
+        return Melee(self, teams, fighters, rng, out=out if verbose else None).run()
+
+    def simulate_melee(self, teams: Sequence[Team], battles: int, *, workers: int | None = 1) -> Dict[str, int]:
+        """批量进行多人对局并按队伍名统计胜负，种子的派生方式与 simulate 相同。"""
+        from .melee import simulate_melee
+
+        return simulate_melee(self, teams, battles, workers=workers)
+
+    def capture(
+        self,
+        factory_a: CharacterFactory,
+        factory_b: CharacterFactory,
+        when: SnapshotCondition,
+        *,
+        seed: int | None = None,
+    ) -> BattleSnapshot | None:
+        """进行一局对局，在 when(fighter_a, fighter_b, context) 第一次成立的行动之前拍摄快照。
+
+        例如 ``when=lambda a, b, ctx: ctx.round_index >= 8 and b.hp <= 20``。对局在条件成立前
+        结束时返回 None。seed 省略时从引擎的随机流中取一个。
+        """
+        from .snapshot import capture_snapshot
+
+        return capture_snapshot(self, factory_a, factory_b, when, self.spawn_seed() if seed is None else seed)
+
+    def resume(
+        self,
+        snapshot: BattleSnapshot,
+        *,
+        seed: int | None = None,
+        verbose: bool = False,
+        out: TextIO | None = None,
+    ) -> str:
+        """从快照续打到结束。seed 为 None 时沿用快照中的随机流状态，结果与原对局一致。"""
+        from .snapshot import resume_snapshot
+
+        rng = snapshot.random_stream() if seed is None else self.random_source.new(seed)
+        if verbose and out is None:
+            out = sys.stdout
+        outcome, context = resume_snapshot(self, snapshot, rng, out=out if verbose else None)
+        self.turns_played += context.turn_index - snapshot.turn_index
+        self.last_rounds = context.round_index
+        return outcome
+
+    def fork(self, snapshot: BattleSnapshot, continuations: int, *, workers: int | None = 1) -> Dict[str, int]:
+        """从同一快照出发续打 continuations 次，统计胜负，即快照时刻之后的条件胜率。
+
+        每个分叉的随机种子由本次调用的基准种子与分叉编号派生，固定 seed 时结果与 workers 无关。
+        多进程时快照连同其中的 factory 需可 pickle。
+        """
+        from .snapshot import fork_snapshot
+
+        return fork_snapshot(self, snapshot, continuations, workers=workers)
+
+    def solve(self, factory_a: CharacterFactory, factory_b: CharacterFactory) -> Dict[str, float]:
+        """不采样，精确计算 max_rounds 内双方的胜负与平局概率，键与 simulate 的返回值一致。"""
+        return solve_exact(factory_a, factory_b, self.max_rounds)
+
+    def _decide_order(
+        self, fighter_a: Character, fighter_b: Character, rng: RandomStream
+    ) -> List[Tuple[Character, Character]]:
         speed_a = fighter_a.get_effective_speed()
         speed_b = fighter_b.get_effective_speed()
         if speed_a == speed_b:
-            if self._rng.random() < 0.5:
+            if rng.random() < 0.5:
                 return [(fighter_a, fighter_b), (fighter_b, fighter_a)]
             return [(fighter_b, fighter_a), (fighter_a, fighter_b)]
         if speed_a > speed_b:
             return [(fighter_a, fighter_b), (fighter_b, fighter_a)]
         return [(fighter_b, fighter_a), (fighter_a, fighter_b)]
 
-    def _print_turn_logs(self, attacker: Character, defender: Character, logs: List[str]) -> None:
-        for entry in logs:
-            print(f"  - {entry}")
-        print(
+    def _write_turn_logs(self, out: TextIO, attacker: Character, defender: Character, logs: List[str]) -> None:
+        lines = [f"  - {entry}\n" for entry in logs]
+        lines.append(
             f"  状态：{attacker.name} HP {max(attacker.hp, 0):.1f} | "
-            f"{defender.name} HP {max(defender.hp, 0):.1f}"
+            f"{defender.name} HP {max(defender.hp, 0):.1f}\n"
         )
+        out.write("".join(lines))
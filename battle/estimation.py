@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from statistics import NormalDist
+from typing import Dict, Tuple
+
+
+def z_score(confidence: float) -> float:
+    """双侧置信水平对应的标准正态分位数。"""
+    if not 0.0 < confidence < 1.0:
+        raise ValueError("confidence 必须位于 (0, 1) 区间内")
+    return NormalDist().inv_cdf(0.5 + confidence / 2.0)
+
+
+def wilson_interval(successes: int, trials: int, confidence: float = 0.95) -> Tuple[float, float]:
+    """胜率的 Wilson 置信区间，在胜率接近 0 或 1 时也保持良好覆盖率。"""
+    if trials <= 0:
+        return 0.0, 1.0
+    z = z_score(confidence)
+    p = successes / trials
+    z2 = z * z
+    denominator = 1.0 + z2 / trials
+    center = (p + z2 / (2.0 * trials)) / denominator
+    margin = z * math.sqrt(p * (1.0 - p) / trials + z2 / (4.0 * trials * trials)) / denominator
+    return max(0.0, center - margin), min(1.0, center + margin)
+
+
+@dataclass
+class WinRateEstimate:
+    """自适应模拟的结果：胜负计数、所用对局数与 name 一方胜率的置信区间。"""
+
+    name: str
+    counts: Dict[str, int]
+    battles: int
+    win_rate: float
+    lower: float
+    upper: float
+    confidence: float
+
+    @property
+    def half_width(self) -> float:
+        return (self.upper - self.lower) / 2.0
+
+
+def paired_interval(
+    total: float, total_sq: float, pairs: int, confidence: float = 0.95
+) -> Tuple[float, float, float]:
+    """配对差值的均值及其正态近似置信区间，返回 (均值, 下界, 上界)。"""
+    if pairs <= 0:
+        return 0.0, -1.0, 1.0
+    mean = total / pairs
+    variance = max(0.0, (total_sq - pairs * mean * mean) / (pairs - 1)) if pairs > 1 else 0.0
+    margin = z_score(confidence) * math.sqrt(variance / pairs)
+    return mean, mean - margin, mean + margin
+
+
+@dataclass
+class PairedComparison:
+    """两个变体在公共随机数下对同一对手的胜率差 win_rate_a - win_rate_b 及其配对置信区间。"""
+
+    name_a: str
+    name_b: str
+    opponent: str
+    pairs: int
+    battles: int
+    antithetic: bool
+    win_rate_a: float
+    win_rate_b: float
+    difference: float
+    lower: float
+    upper: float
+    confidence: float
+    # 独立抽样下差值的方差与配对差值方差之比，即同等精度下节省的对局倍数
+    variance_ratio: float
+
+    @property
+    def significant(self) -> bool:
+        return self.lower > 0.0 or self.upper < 0.0
+
+    @property
+    def half_width(self) -> float:
+        return (self.upper - self.lower) / 2.0
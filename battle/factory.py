@@ -0,0 +1,23 @@
+from __future__ import annotations
+
+from typing import Callable
+
+from characters.base import Character
+
+CharacterFactory = Callable[[], Character]
+
+
+def factory_name(factory: CharacterFactory) -> str:
+    """读取 factory 所生成角色的名字；角色类直接读取类属性，无需实例化。"""
+    if isinstance(factory, type):
+        name = getattr(factory, "name", None)
+        if isinstance(name, str):
+            return name
+    return factory().name
+
+
+def spawn_fighter(factory: CharacterFactory) -> Character:
+    """构造角色并记录初始状态，之后可反复 reset 复用同一实例。"""
+    fighter = factory()
+    fighter.save_initial_state()
+    return fighter
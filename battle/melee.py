@@ -0,0 +1,206 @@
+"""多名角色参与的团队战与混战。
+
+每回合所有存活角色按有效速度从高到低各行动一次。行动顺序保存在跨回合的 SpeedQueue
+中，只有有效速度变化（加速、减速及其衰减）的角色才会重新排队；速度相同的角色按入队时
+从对局随机流抽取的键决定先后，同一种子下顺序可复现。目标由 Character.select_target
+从敌方存活角色中选出，之后照常经过 get_normal_attack_target（如混乱时攻击自己）。
+
+两人对局仍由 BattleEngine.fight/simulate 处理，本模块不影响其速度与结果。
+"""
+
+from __future__ import annotations
+
+from bisect import insort
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Dict, List, Sequence, TextIO, Tuple
+
+from characters.base import BattleContext, Character
+
+from .factory import CharacterFactory, factory_name, spawn_fighter
+from .parallel import CHUNKS_PER_WORKER, merge_counts, plan_chunks, resolve_workers
+from .rng import RandomStream
+
+if TYPE_CHECKING:
+    from .engine import BattleEngine
+
+
+@dataclass(frozen=True)
+class Team:
+    name: str
+    members: Tuple[CharacterFactory, ...]
+
+
+def free_for_all(factories: Sequence[CharacterFactory]) -> List[Team]:
+    """每名角色自成一队的混战；同名角色依次加上 #2、#3 后缀。"""
+    teams: List[Team] = []
+    seen: Dict[str, int] = {}
+    for factory in factories:
+        name = factory_name(factory)
+        seen[name] = seen.get(name, 0) + 1
+        teams.append(Team(name if seen[name] == 1 else f"{name}#{seen[name]}", (factory,)))
+    return teams
+
+
+class SpeedQueue:
+    """按 (-有效速度, 平局键, 编号) 升序排列的行动队列。
+
+    refresh 在每回合开始时逐个比较有效速度，只把变化了的角色移出后按二分插回，速度不变时
+    不做任何排序；阵亡的角色在下一次 refresh 时移出队列。回合中途 order 不会改动。
+    """
+
+    __slots__ = ("fighters", "order", "_entries", "_rng")
+
+    def __init__(self, fighters: Sequence[Character], rng: RandomStream) -> None:
+        self.fighters = fighters
+        self._rng = rng
+        self._entries: List[Tuple[float, float, int] | None] = [None] * len(fighters)
+        self.order: List[Tuple[float, float, int]] = []
+
+    def refresh(self) -> List[Tuple[float, float, int]]:
+        entries = self._entries
+        order = self.order
+        for index, fighter in enumerate(self.fighters):
+            entry = entries[index]
+            if not fighter.is_alive():
+                if entry is not None:
+                    order.remove(entry)
+                    entries[index] = None
+                continue
+            speed = fighter.get_effective_speed()
+            if entry is not None:
+                if entry[0] == -speed:
+                    continue
+                order.remove(entry)
+            entry = (-speed, self._rng.random(), index)
+            entries[index] = entry
+            insort(order, entry)
+        return order
+
+
+class Melee:
+    """一场多人对局的状态，run 打完整场并返回获胜队伍名或 "draw"。"""
+
+    def __init__(
+        self,
+        engine: "BattleEngine",
+        teams: Sequence[Team],
+        fighters: Sequence[Sequence[Character]],
+        rng: RandomStream,
+        *,
+        out: TextIO | None = None,
+    ) -> None:
+        if len(teams) < 2:
+            raise ValueError("至少需要两支队伍")
+        self.engine = engine
+        self.teams = teams
+        self.rng = rng
+        self.out = out
+        self.fighters: List[Character] = [fighter for members in fighters for fighter in members]
+        # 每名角色所属队伍的编号，以及每支队伍的敌方角色列表
+        self.team_of: List[int] = [slot for slot, members in enumerate(fighters) for _ in members]
+        self.enemies: List[List[Character]] = [
+            [fighter for index, fighter in enumerate(self.fighters) if self.team_of[index] != slot]
+            for slot in range(len(teams))
+        ]
+        self.context = BattleContext(rng)
+        self.context.set_logging(out is not None)
+
+    def run(self) -> str:
+        fighters, team_of, context, out = self.fighters, self.team_of, self.context, self.out
+        alive = [False] * len(fighters)
+        living = [0] * len(self.teams)
+        for index, fighter in enumerate(fighters):
+            if fighter.is_alive():
+                alive[index] = True
+                living[team_of[index]] += 1
+        standing = sum(1 for count in living if count)
+        queue = SpeedQueue(fighters, self.rng)
+        positions = {id(fighter): index for index, fighter in enumerate(fighters)}
+
+        def bury(index: int) -> None:
+            nonlocal standing
+            alive[index] = False
+            slot = team_of[index]
+            living[slot] -= 1
+            if living[slot] == 0:
+                standing -= 1
+
+        rounds = 0
+        while standing > 1 and rounds < self.engine.max_rounds:
+            rounds += 1
+            context.round_index = rounds
+            if out is not None:
+                out.write(f"=== 第 {rounds} 回合 ===\n")
+            for _, _, index in queue.refresh():
+                attacker = fighters[index]
+                if not attacker.is_alive():
+                    continue
+                target = attacker.select_target(self.enemies[team_of[index]], context)
+                context.turn_index += 1
+                context.actor = attacker
+                attacker.take_turn(target, context)
+                logs = context.consume_turn_log()
+                if out is not None:
+                    self.engine._write_turn_logs(out, attacker, target, logs)
+                # 一次行动通常只改变行动者与目标的 HP，其余角色的阵亡在回合结束时统一检查
+                for fighter in (attacker, target):
+                    position = positions[id(fighter)]
+                    if alive[position] and not fighter.is_alive():
+                        bury(position)
+                if standing <= 1:
+                    break
+            for index, fighter in enumerate(fighters):
+                if alive[index] and not fighter.is_alive():
+                    bury(index)
+        self.engine.turns_played += context.turn_index
+        self.engine.last_rounds = rounds
+        if standing == 1:
+            return self.teams[next(slot for slot, count in enumerate(living) if count)].name
+        if standing == 0:
+            return "draw"
+        return self._judge()
+
+    def _judge(self) -> str:
+        """回合数用尽时比较各队存活角色的 HP 之和，最高者获胜，并列则平局。"""
+        totals = [0.0] * len(self.teams)
+        for index, fighter in enumerate(self.fighters):
+            if fighter.is_alive():
+                totals[self.team_of[index]] += fighter.hp
+        best = max(totals)
+        leaders = [slot for slot, total in enumerate(totals) if total == best]
+        return self.teams[leaders[0]].name if len(leaders) == 1 else "draw"
+
+
+def melee_range(
+    engine: "BattleEngine", teams: Sequence[Team], base_seed: int, start: int, stop: int
+) -> Dict[str, int]:
+    """进行编号 [start, stop) 的多人对局，角色实例在各局之间 reset 复用。"""
+    fighters = [[spawn_fighter(factory) for factory in team.members] for team in teams]
+    counts: Dict[str, int] = {}
+    for _, _, rng in engine.random_source.streams(base_seed, start, stop):
+        for members in fighters:
+            for fighter in members:
+                fighter.reset()
+        outcome = Melee(engine, teams, fighters, rng).run()
+        counts[outcome] = counts.get(outcome, 0) + 1
+    return counts
+
+
+def simulate_melee(
+    engine: "BattleEngine", teams: Sequence[Team], battles: int, *, workers: int | None = 1
+) -> Dict[str, int]:
+    results = {team.name: 0 for team in teams}
+    results["draw"] = 0
+    worker_count = resolve_workers(workers)
+    base_seed = engine.spawn_seed()
+    ranges = plan_chunks(0, battles, worker_count * CHUNKS_PER_WORKER)
+    if worker_count <= 1 or len(ranges) <= 1:
+        for start, stop in ranges:
+            merge_counts(results, melee_range(engine, teams, base_seed, start, stop))
+        return results
+    with ProcessPoolExecutor(max_workers=worker_count) as pool:
+        futures = [pool.submit(melee_range, engine, teams, base_seed, start, stop) for start, stop in ranges]
+        for future in futures:
+            merge_counts(results, future.result())
+    return results
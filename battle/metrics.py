@@ -0,0 +1,216 @@
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Dict, List, Tuple
+
+if TYPE_CHECKING:
+    from characters.base import BattleContext, Character
+
+# take_turn 中的阶段，伤害按 (行动方, 阶段) 归类
+TURN_PHASES = ("turn_start", "passive", "active", "normal", "turn_end")
+
+
+@dataclass
+class RunningStats:
+    """Welford 在线均值与方差，可按 Chan 公式合并。"""
+
+    count: int = 0
+    mean: float = 0.0
+    m2: float = 0.0
+    minimum: float = math.inf
+    maximum: float = -math.inf
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        if value < self.minimum:
+            self.minimum = value
+        if value > self.maximum:
+            self.maximum = value
+
+    def merge(self, other: "RunningStats") -> None:
+        if other.count == 0:
+            return
+        if self.count == 0:
+            self.count, self.mean, self.m2 = other.count, other.mean, other.m2
+            self.minimum, self.maximum = other.minimum, other.maximum
+            return
+        total = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / total
+        self.m2 += other.m2 + delta * delta * self.count * other.count / total
+        self.count = total
+        self.minimum = min(self.minimum, other.minimum)
+        self.maximum = max(self.maximum, other.maximum)
+
+    @property
+    def total(self) -> float:
+        return self.mean * self.count
+
+    @property
+    def variance(self) -> float:
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def stdev(self) -> float:
+        return math.sqrt(self.variance)
+
+
+@dataclass
+class Histogram:
+    """等宽分桶计数，counts 的键为桶下界除以 width 的整数。"""
+
+    width: float = 1.0
+    counts: Dict[int, int] = field(default_factory=dict)
+
+    def add(self, value: float) -> None:
+        bucket = int(value // self.width)
+        self.counts[bucket] = self.counts.get(bucket, 0) + 1
+
+    def merge(self, other: "Histogram") -> None:
+        if other.width != self.width:
+            raise ValueError("只能合并分桶宽度相同的直方图")
+        for bucket, count in other.counts.items():
+            self.counts[bucket] = self.counts.get(bucket, 0) + count
+
+    def buckets(self) -> List[Tuple[float, int]]:
+        """按桶下界升序返回 (下界, 计数)。"""
+        return [(bucket * self.width, self.counts[bucket]) for bucket in sorted(self.counts)]
+
+
+@dataclass
+class TriggerCount:
+    attempts: int = 0
+    hits: int = 0
+
+    @property
+    def rate(self) -> float:
+        return self.hits / self.attempts if self.attempts else 0.0
+
+
+class MetricsCollector:
+    """对局指标收集器，挂到 BattleEngine 后由 take_turn/basic_attack/receive_damage/heal 回调。
+
+    只保存按角色、阶段或技能分组的在线统计量，内存与对局数无关。各进程分块各自
+    收集，再用 merge 汇总，合并结果与串行收集一致（浮点误差除外）。
+    """
+
+    def __init__(self, hp_bucket: float = 10.0) -> None:
+        self.hp_bucket = hp_bucket
+        self.outcomes: Dict[str, int] = {}
+        self.rounds = RunningStats()
+        self.rounds_histogram = Histogram(1.0)
+        self.turns = RunningStats()
+        self.remaining_hp: Dict[str, RunningStats] = {}
+        self.remaining_hp_histogram: Dict[str, Histogram] = {}
+        # 键为 (造成伤害的行动方, 阶段)；流血等持续伤害在受害者回合开始时结算，记在受害者的 turn_start 下
+        self.damage: Dict[Tuple[str, str], RunningStats] = {}
+        self.damage_taken: Dict[str, RunningStats] = {}
+        self.healing: Dict[str, RunningStats] = {}
+        self.triggers: Dict[Tuple[str, str], TriggerCount] = {}
+
+    def spawn(self) -> "MetricsCollector":
+        """配置相同的空收集器，供各分块独立收集后再合并。"""
+        return MetricsCollector(self.hp_bucket)
+
+    @property
+    def battles(self) -> int:
+        return self.rounds.count
+
+    # ---- 回调 ----
+
+    def on_damage(self, context: "BattleContext", target: "Character", amount: float) -> None:
+        source = context.actor.name if context.actor is not None else target.name
+        key = (source, context.phase)
+        stats = self.damage.get(key)
+        if stats is None:
+            stats = self.damage[key] = RunningStats()
+        stats.add(amount)
+        taken = self.damage_taken.get(target.name)
+        if taken is None:
+            taken = self.damage_taken[target.name] = RunningStats()
+        taken.add(amount)
+
+    def on_heal(self, target: "Character", amount: float) -> None:
+        stats = self.healing.get(target.name)
+        if stats is None:
+            stats = self.healing[target.name] = RunningStats()
+        stats.add(amount)
+
+    def on_trigger(self, owner: str, skill: str, hit: bool) -> None:
+        key = (owner, skill)
+        count = self.triggers.get(key)
+        if count is None:
+            count = self.triggers[key] = TriggerCount()
+        count.attempts += 1
+        if hit:
+            count.hits += 1
+
+    def on_battle_end(
+        self, context: "BattleContext", outcome: str, fighter_a: "Character", fighter_b: "Character"
+    ) -> None:
+        self.outcomes[outcome] = self.outcomes.get(outcome, 0) + 1
+        self.rounds.add(context.round_index)
+        self.rounds_histogram.add(context.round_index)
+        self.turns.add(context.turn_index)
+        for fighter in (fighter_a, fighter_b):
+            hp = max(fighter.hp, 0.0)
+            stats = self.remaining_hp.get(fighter.name)
+            if stats is None:
+                stats = self.remaining_hp[fighter.name] = RunningStats()
+                self.remaining_hp_histogram[fighter.name] = Histogram(self.hp_bucket)
+            stats.add(hp)
+            self.remaining_hp_histogram[fighter.name].add(hp)
+
+    # ---- 汇总 ----
+
+    def merge(self, other: "MetricsCollector") -> "MetricsCollector":
+        for outcome, count in other.outcomes.items():
+            self.outcomes[outcome] = self.outcomes.get(outcome, 0) + count
+        self.rounds.merge(other.rounds)
+        self.rounds_histogram.merge(other.rounds_histogram)
+        self.turns.merge(other.turns)
+        for name, stats in other.remaining_hp.items():
+            self.remaining_hp.setdefault(name, RunningStats()).merge(stats)
+            self.remaining_hp_histogram.setdefault(name, Histogram(self.hp_bucket)).merge(
+                other.remaining_hp_histogram[name]
+            )
+        for source, stats in other.damage.items():
+            self.damage.setdefault(source, RunningStats()).merge(stats)
+        for name, stats in other.damage_taken.items():
+            self.damage_taken.setdefault(name, RunningStats()).merge(stats)
+        for name, stats in other.healing.items():
+            self.healing.setdefault(name, RunningStats()).merge(stats)
+        for key, count in other.triggers.items():
+            mine = self.triggers.setdefault(key, TriggerCount())
+            mine.attempts += count.attempts
+            mine.hits += count.hits
+        return self
+
+    def format_report(self) -> str:
+        battles = self.battles
+        lines = [f"对局数: {battles}"]
+        if not battles:
+            return lines[0]
+        lines.append(
+            f"回合数: 平均 {self.rounds.mean:.2f} ± {self.rounds.stdev:.2f}，"
+            f"范围 {self.rounds.minimum:.0f}-{self.rounds.maximum:.0f}"
+        )
+        for name, stats in self.remaining_hp.items():
+            lines.append(f"{name} 剩余 HP: 平均 {stats.mean:.1f} ± {stats.stdev:.1f}")
+        lines.append("伤害来源（每场平均 / 每次平均 / 次数）：")
+        for (source, phase), stats in sorted(self.damage.items(), key=lambda item: -item[1].total):
+            lines.append(
+                f"  {source}[{phase}] {stats.total / battles:.1f} / {stats.mean:.1f} / {stats.count}"
+            )
+        if self.healing:
+            lines.append("治疗（每场平均）：")
+            for name, stats in self.healing.items():
+                lines.append(f"  {name} {stats.total / battles:.1f}")
+        lines.append("技能触发（触发 / 判定 = 触发率）：")
+        for (owner, skill), count in sorted(self.triggers.items()):
+            lines.append(f"  {owner}·{skill} {count.hits} / {count.attempts} = {count.rate:.2%}")
+        return "\n".join(lines)
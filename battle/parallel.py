@@ -0,0 +1,200 @@
+from __future__ import annotations
+
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Dict, Iterable, List, Tuple
+
+from .factory import CharacterFactory, spawn_fighter
+from .recording import outcome_code, pack_record
+from .rng import derive_seed
+from .tracing import BattleSummary, TracePredicate
+
+if TYPE_CHECKING:
+    from .engine import BattleEngine
+    from .metrics import MetricsCollector
+    from .profiling import SkillProfiler
+    from .recording import BattleRecorder
+    from .tracing import SummarySink
+
+# 每个进程分得的分块数，分块越多负载越均衡，但进程间通信也越多。
+CHUNKS_PER_WORKER = 4
+
+
+def resolve_workers(workers: int | None) -> int:
+    """None 表示使用全部 CPU 核心。"""
+    if workers is None:
+        return os.cpu_count() or 1
+    return max(1, int(workers))
+
+
+def plan_chunks(start: int, stop: int, chunks: int) -> List[Tuple[int, int]]:
+    """把对局编号区间 [start, stop) 均分为若干连续分块。"""
+    total = stop - start
+    if total <= 0:
+        return []
+    chunks = max(1, min(chunks, total))
+    size, extra = divmod(total, chunks)
+    ranges: List[Tuple[int, int]] = []
+    lower = start
+    for idx in range(chunks):
+        upper = lower + size + (1 if idx < extra else 0)
+        ranges.append((lower, upper))
+        lower = upper
+    return ranges
+
+
+def merge_counts(target: Dict[str, int], counts: Dict[str, int]) -> Dict[str, int]:
+    for key, value in counts.items():
+        target[key] = target.get(key, 0) + value
+    return target
+
+
+def simulate_range(
+    engine: "BattleEngine",
+    factory_a: CharacterFactory,
+    factory_b: CharacterFactory,
+    base_seed: int,
+    start: int,
+    stop: int,
+    metrics: "MetricsCollector | None" = None,
+    profiler: "SkillProfiler | None" = None,
+    records: bytearray | None = None,
+    predicate: TracePredicate | None = None,
+    matches: List[BattleSummary] | None = None,
+) -> Dict[str, int]:
+    """在当前进程内执行编号为 [start, stop) 的对局，每局使用独立派生的种子。
+
+    整个分块只构造一对角色，每局开始前原地 reset；结果与逐局调用
+    engine.fight(factory_a, factory_b, seed=derive_seed(base_seed, index)) 完全一致；随机流由
+    engine.random_source 提供（见 battle.rng）。
+    metrics、profiler 为 None 时记入 engine 自身挂载的收集器与分析器（若有）；
+    传入 records 时按编号顺序追加每局的二进制记录（见 battle.recording）；传入 predicate
+    时把满足条件的对局概要追加到 matches（见 battle.tracing）。
+    """
+    fighter_a = spawn_fighter(factory_a)
+    fighter_b = spawn_fighter(factory_b)
+    counts: Dict[str, int] = {}
+    for index, seed, rng in engine.random_source.streams(base_seed, start, stop):
+        fighter_a.reset()
+        fighter_b.reset()
+        outcome = engine.run_battle(fighter_a, fighter_b, rng, metrics=metrics, profiler=profiler)
+        counts[outcome] = counts.get(outcome, 0) + 1
+        if records is not None:
+            pack_record(records, seed, engine.last_rounds, outcome_code(outcome, fighter_a.name, fighter_b.name))
+        if predicate is not None:
+            summary = BattleSummary(
+                index,
+                seed,
+                outcome,
+                engine.last_rounds,
+                engine.max_rounds,
+                fighter_a.name,
+                fighter_b.name,
+                max(fighter_a.hp, 0.0),
+                max(fighter_b.hp, 0.0),
+            )
+            if predicate(summary) and matches is not None:
+                matches.append(summary)
+    return counts
+
+
+@dataclass
+class ChunkResult:
+    """进程池中一个分块的产出：胜负计数，以及按需收集的指标、性能分析与对局记录。"""
+
+    counts: Dict[str, int]
+    metrics: "MetricsCollector | None" = None
+    profiler: "SkillProfiler | None" = None
+    records: bytes | None = None
+    matches: List[BattleSummary] | None = None
+
+    def merge_into(self, engine: "BattleEngine", results: Dict[str, int]) -> None:
+        """把胜负计数并入 results，指标与性能分析并入 engine 自身挂载的收集器。"""
+        merge_counts(results, self.counts)
+        if self.metrics is not None and engine.metrics is not None:
+            engine.metrics.merge(self.metrics)
+        if self.profiler is not None and engine.profiler is not None:
+            engine.profiler.merge(self.profiler)
+
+
+def simulate_chunk(
+    engine: "BattleEngine",
+    factory_a: CharacterFactory,
+    factory_b: CharacterFactory,
+    base_seed: int,
+    start: int,
+    stop: int,
+    record: bool = False,
+    predicate: TracePredicate | None = None,
+) -> ChunkResult:
+    """进程池中执行的分块：指标与性能分析记入新的空收集器，随胜负计数一起返回，由主进程合并。"""
+    metrics = engine.metrics.spawn() if engine.metrics is not None else None
+    profiler = engine.profiler.spawn() if engine.profiler is not None else None
+    records = bytearray() if record else None
+    matches: List[BattleSummary] | None = [] if predicate is not None else None
+    counts = simulate_range(
+        engine, factory_a, factory_b, base_seed, start, stop, metrics, profiler, records, predicate, matches
+    )
+    return ChunkResult(counts, metrics, profiler, bytes(records) if records is not None else None, matches)
+
+
+def run_chunks(
+    engine: "BattleEngine",
+    factory_a: CharacterFactory,
+    factory_b: CharacterFactory,
+    base_seed: int,
+    ranges: Iterable[Tuple[int, int]],
+    workers: int,
+    executor: Executor | None = None,
+    recorder: "BattleRecorder | None" = None,
+    tracer: "SummarySink | None" = None,
+) -> Dict[str, int]:
+    """串行或通过进程池执行所有分块并合并胜负计数。
+
+    进程池模式下 factory 与 engine 会被 pickle，因此 factory 需为模块级的类或函数。
+    传入 executor 时复用该进程池，否则按 workers 临时创建。engine 挂有指标收集器时，
+    各进程分块收集的指标会合并回 engine.metrics，性能分析器同理。传入 recorder 时
+    各分块的对局记录按编号顺序写入；传入 tracer 时命中其谓词的对局概要按编号顺序交给它输出。
+    """
+    results: Dict[str, int] = {}
+    ranges = list(ranges)
+    predicate = tracer.predicate if tracer is not None else None
+    if executor is None and (workers <= 1 or len(ranges) <= 1):
+        for start, stop in ranges:
+            records = bytearray() if recorder is not None else None
+            matches: List[BattleSummary] | None = [] if tracer is not None else None
+            counts = simulate_range(
+                engine, factory_a, factory_b, base_seed, start, stop, records=records, predicate=predicate, matches=matches
+            )
+            chunk = ChunkResult(counts, records=records, matches=matches)
+            _emit_chunk(engine, chunk, factory_a, factory_b, recorder, tracer)
+            merge_counts(results, counts)
+        return results
+    if executor is None:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            return run_chunks(engine, factory_a, factory_b, base_seed, ranges, workers, pool, recorder, tracer)
+    record = recorder is not None
+    futures = [
+        executor.submit(simulate_chunk, engine, factory_a, factory_b, base_seed, start, stop, record, predicate)
+        for start, stop in ranges
+    ]
+    for future in futures:
+        chunk = future.result()
+        chunk.merge_into(engine, results)
+        _emit_chunk(engine, chunk, factory_a, factory_b, recorder, tracer)
+    return results
+
+
+def _emit_chunk(
+    engine: "BattleEngine",
+    chunk: ChunkResult,
+    factory_a: CharacterFactory,
+    factory_b: CharacterFactory,
+    recorder: "BattleRecorder | None",
+    tracer: "SummarySink | None",
+) -> None:
+    if recorder is not None and chunk.records is not None:
+        recorder.write(chunk.records)
+    if tracer is not None and chunk.matches:
+        tracer.write_batch(chunk.matches, factory_a, factory_b, engine)
@@ -0,0 +1,194 @@
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Sequence, Tuple
+
+import characters
+
+# 这些方法开启一个新的技能类别，其内部调用（除非进入另一类别）的耗时都归入该类别
+CATEGORY_BY_METHOD = {
+    "take_turn": "turn",
+    "passive_skill": "passive",
+    "can_use_active_skill": "active",
+    "active_skill": "active",
+    "get_normal_attack_target": "normal",
+    "perform_normal_attack": "normal",
+    "on_turn_start": "turn_hooks",
+    "on_turn_end": "turn_hooks",
+    "_run_turn_hooks": "turn_hooks",
+    "basic_attack": "damage",
+    "receive_damage": "damage",
+    "heal": "damage",
+}
+_DEFAULT_PATHS = (
+    os.path.dirname(os.path.abspath(characters.__file__)),
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "engine.py"),
+)
+
+
+@dataclass
+class ProfileEntry:
+    calls: int = 0
+    inclusive_ns: int = 0
+    self_ns: int = 0
+
+    def merge(self, other: "ProfileEntry") -> None:
+        self.calls += other.calls
+        self.inclusive_ns += other.inclusive_ns
+        self.self_ns += other.self_ns
+
+
+class SkillProfiler:
+    """按角色类与技能类别统计耗时和调用次数的分析器。
+
+    挂到 BattleEngine 后，每场对局期间通过 sys.setprofile 记录 paths 下（默认为 characters
+    包与 battle/engine.py）的函数调用；未挂载时引擎只多一次 None 判断。方法名取运行时的
+    类（如 DreamSeeker.take_turn 而非 Character.take_turn）。进程池中的每个分块使用独立
+    的分析器，结束后由主进程 merge。
+
+    setprofile 回调本身会使对局慢上数倍，绝对耗时偏大，应关注各项的相对占比。
+    """
+
+    def __init__(self, paths: Sequence[str] = _DEFAULT_PATHS) -> None:
+        self.paths = tuple(os.path.abspath(path) for path in paths)
+        self.functions: Dict[str, ProfileEntry] = {}
+        # 键为 (角色类, 技能类别)，只累计自身耗时，各项之和即总耗时
+        self.categories: Dict[Tuple[str, str], ProfileEntry] = {}
+        # 折叠调用栈 -> 自身耗时（纳秒），可直接交给 flamegraph.pl / speedscope
+        self.stacks: Dict[str, int] = {}
+        self._tracked: Dict[Any, bool] = {}
+        self._stack: List[list] = []
+        self._previous: Any = None
+
+    def spawn(self) -> "SkillProfiler":
+        return SkillProfiler(self.paths)
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state = self.__dict__.copy()
+        state["_tracked"] = {}
+        state["_stack"] = []
+        state["_previous"] = None
+        return state
+
+    def __enter__(self) -> "SkillProfiler":
+        self._previous = sys.getprofile()
+        sys.setprofile(self._callback)
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        sys.setprofile(self._previous)
+        self._previous = None
+        self._stack.clear()
+
+    def _is_tracked(self, code: Any) -> bool:
+        tracked = self._tracked.get(code)
+        if tracked is None:
+            filename = os.path.abspath(code.co_filename)
+            tracked = self._tracked[code] = filename.startswith(self.paths)
+        return tracked
+
+    def _callback(self, frame: Any, event: str, arg: Any) -> None:
+        if event == "call":
+            code = frame.f_code
+            if not self._is_tracked(code):
+                return
+            owner = frame.f_locals.get("self")
+            if owner is not None:
+                owner_name = type(owner).__name__
+                label = f"{owner_name}.{code.co_name}"
+            else:
+                label = code.co_qualname
+                owner_name = label.split(".", 1)[0]
+            parent = self._stack[-1] if self._stack else None
+            category = CATEGORY_BY_METHOD.get(code.co_name)
+            if category is not None:
+                category_key = (owner_name, category)
+            elif parent is not None:
+                category_key = parent[4]
+            else:
+                category_key = (owner_name, "engine")
+            path = f"{parent[5]};{label}" if parent is not None else label
+            self._stack.append([frame, label, time.perf_counter_ns(), 0, category_key, path])
+        elif event == "return" and self._stack and self._stack[-1][0] is frame:
+            _, label, started, child_ns, category_key, path = self._stack.pop()
+            elapsed = time.perf_counter_ns() - started
+            own = elapsed - child_ns
+            if self._stack:
+                self._stack[-1][3] += elapsed
+            entry = self.functions.get(label)
+            if entry is None:
+                entry = self.functions[label] = ProfileEntry()
+            entry.calls += 1
+            entry.inclusive_ns += elapsed
+            entry.self_ns += own
+            entry = self.categories.get(category_key)
+            if entry is None:
+                entry = self.categories[category_key] = ProfileEntry()
+            entry.calls += 1
+            entry.inclusive_ns += own
+            entry.self_ns += own
+            self.stacks[path] = self.stacks.get(path, 0) + own
+
+    def merge(self, other: "SkillProfiler") -> "SkillProfiler":
+        for label, entry in other.functions.items():
+            self.functions.setdefault(label, ProfileEntry()).merge(entry)
+        for key, entry in other.categories.items():
+            self.categories.setdefault(key, ProfileEntry()).merge(entry)
+        for path, ns in other.stacks.items():
+            self.stacks[path] = self.stacks.get(path, 0) + ns
+        return self
+
+    def write_collapsed(self, path: str) -> None:
+        """导出折叠调用栈（每行 "a;b;c 微秒数"）。"""
+        with open(path, "w", encoding="utf-8") as handle:
+            for stack, ns in sorted(self.stacks.items()):
+                micros = ns // 1000
+                if micros > 0:
+                    handle.write(f"{stack} {micros}\n")
+
+    def format_report(self, limit: int = 15) -> str:
+        total = sum(entry.self_ns for entry in self.categories.values()) or 1
+        lines = ["按角色与技能类别（自身耗时 / 占比 / 调用次数）："]
+        for (owner, category), entry in sorted(self.categories.items(), key=lambda item: -item[1].self_ns):
+            lines.append(
+                f"  {owner:<14} {category:<10} {entry.self_ns / 1e6:>9.1f} ms {entry.self_ns / total:>7.2%} {entry.calls:>9}"
+            )
+        lines.append(f"耗时最多的函数（前 {limit} 个，自身 / 累计 / 调用次数）：")
+        ranked = sorted(self.functions.items(), key=lambda item: -item[1].self_ns)[:limit]
+        for label, entry in ranked:
+            lines.append(
+                f"  {label:<40} {entry.self_ns / 1e6:>9.1f} ms {entry.inclusive_ns / 1e6:>9.1f} ms {entry.calls:>9}"
+            )
+        return "\n".join(lines)
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    from .engine import BattleEngine
+    from characters.registry import REGISTRY
+
+    names = sorted(REGISTRY.keys())
+    parser = argparse.ArgumentParser(description="按角色与技能统计模拟耗时")
+    parser.add_argument("first", choices=names)
+    parser.add_argument("second", choices=names)
+    parser.add_argument("--battles", type=int, default=2_000)
+    parser.add_argument("--max-rounds", type=int, default=150)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--workers", type=int, default=1, help="进程数，0 表示全部 CPU 核心")
+    parser.add_argument("--collapsed", metavar="PATH", help="导出火焰图用的折叠调用栈")
+    parser.add_argument("--limit", type=int, default=15)
+    args = parser.parse_args(argv)
+
+    profiler = SkillProfiler()
+    engine = BattleEngine(max_rounds=args.max_rounds, seed=args.seed, profiler=profiler)
+    engine.simulate(REGISTRY.load(args.first), REGISTRY.load(args.second), args.battles, workers=args.workers or None)
+    print(profiler.format_report(args.limit))
+    if args.collapsed:
+        profiler.write_collapsed(args.collapsed)
+
+
+if __name__ == "__main__":
+    main()
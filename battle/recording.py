@@ -0,0 +1,191 @@
+from __future__ import annotations
+
+import importlib
+import json
+import mmap
+import os
+import struct
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator
+
+from .factory import CharacterFactory, factory_name
+
+MAGIC = b"BH3R"
+VERSION = 1
+_PREFIX = struct.Struct("<4sHI")
+# 每场对局一条定长记录：种子、回合数、结果（0 先手方胜，1 后手方胜，2 平局）
+RECORD = struct.Struct("<QHB")
+# 回合数字段为 16 位无符号整数
+MAX_RECORD_ROUNDS = 0xFFFF
+
+
+def outcome_code(outcome: str, name_a: str, name_b: str) -> int:
+    if outcome == name_a:
+        return 0
+    if outcome == name_b:
+        return 1
+    return 2
+
+
+def pack_record(buffer: bytearray, seed: int, rounds: int, code: int) -> None:
+    if rounds > MAX_RECORD_ROUNDS:
+        raise ValueError(f"回合数 {rounds} 超出记录格式上限 {MAX_RECORD_ROUNDS}")
+    buffer.extend(RECORD.pack(seed, rounds, code))
+
+
+def factory_path(factory: CharacterFactory) -> str | None:
+    """模块级类或函数的 "模块:限定名"，lambda 等无法按名导入的 factory 返回 None。"""
+    module = getattr(factory, "__module__", None)
+    qualname = getattr(factory, "__qualname__", "")
+    if not module or "<" in qualname:
+        return None
+    return f"{module}:{qualname}"
+
+
+def resolve_factory(path: str) -> CharacterFactory:
+    module_name, _, qualname = path.partition(":")
+    target: Any = importlib.import_module(module_name)
+    for part in qualname.split("."):
+        target = getattr(target, part)
+    return target
+
+
+@dataclass(frozen=True)
+class RecordedBattle:
+    index: int
+    seed: int
+    rounds: int
+    winner: str
+
+
+class BattleRecorder:
+    """把一组对局按编号顺序写入二进制记录文件。
+
+    文件由定长前缀、JSON 头部（双方 factory、名字、max_rounds 与随机源）和每场 11 字节的记录组成，
+    第 n 场位于 data_offset + n * RECORD.size，无需额外索引即可随机访问。
+    """
+
+    def __init__(
+        self,
+        path: str,
+        factory_a: CharacterFactory,
+        factory_b: CharacterFactory,
+        max_rounds: int,
+        rng: str = "mt",
+    ) -> None:
+        if max_rounds > MAX_RECORD_ROUNDS:
+            raise ValueError(f"max_rounds 为 {max_rounds}，超出记录格式的回合数上限 {MAX_RECORD_ROUNDS}")
+        self.path = path
+        header = {
+            "factory_a": factory_path(factory_a),
+            "factory_b": factory_path(factory_b),
+            "name_a": factory_name(factory_a),
+            "name_b": factory_name(factory_b),
+            "max_rounds": max_rounds,
+            "rng": rng,
+        }
+        payload = json.dumps(header, ensure_ascii=False).encode("utf-8")
+        self._handle = open(path, "wb")
+        self._handle.write(_PREFIX.pack(MAGIC, VERSION, len(payload)))
+        self._handle.write(payload)
+        self.battles = 0
+
+    def write(self, records: bytes) -> None:
+        """追加若干由 pack_record 打包的记录，调用方需保证按对局编号顺序写入。"""
+        self._handle.write(records)
+        self.battles += len(records) // RECORD.size
+
+    def close(self) -> None:
+        self._handle.close()
+
+    def __enter__(self) -> "BattleRecorder":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+
+class BattleRecording:
+    """以内存映射方式读取 BattleRecorder 写出的文件，可按编号取出或重放任意一场对局。"""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._handle = open(path, "rb")
+        size = os.fstat(self._handle.fileno()).st_size
+        self._map = mmap.mmap(self._handle.fileno(), size, access=mmap.ACCESS_READ)
+        magic, version, header_size = _PREFIX.unpack_from(self._map, 0)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"{path} 不是可识别的对局记录文件")
+        start = _PREFIX.size
+        self.header: Dict[str, Any] = json.loads(self._map[start:start + header_size].decode("utf-8"))
+        self.data_offset = start + header_size
+        self._count = (size - self.data_offset) // RECORD.size
+
+    def close(self) -> None:
+        self._map.close()
+        self._handle.close()
+
+    def __enter__(self) -> "BattleRecording":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, index: int) -> RecordedBattle:
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError(index)
+        seed, rounds, code = RECORD.unpack_from(self._map, self.data_offset + index * RECORD.size)
+        return RecordedBattle(index, seed, rounds, self._winner(code))
+
+    def __iter__(self) -> Iterator[RecordedBattle]:
+        for index in range(self._count):
+            seed, rounds, code = RECORD.unpack_from(self._map, self.data_offset + index * RECORD.size)
+            yield RecordedBattle(index, seed, rounds, self._winner(code))
+
+    def _winner(self, code: int) -> str:
+        if code == 0:
+            return self.header["name_a"]
+        if code == 1:
+            return self.header["name_b"]
+        return "draw"
+
+    def replay(
+        self,
+        index: int,
+        *,
+        verbose: bool = True,
+        factory_a: CharacterFactory | None = None,
+        factory_b: CharacterFactory | None = None,
+    ) -> str:
+        """用记录的种子重新进行第 index 场对局并返回结果。
+
+        默认按头部记录的路径导入 factory；录制时使用 lambda 等匿名 factory 的需显式传入。
+        角色或引擎代码改动后结果可能与记录不符，此时抛出 RuntimeError。
+        """
+        from .engine import BattleEngine
+
+        record = self[index]
+        factory_a = factory_a or self._factory("factory_a")
+        factory_b = factory_b or self._factory("factory_b")
+        # 早期的记录文件没有 rng 字段，均使用 Mersenne Twister
+        engine = BattleEngine(max_rounds=self.header["max_rounds"], rng=self.header.get("rng", "mt"))
+        outcome = engine.replay(factory_a, factory_b, record.seed, verbose=verbose)
+        if outcome != record.winner or engine.last_rounds != record.rounds:
+            raise RuntimeError(
+                f"第 {index} 场重放结果（{outcome}，{engine.last_rounds} 回合）与记录"
+                f"（{record.winner}，{record.rounds} 回合）不符，角色或引擎代码可能已改动"
+            )
+        return outcome
+
+    def _factory(self, key: str) -> CharacterFactory:
+        path = self.header.get(key)
+        if not path:
+            raise ValueError(f"记录中没有可导入的 {key}，请显式传入")
+        return resolve_factory(path)
+
@@ -0,0 +1,200 @@
+from __future__ import annotations
+
+import random
+from itertools import chain
+from operator import length_hint
+from typing import Any, Callable, Iterator, List, Protocol, Sequence, Tuple
+
+_np: Any = False
+_MASK64 = (1 << 64) - 1
+_GAMMA = 0x9E3779B97F4A7C15
+_INV_2_53 = 1.0 / (1 << 53)
+# 预取的每局随机数个数；样例角色每局平均约 9 次、97% 的对局不超过 24 次，超出部分成批补算
+DEFAULT_BLOCK_DRAWS = 24
+# 预取块取完后首次补算的随机数个数，之后每次翻倍，至多 MAX_REFILL_DRAWS 个
+REFILL_DRAWS = 32
+MAX_REFILL_DRAWS = 4096
+# 每次批量预取的对局数
+DEFAULT_BLOCK_BATTLES = 4096
+
+
+def derive_seed(base_seed: int, index: int) -> int:
+    """由基准种子与对局编号派生独立的随机种子（splitmix64）。"""
+    z = (base_seed + (index + 1) * _GAMMA) & _MASK64
+    z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & _MASK64
+    z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & _MASK64
+    return z ^ (z >> 31)
+
+
+class RandomStream(Protocol):
+    """对局所需的随机流接口，random.Random 与 BlockRandom 均满足。"""
+
+    def random(self) -> float: ...
+
+    def randint(self, a: int, b: int) -> int: ...
+
+
+class BlockRandom:
+    """计数器式随机流：种子为 s 时第 j 个数为 derive_seed(s, j) 的高 53 位。
+
+    每个数只取决于 (s, j)，因此可以整块预先算好（见 fill_blocks），重新设种子也只是换一组
+    迭代器，不像 Mersenne Twister 那样需要初始化 624 个状态字。random 直接绑定到
+    itertools.chain 的 __next__ 上，取数不经过 Python 层函数（开销与 random.Random 相近）；
+    预取块取完后成批补算，结果与预取多少无关。
+    """
+
+    __slots__ = ("_refill", "random")
+
+    random: Callable[[], float]
+
+    def __init__(self, seed: int = 0) -> None:
+        self._refill = _Refill()
+        self.seed(seed)
+
+    def seed(self, seed: int, block: Sequence[float] | None = None) -> None:
+        """block 为按同一种子预先算好的前若干个数（可省略）。"""
+        self._start(seed & _MASK64, 0, block if block is not None else ())
+
+    def _start(self, seed: int, pos: int, block: Sequence[float]) -> None:
+        # 补算对象随流复用，只在 chain 取完预取块时才开始迭代，重设种子时不必新建
+        draws = iter(block)
+        refill = self._refill
+        refill.seed, refill.start, refill.draws, refill.size = seed, pos, draws, len(block)
+        self.random = chain(draws, refill).__next__
+
+    def randint(self, a: int, b: int) -> int:
+        """返回 [a, b] 间的均匀随机整数（区间远小于 2**53 时偏差可忽略）。"""
+        if a > b:
+            raise ValueError(f"randint 的区间为空：[{a}, {b}]")
+        return a + int(self.random() * (b - a + 1))
+
+    def getstate(self) -> Tuple[int, int]:
+        refill = self._refill
+        return (refill.seed, refill.start + refill.size - length_hint(refill.draws))
+
+    def setstate(self, state: Tuple[int, int]) -> None:
+        """恢复 getstate 的结果；之后的数与预取时取到的值相同。"""
+        seed, pos = state
+        self._start(seed, pos, ())
+
+    def spawn(self, index: int) -> "BlockRandom":
+        """派生第 index 条独立子流，供并行任务拆分使用。"""
+        return BlockRandom(derive_seed(self._refill.seed, index))
+
+    def __reduce__(self) -> Tuple[Any, ...]:
+        # chain 与生成器不可序列化，按 getstate 重建
+        return (_restore, (self.getstate(),))
+
+
+def _restore(state: Tuple[int, int]) -> BlockRandom:
+    rng = BlockRandom()
+    rng.setstate(state)
+    return rng
+
+
+class _Refill:
+    """BlockRandom 预取块之后的补算部分，每次补算的个数从 REFILL_DRAWS 起逐次翻倍。
+
+    draws 为当前块的迭代器，start、size 为其起始编号与长度，供 getstate 换算位置。
+    """
+
+    __slots__ = ("seed", "start", "draws", "size")
+
+    seed: int
+    start: int
+    draws: Iterator[float]
+    size: int
+
+    def __iter__(self) -> Iterator[float]:
+        seed = self.seed
+        count = REFILL_DRAWS
+        while True:
+            pos = self.start + self.size
+            block = fill_blocks([seed], count, pos)
+            if block is None:
+                block = [[(derive_seed(seed, j) >> 11) * _INV_2_53 for j in range(pos, pos + count)]]
+            self.start, self.draws, self.size = pos, iter(block[0]), count
+            yield from self.draws
+            count = min(count * 2, MAX_REFILL_DRAWS)
+
+
+def _numpy() -> Any:
+    """首次预取时才导入 numpy（导入耗时远超其余模块之和，不应拖慢启动与工作进程创建）。"""
+    global _np
+    if _np is False:
+        try:
+            import numpy
+        except ImportError:  # numpy 属可选依赖 fast，缺失时用纯 Python 计算
+            numpy = None
+        _np = numpy
+    return _np
+
+
+def fill_blocks(seeds: Sequence[int], draws: int, start: int = 0) -> List[List[float]] | None:
+    """用 numpy 一次算出每个种子从第 start 个起的 draws 个数；没有 numpy 时返回 None。"""
+    np = _numpy() if seeds and draws > 0 else None
+    if np is None:
+        return None
+    base = np.array(seeds, dtype=np.uint64)[:, None]
+    steps = np.arange(start + 1, start + draws + 1, dtype=np.uint64) * np.uint64(_GAMMA)
+    z = base + steps
+    z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    z = z ^ (z >> np.uint64(31))
+    return ((z >> np.uint64(11)).astype(np.float64) * _INV_2_53).tolist()
+
+
+class RandomSource:
+    """为每局对局提供随机流的来源，默认使用标准库的 Mersenne Twister。"""
+
+    name = "mt"
+
+    def new(self, seed: int) -> RandomStream:
+        return random.Random(seed)
+
+    def streams(self, base_seed: int, start: int, stop: int) -> Iterator[Tuple[int, int, RandomStream]]:
+        """按编号依次产出 (编号, 种子, 随机流)；随机流对象会被复用，只在产出后的这一局内有效。"""
+        rng = random.Random()
+        for index in range(start, stop):
+            seed = derive_seed(base_seed, index)
+            rng.seed(seed)
+            yield index, seed, rng
+
+
+class BlockRandomSource(RandomSource):
+    """使用 BlockRandom 的来源，按 battles 局一批预取随机数。
+
+    与 RandomSource 的随机序列不同，同一 seed 下的对局结果也不同，但同样可复现、
+    与进程数无关。
+    """
+
+    name = "block"
+
+    def __init__(self, draws: int = DEFAULT_BLOCK_DRAWS, battles: int = DEFAULT_BLOCK_BATTLES) -> None:
+        self.draws = draws
+        self.battles = battles
+
+    def new(self, seed: int) -> RandomStream:
+        return BlockRandom(seed)
+
+    def streams(self, base_seed: int, start: int, stop: int) -> Iterator[Tuple[int, int, RandomStream]]:
+        rng = BlockRandom()
+        for lower in range(start, stop, self.battles):
+            upper = min(stop, lower + self.battles)
+            seeds = [derive_seed(base_seed, index) for index in range(lower, upper)]
+            blocks = fill_blocks(seeds, self.draws)
+            for offset, seed in enumerate(seeds):
+                rng.seed(seed, blocks[offset] if blocks is not None else None)
+                yield lower + offset, seed, rng
+
+
+RANDOM_SOURCES = {RandomSource.name: RandomSource, BlockRandomSource.name: BlockRandomSource}
+
+
+def make_source(source: str | RandomSource) -> RandomSource:
+    if isinstance(source, RandomSource):
+        return source
+    try:
+        return RANDOM_SOURCES[source]()
+    except KeyError:
+        raise ValueError(f"未知的随机源 {source!r}，可选：{', '.join(RANDOM_SOURCES)}") from None
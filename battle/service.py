@@ -0,0 +1,507 @@
+"""常驻本地的模拟服务：作业队列、去重、预热的进程池与结果缓存。
+
+反复手动运行 main.py 时，每次都要付出解释器启动、导入与进程池创建的开销。服务启动时
+建好进程池并在每个工作进程中预先导入引擎与注册表中的角色，之后的请求只需把分块发给
+已就绪的进程；小规模查询通常几毫秒即可返回。
+
+协议为按行分隔的 JSON，默认监听 Unix 套接字（平台不支持时或指定 --port 时改用本机
+TCP）。每个请求是一个对象，op 为 simulate、tournament、roster、status 或 ping，可带 id，
+服务返回的每个事件都会原样带上该 id，因此一条连接上可以同时进行多个请求::
+
+    {"id": 1, "op": "simulate", "a": "Kiana", "b": "Bronya", "battles": 10000, "seed": 7}
+    {"id": 1, "event": "accepted", "source": "queued"}
+    {"id": 1, "event": "progress", "battles": 2500, "total": 10000, "counts": {...}}
+    {"id": 1, "event": "result", "battles": 10000, "seed": 7, "counts": {...}}
+
+simulate 与 tournament 的参数（角色、场数、seed、max_rounds、rng）相同的请求视为同一作业：
+已有结果时直接从缓存返回（source 为 cache），正在排队或运行时共享同一次运行（source 为
+shared），后来者从最新的进度开始收到事件。服务及其工作进程不会重新加载模块或规格，
+修改角色源码或规格后需重启服务才会生效；作业键中的 class_fingerprint 只区分同名的不同
+角色类。未给出 seed 时服务为作业抽取一个并在结果中返回，相同的无种子请求复用这一结果。
+
+固定 seed 的 simulate 结果与 BattleEngine(max_rounds, seed, rng=rng).simulate(a, b, battles)
+完全一致，tournament 与 run_tournament 完全一致，与分块方式和进程数无关。
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import signal
+import socket
+import sys
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from typing import Any, AsyncIterator, Dict, Iterator, List, Sequence, Tuple, Type
+
+from characters.base import Character
+from characters.registry import CLASS, REGISTRY
+
+from .cache import class_fingerprint
+from .engine import BattleEngine
+from .parallel import CHUNKS_PER_WORKER, derive_seed, merge_counts, plan_chunks, resolve_workers, simulate_range
+from .tournament import MatchupMatrix, build_matrix, discover_roster
+
+DEFAULT_SOCKET = ".bh3_service.sock"
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+# 与 main.py 及各命令行工具一致
+DEFAULT_BATTLES = 10_000
+DEFAULT_MAX_ROUNDS = 150
+CACHE_SIZE = 256
+# 分块大小的上下限：小查询只发一个分块，大作业至少每 MAX_CHUNK_BATTLES 场报告一次进度
+MIN_CHUNK_BATTLES = 250
+MAX_CHUNK_BATTLES = 5_000
+
+JOB_OPS = ("simulate", "tournament")
+FINAL_EVENTS = ("result", "error")
+
+Event = Dict[str, Any]
+
+
+@dataclass(frozen=True)
+class JobSpec:
+    """一次 simulate 或 tournament 作业的全部参数；seed 为 None 表示由服务抽取。"""
+
+    op: str
+    roster: Tuple[Type[Character], ...]
+    battles: int
+    seed: int | None
+    max_rounds: int
+    rng: str
+
+    @classmethod
+    def parse(cls, request: Dict[str, Any]) -> "JobSpec":
+        op = request.get("op")
+        if op == "simulate":
+            roster = (REGISTRY.load(str(request["a"])), REGISTRY.load(str(request["b"])))
+        elif op == "tournament":
+            keys = request.get("roster")
+            roster = tuple(REGISTRY.load(str(key)) for key in keys) if keys else tuple(discover_roster())
+            if len(roster) < 2:
+                raise ValueError("循环赛至少需要两名角色")
+            names = [klass.name for klass in roster]
+            if len(set(names)) != len(names):
+                raise ValueError("参赛角色的 name 必须互不相同")
+        else:
+            raise ValueError(f"未知的作业类型 {op!r}，可选：{', '.join(JOB_OPS)}")
+        battles = int(request.get("battles", DEFAULT_BATTLES))
+        if battles <= 0:
+            raise ValueError("battles 必须为正数")
+        seed = request.get("seed")
+        spec = cls(
+            op,
+            roster,
+            battles,
+            None if seed is None else int(seed),
+            int(request.get("max_rounds", DEFAULT_MAX_ROUNDS)),
+            str(request.get("rng", "mt")),
+        )
+        # 提前检查随机源名等引擎参数
+        spec.engine(0)
+        return spec
+
+    def key(self) -> Tuple[Any, ...]:
+        fingerprints = tuple(class_fingerprint(klass) for klass in self.roster)
+        return (self.op, fingerprints, self.battles, self.seed, self.max_rounds, self.rng)
+
+    def engine(self, seed: int) -> BattleEngine:
+        return BattleEngine(max_rounds=self.max_rounds, seed=seed, rng=self.rng)
+
+
+class Job:
+    """一次运行及其订阅者；finish 之后的订阅者直接收到最终事件。"""
+
+    def __init__(self, spec: JobSpec) -> None:
+        self.spec = spec
+        self.progress: Event | None = None
+        self.final: Event | None = None
+        self._listeners: List[asyncio.Queue[Event]] = []
+
+    def publish(self, event: Event) -> None:
+        self.progress = event
+        for listener in self._listeners:
+            listener.put_nowait(event)
+
+    def finish(self, event: Event) -> None:
+        self.final = event
+        for listener in self._listeners:
+            listener.put_nowait(event)
+        self._listeners.clear()
+
+    async def follow(self) -> AsyncIterator[Event]:
+        """依次产出最新进度之后的事件，以 result 或 error 结束。"""
+        if self.final is not None:
+            yield self.final
+            return
+        listener: asyncio.Queue[Event] = asyncio.Queue()
+        if self.progress is not None:
+            listener.put_nowait(self.progress)
+        self._listeners.append(listener)
+        try:
+            while True:
+                event = await listener.get()
+                yield event
+                if event["event"] in FINAL_EVENTS:
+                    return
+        finally:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+
+
+def _warm_worker() -> None:
+    """工作进程的初始化：预先导入注册表中的角色类，首个请求无需再导入。"""
+    for info in REGISTRY.entries(CLASS):
+        info.load()
+
+
+def _ready() -> int:
+    return os.getpid()
+
+
+class SimulationService:
+    """作业队列与进程池；max_jobs 为同时运行的作业数，其余作业按提交顺序排队。"""
+
+    def __init__(self, *, workers: int | None = None, max_jobs: int = 2, cache_size: int = CACHE_SIZE) -> None:
+        self.workers = resolve_workers(workers)
+        self.max_jobs = max(1, max_jobs)
+        self.cache_size = cache_size
+        self.stats = {"jobs": 0, "cache_hits": 0, "shared": 0, "errors": 0}
+        self._cache: OrderedDict[Tuple[Any, ...], Event] = OrderedDict()
+        self._active: Dict[Tuple[Any, ...], Job] = {}
+        self._queue: asyncio.Queue[Tuple[Tuple[Any, ...], Job]] = asyncio.Queue()
+        self._seeds = random.Random()
+        self._pool: ProcessPoolExecutor | None = None
+        self._runners: List[asyncio.Task[None]] = []
+
+    async def start(self) -> None:
+        """创建进程池并等待每个工作进程完成预热。"""
+        loop = asyncio.get_running_loop()
+        self._pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_warm_worker)
+        # 同时提交 workers 个任务，进程池才会一次建好全部进程
+        await asyncio.gather(*(loop.run_in_executor(self._pool, _ready) for _ in range(self.workers)))
+        self._runners = [asyncio.create_task(self._run_jobs()) for _ in range(self.max_jobs)]
+
+    async def close(self) -> None:
+        for runner in self._runners:
+            runner.cancel()
+        await asyncio.gather(*self._runners, return_exceptions=True)
+        self._runners = []
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+            self._pool = None
+
+    def submit(self, spec: JobSpec) -> Tuple[Job, str]:
+        """返回作业及其来源：cache（已有结果）、shared（同一作业正在进行）或 queued。"""
+        key = spec.key()
+        cached = self._cache.get(key)
+        if cached is not None:
+            self._cache.move_to_end(key)
+            self.stats["cache_hits"] += 1
+            job = Job(spec)
+            job.finish(cached)
+            return job, "cache"
+        job = self._active.get(key)
+        if job is not None:
+            self.stats["shared"] += 1
+            return job, "shared"
+        job = Job(spec)
+        self._active[key] = job
+        self.stats["jobs"] += 1
+        self._queue.put_nowait((key, job))
+        return job, "queued"
+
+    def status(self) -> Event:
+        return {
+            **self.stats,
+            "workers": self.workers,
+            "queued": self._queue.qsize(),
+            "active": len(self._active),
+            "cached": len(self._cache),
+        }
+
+    async def _run_jobs(self) -> None:
+        while True:
+            key, job = await self._queue.get()
+            try:
+                result = await self._run(job)
+            except asyncio.CancelledError:
+                job.finish({"event": "error", "message": "服务已关闭"})
+                raise
+            except Exception as exc:
+                self.stats["errors"] += 1
+                job.finish({"event": "error", "message": f"{type(exc).__name__}: {exc}"})
+            else:
+                self._cache[key] = result
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+                job.finish(result)
+            finally:
+                self._active.pop(key, None)
+
+    async def _run(self, job: Job) -> Event:
+        spec = job.spec
+        seed = spec.seed if spec.seed is not None else self._seeds.getrandbits(32)
+        engine = spec.engine(seed)
+        if spec.op == "simulate":
+            # 与 BattleEngine.simulate 取同一个基准种子
+            first, second = spec.roster
+            tasks = [(None, first, second, engine.spawn_seed(), 0, spec.battles)]
+        else:
+            # 与 run_tournament 的种子派生一致
+            tournament_seed = engine.spawn_seed()
+            size = len(spec.roster)
+            pairs = [(i, j) for i in range(size) for j in range(i + 1, size)]
+            tasks = [
+                ((i, j), spec.roster[i], spec.roster[j], derive_seed(tournament_seed, index), 0, spec.battles)
+                for index, (i, j) in enumerate(pairs)
+            ]
+        total = len(tasks) * spec.battles
+        counts: Dict[Any, Dict[str, int]] = {pair: {} for pair, *_ in tasks}
+        loop = asyncio.get_running_loop()
+        futures = [
+            self._chunk(loop, pair, engine, first, second, base_seed, start, stop)
+            for pair, first, second, base_seed, lower, upper in tasks
+            for start, stop in self._plan(lower, upper, len(tasks))
+        ]
+        done = 0
+        for future in asyncio.as_completed(futures):
+            pair, chunk = await future
+            merge_counts(counts[pair], chunk)
+            done += sum(chunk.values())
+            if done < total:
+                job.publish(self._progress(spec, done, total, counts))
+        if spec.op == "simulate":
+            first, second = spec.roster
+            results = {first.name: 0, second.name: 0, "draw": 0}
+            return {"event": "result", "battles": spec.battles, "seed": seed, "counts": merge_counts(results, counts[None])}
+        matrix = build_matrix([klass.name for klass in spec.roster], spec.battles, counts)
+        return {"event": "result", "seed": seed, **matrix_payload(matrix)}
+
+    def _plan(self, start: int, stop: int, tasks: int) -> List[Tuple[int, int]]:
+        chunks = max(1, self.workers * CHUNKS_PER_WORKER // tasks)
+        total = stop - start
+        chunks = min(max(chunks, -(-total // MAX_CHUNK_BATTLES)), max(1, total // MIN_CHUNK_BATTLES))
+        return plan_chunks(start, stop, chunks)
+
+    async def _chunk(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        pair: Any,
+        engine: BattleEngine,
+        first: Type[Character],
+        second: Type[Character],
+        base_seed: int,
+        start: int,
+        stop: int,
+    ) -> Tuple[Any, Dict[str, int]]:
+        counts = await loop.run_in_executor(self._pool, simulate_range, engine, first, second, base_seed, start, stop)
+        return pair, counts
+
+    @staticmethod
+    def _progress(spec: JobSpec, done: int, total: int, counts: Dict[Any, Dict[str, int]]) -> Event:
+        event: Event = {"event": "progress", "battles": done, "total": total}
+        if spec.op == "simulate":
+            event["counts"] = dict(counts[None])
+        return event
+
+    # 连接处理
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        lock = asyncio.Lock()
+        tasks: List[asyncio.Task[None]] = []
+
+        async def send(event: Event) -> None:
+            async with lock:
+                writer.write(json.dumps(event, ensure_ascii=False).encode("utf-8") + b"\n")
+                await writer.drain()
+
+        try:
+            while line := await reader.readline():
+                if line.strip():
+                    tasks.append(asyncio.create_task(self._respond(line, send)))
+            await asyncio.gather(*tasks)
+        except ConnectionError:
+            pass
+        finally:
+            for task in tasks:
+                task.cancel()
+            writer.close()
+
+    async def _respond(self, line: bytes, send: Any) -> None:
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ValueError("请求必须是 JSON 对象")
+        except ValueError as exc:
+            await send({"event": "error", "message": f"无法解析请求：{exc}"})
+            return
+        tag = {"id": request["id"]} if "id" in request else {}
+        op = request.get("op")
+        try:
+            if op == "ping":
+                await send({**tag, "event": "result"})
+            elif op == "status":
+                await send({**tag, "event": "result", **self.status()})
+            elif op == "roster":
+                entries = [
+                    {"key": info.key, "name": info.name, "stats": None if info.stats is None else asdict(info.stats)}
+                    for info in REGISTRY.entries()
+                ]
+                await send({**tag, "event": "result", "roster": entries})
+            else:
+                job, source = self.submit(JobSpec.parse(request))
+                await send({**tag, "event": "accepted", "source": source})
+                progress = request.get("progress", True)
+                async for event in job.follow():
+                    if progress or event["event"] in FINAL_EVENTS:
+                        await send({**tag, **event})
+        except ConnectionError:
+            raise
+        except (KeyError, TypeError, ValueError) as exc:
+            message = exc.args[0] if isinstance(exc, KeyError) and exc.args else str(exc)
+            await send({**tag, "event": "error", "message": str(message)})
+        except Exception as exc:
+            # 如损坏的入口点插件导入失败；只回复本请求，不影响同一连接上的其他请求
+            await send({**tag, "event": "error", "message": f"{type(exc).__name__}: {exc}"})
+
+    async def serve(self, *, path: str | None = None, host: str = DEFAULT_HOST, port: int | None = None) -> None:
+        """启动服务直到被取消；port 为 None 时监听 Unix 套接字 path。"""
+        await self.start()
+        loop = asyncio.get_running_loop()
+        task = asyncio.current_task()
+        try:
+            # SIGTERM 时同样关闭进程池并删除套接字文件
+            loop.add_signal_handler(signal.SIGTERM, task.cancel)  # type: ignore[union-attr]
+        except (NotImplementedError, RuntimeError):
+            pass
+        try:
+            if port is None:
+                path = path or DEFAULT_SOCKET
+                if os.path.exists(path):
+                    os.unlink(path)
+                server = await asyncio.start_unix_server(self.handle, path)
+                where = path
+            else:
+                server = await asyncio.start_server(self.handle, host, port)
+                where = f"{host}:{port}"
+            print(f"模拟服务已就绪：{where}（{self.workers} 个工作进程）", file=sys.stderr, flush=True)
+            async with server:
+                await server.serve_forever()
+        finally:
+            await self.close()
+            if port is None and path and os.path.exists(path):
+                os.unlink(path)
+
+
+def matrix_payload(matrix: MatchupMatrix) -> Event:
+    return {
+        "names": matrix.names,
+        "battles": matrix.battles,
+        "win_rates": matrix.win_rates,
+        "draw_rates": matrix.draw_rates,
+    }
+
+
+def request(
+    payload: Dict[str, Any], *, path: str | None = None, host: str = DEFAULT_HOST, port: int | None = None
+) -> Iterator[Event]:
+    """同步客户端：发送一个请求，依次产出服务返回的事件，直到 result 或 error。"""
+    if port is None and hasattr(socket, "AF_UNIX"):
+        connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        connection.connect(path or DEFAULT_SOCKET)
+    else:
+        connection = socket.create_connection((host, port or DEFAULT_PORT))
+    with connection, connection.makefile("rb") as stream:
+        connection.sendall(json.dumps(payload, ensure_ascii=False).encode("utf-8") + b"\n")
+        for line in stream:
+            event = json.loads(line)
+            final = event["event"] in FINAL_EVENTS
+            yield event
+            if final:
+                return
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="常驻本地的模拟服务及其客户端")
+    connection = argparse.ArgumentParser(add_help=False)
+    connection.add_argument("--socket", default=None, help=f"Unix 套接字路径，默认 {DEFAULT_SOCKET}")
+    connection.add_argument("--host", default=DEFAULT_HOST)
+    connection.add_argument("--port", type=int, default=None, help="改用本机 TCP 端口")
+    job = argparse.ArgumentParser(add_help=False)
+    job.add_argument("--battles", type=int, default=DEFAULT_BATTLES)
+    job.add_argument("--max-rounds", type=int, default=DEFAULT_MAX_ROUNDS)
+    job.add_argument("--seed", type=int, default=None)
+    job.add_argument("--rng", default="mt")
+    job.add_argument("--quiet", action="store_true", help="不显示进度")
+    commands = parser.add_subparsers(dest="command", required=True)
+    serve = commands.add_parser("serve", parents=[connection], help="启动服务")
+    serve.add_argument("--workers", type=int, default=None, help="进程数，默认使用全部 CPU 核心")
+    serve.add_argument("--max-jobs", type=int, default=2, help="同时运行的作业数")
+    serve.add_argument("--cache-size", type=int, default=CACHE_SIZE, help="内存中保留的结果数")
+    simulate = commands.add_parser("simulate", parents=[connection, job], help="模拟一组对局")
+    simulate.add_argument("a")
+    simulate.add_argument("b")
+    tournament = commands.add_parser("tournament", parents=[connection, job], help="循环赛")
+    tournament.add_argument("roster", nargs="*", help="角色注册名，默认为全部角色")
+    commands.add_parser("roster", parents=[connection], help="列出可用角色")
+    commands.add_parser("status", parents=[connection], help="查看服务状态")
+    args = parser.parse_args(argv)
+    if args.port is None and not hasattr(socket, "AF_UNIX"):
+        args.port = DEFAULT_PORT
+
+    if args.command == "serve":
+        service = SimulationService(workers=args.workers, max_jobs=args.max_jobs, cache_size=args.cache_size)
+        try:
+            asyncio.run(service.serve(path=args.socket, host=args.host, port=args.port))
+        except (KeyboardInterrupt, asyncio.CancelledError):
+            pass
+        return
+
+    payload: Dict[str, Any] = {"op": args.command}
+    if args.command in JOB_OPS:
+        payload.update(battles=args.battles, max_rounds=args.max_rounds, seed=args.seed, rng=args.rng)
+        payload["progress"] = not args.quiet
+        if args.command == "simulate":
+            payload.update(a=args.a, b=args.b)
+        else:
+            payload["roster"] = args.roster
+    for event in request(payload, path=args.socket, host=args.host, port=args.port):
+        kind = event.pop("event")
+        if kind == "error":
+            sys.exit(f"错误：{event['message']}")
+        if kind == "accepted":
+            print(f"作业来源：{event['source']}", file=sys.stderr)
+        elif kind == "progress":
+            print(f"进度：{event['battles']}/{event['total']}", file=sys.stderr)
+        elif kind == "result":
+            _print_result(args.command, event)
+
+
+def _print_result(command: str, event: Event) -> None:
+    if command == "simulate":
+        battles = event["battles"]
+        for outcome, count in event["counts"].items():
+            label = "平局" if outcome == "draw" else f"{outcome} 胜场"
+            print(f"{label}: {count}, 占比: {count / battles:.2%}")
+        print(f"seed: {event['seed']}")
+    elif command == "tournament":
+        matrix = MatchupMatrix(event["names"], event["battles"], event["win_rates"], event["draw_rates"])
+        print(matrix.format_table())
+        print("-" * 40)
+        for name, rate in sorted(matrix.average_win_rates().items(), key=lambda item: -item[1]):
+            print(f"{name} 平均胜率: {rate:.2%}")
+        print(f"seed: {event['seed']}")
+    elif command == "roster":
+        for entry in event["roster"]:
+            print(f"{entry['key']}: {entry['name']}")
+    else:
+        print(json.dumps(event, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,242 @@
+"""对局中途的快照与分叉。
+
+BattleSnapshot 记录两次行动之间的完整对局状态：双方的 capture_state（HP、属性、通用与
+专属状态、限时效果、回合钩子）、回合与行动计数、本回合尚未行动的一方以及随机流状态。
+快照只含元组、数值与可按引用 pickle 的类和函数，可以发往工作进程；从同一快照出发的
+多次续打（分叉）无需从第 1 回合重放，可用来估计“某一关键时刻之后”的条件胜率。
+"""
+
+from __future__ import annotations
+
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, TextIO, Tuple
+
+from characters.base import BattleContext, Character
+
+from .factory import CharacterFactory, factory_name
+from .parallel import CHUNKS_PER_WORKER, merge_counts, plan_chunks, resolve_workers
+from .rng import RandomStream, make_source
+from .specialize import matchup_loop
+
+if TYPE_CHECKING:
+    from .engine import BattleEngine
+
+# 快照条件：在每次行动之前以 (fighter_a, fighter_b, context) 调用
+SnapshotCondition = Callable[[Character, Character, BattleContext], bool]
+
+
+@dataclass(frozen=True)
+class BattleSnapshot:
+    """两次行动之间的对局状态。
+
+    pending 为本回合尚未行动的一方（True 表示 fighter_a），为空时下一步开始新回合。
+    rng_state 为随机流的 getstate() 结果，rng 为其随机源名（见 battle.rng）。
+    """
+
+    factory_a: CharacterFactory
+    factory_b: CharacterFactory
+    state_a: tuple
+    state_b: tuple
+    round_index: int
+    turn_index: int
+    pending: Tuple[bool, ...]
+    rng: str
+    rng_state: Any
+
+    @property
+    def hp(self) -> Tuple[float, float]:
+        return (self.state_a[0], self.state_b[0])
+
+    def restore_fighters(self, fighter_a: Character, fighter_b: Character) -> None:
+        """把两个已有的角色实例原地恢复到快照时的状态。"""
+        fighter_a.restore_state(self.state_a)
+        fighter_b.restore_state(self.state_b)
+
+    def fighters(self) -> Tuple[Character, Character]:
+        fighter_a, fighter_b = self.factory_a(), self.factory_b()
+        self.restore_fighters(fighter_a, fighter_b)
+        return fighter_a, fighter_b
+
+    def random_stream(self) -> RandomStream:
+        """按快照时的状态重建随机流，续打结果与原对局完全一致。"""
+        rng = make_source(self.rng).new(0)
+        rng.setstate(self.rng_state)  # type: ignore[attr-defined]
+        return rng
+
+    def context(self, rng: RandomStream) -> BattleContext:
+        context = BattleContext(rng)
+        context.round_index = self.round_index
+        context.turn_index = self.turn_index
+        return context
+
+
+class BattleSession:
+    """逐个行动推进的对局，可在任意两次行动之间拍摄快照。
+
+    与 BattleEngine._play 的流程与随机数消耗完全一致；每个 step 执行一次行动
+    （新回合开始时先决定行动顺序）。
+    """
+
+    def __init__(
+        self,
+        engine: "BattleEngine",
+        fighter_a: Character,
+        fighter_b: Character,
+        context: BattleContext,
+        rng: RandomStream,
+        *,
+        pending: Tuple[bool, ...] = (),
+        out: TextIO | None = None,
+    ) -> None:
+        self.engine = engine
+        self.fighter_a = fighter_a
+        self.fighter_b = fighter_b
+        self.context = context
+        self.rng = rng
+        self.out = out
+        self.outcome: str | None = None
+        self._pending: List[bool] = list(pending)
+
+    def snapshot(self, factory_a: CharacterFactory, factory_b: CharacterFactory) -> BattleSnapshot:
+        getstate = getattr(self.rng, "getstate", None)
+        if getstate is None:
+            raise TypeError(f"随机流 {type(self.rng).__name__} 不支持 getstate，无法拍摄快照")
+        return BattleSnapshot(
+            factory_a,
+            factory_b,
+            self.fighter_a.capture_state(),
+            self.fighter_b.capture_state(),
+            self.context.round_index,
+            self.context.turn_index,
+            tuple(self._pending),
+            self.engine.random_source.name,
+            getstate(),
+        )
+
+    def step(self) -> bool:
+        """执行一次行动，对局结束时返回 False（结果见 outcome）。"""
+        if self.outcome is not None:
+            return False
+        fighter_a, fighter_b, context = self.fighter_a, self.fighter_b, self.context
+        while not self._pending:
+            if not (fighter_a.is_alive() and fighter_b.is_alive() and context.round_index < self.engine.max_rounds):
+                if fighter_a.hp == fighter_b.hp:
+                    self.outcome = "draw"
+                else:
+                    self.outcome = fighter_a.name if fighter_a.hp > fighter_b.hp else fighter_b.name
+                return False
+            context.round_index += 1
+            if self.out is not None:
+                self.out.write(f"=== 第 {context.round_index} 回合 ===\n")
+            order = self.engine._decide_order(fighter_a, fighter_b, self.rng)
+            self._pending = [attacker is fighter_a for attacker, _ in order]
+        if self._pending.pop(0):
+            attacker, defender = fighter_a, fighter_b
+        else:
+            attacker, defender = fighter_b, fighter_a
+        if not attacker.is_alive():
+            return True
+        context.turn_index += 1
+        context.actor = attacker
+        attacker.take_turn(defender, context)
+        logs = context.consume_turn_log()
+        if self.out is not None:
+            self.engine._write_turn_logs(self.out, attacker, defender, logs)
+        attacker_alive = attacker.is_alive()
+        defender_alive = defender.is_alive()
+        if not defender_alive and not attacker_alive:
+            self.outcome = "draw"
+        elif not defender_alive:
+            self.outcome = attacker.name
+        elif not attacker_alive:
+            self.outcome = defender.name
+        return self.outcome is None
+
+    def run(self) -> str:
+        """打完剩余的对局。静默时在当前回合结束后改用专用主循环（见 battle.specialize）。"""
+        while self._pending and self.step():
+            pass
+        if self.outcome is None and self.out is None and self.engine.specialize:
+            play = matchup_loop(type(self.fighter_a), type(self.fighter_b))
+            if play is not None:
+                self.outcome = play(
+                    self.fighter_a, self.fighter_b, self.context, self.rng, self.engine.max_rounds,
+                    self.context.round_index,
+                )
+        while self.step():
+            pass
+        return self.outcome  # type: ignore[return-value]
+
+
+def capture_snapshot(
+    engine: "BattleEngine",
+    factory_a: CharacterFactory,
+    factory_b: CharacterFactory,
+    when: SnapshotCondition,
+    seed: int,
+) -> BattleSnapshot | None:
+    """以 seed 进行一局，在 when 第一次成立的行动之前拍摄快照；对局先结束时返回 None。"""
+    rng = engine.random_source.new(seed)
+    session = BattleSession(engine, factory_a(), factory_b(), BattleContext(rng), rng)
+    while True:
+        if when(session.fighter_a, session.fighter_b, session.context):
+            return session.snapshot(factory_a, factory_b)
+        if not session.step():
+            return None
+
+
+def resume_snapshot(
+    engine: "BattleEngine",
+    snapshot: BattleSnapshot,
+    rng: RandomStream,
+    *,
+    fighters: Tuple[Character, Character] | None = None,
+    out: TextIO | None = None,
+) -> Tuple[str, BattleContext]:
+    """从快照续打到结束，返回 (结果, 对局上下文)。传入 fighters 时原地复用这两个实例。"""
+    if fighters is None:
+        fighter_a, fighter_b = snapshot.fighters()
+    else:
+        fighter_a, fighter_b = fighters
+        snapshot.restore_fighters(fighter_a, fighter_b)
+    context = snapshot.context(rng)
+    context.set_logging(out is not None)
+    session = BattleSession(engine, fighter_a, fighter_b, context, rng, pending=snapshot.pending, out=out)
+    return session.run(), context
+
+
+def fork_range(
+    engine: "BattleEngine", snapshot: BattleSnapshot, base_seed: int, start: int, stop: int
+) -> Dict[str, int]:
+    """从快照出发续打编号 [start, stop) 的分叉，第 i 个分叉使用 derive_seed(base_seed, i) 的随机流。"""
+    fighters = (snapshot.factory_a(), snapshot.factory_b())
+    counts: Dict[str, int] = {}
+    for _, _, rng in engine.random_source.streams(base_seed, start, stop):
+        outcome, _ = resume_snapshot(engine, snapshot, rng, fighters=fighters)
+        counts[outcome] = counts.get(outcome, 0) + 1
+    return counts
+
+
+def fork_snapshot(
+    engine: "BattleEngine",
+    snapshot: BattleSnapshot,
+    continuations: int,
+    *,
+    workers: int | None = 1,
+) -> Dict[str, int]:
+    name_a = factory_name(snapshot.factory_a)
+    name_b = factory_name(snapshot.factory_b)
+    results = {name_a: 0, name_b: 0, "draw": 0}
+    worker_count = resolve_workers(workers)
+    base_seed = engine.spawn_seed()
+    ranges = plan_chunks(0, continuations, worker_count * CHUNKS_PER_WORKER)
+    if worker_count <= 1 or len(ranges) <= 1:
+        for start, stop in ranges:
+            merge_counts(results, fork_range(engine, snapshot, base_seed, start, stop))
+        return results
+    with ProcessPoolExecutor(max_workers=worker_count) as pool:
+        futures = [pool.submit(fork_range, engine, snapshot, base_seed, start, stop) for start, stop in ranges]
+        for future in futures:
+            merge_counts(results, future.result())
+    return results
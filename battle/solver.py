@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any, Dict, List, Sequence, Tuple
+
+from characters.base import BattleContext
+
+if TYPE_CHECKING:
+    from .factory import CharacterFactory
+
+StatePair = Tuple[tuple, tuple]
+# 一个回合的所有结局：(双方状态, 该结局的概率)
+Transitions = List[Tuple[StatePair, float]]
+
+
+class _ForbiddenRng:
+    """精确求解时禁止直接使用 rng，随机分支必须经由 context.chance/randint。"""
+
+    def __getattr__(self, name: str) -> Any:
+        raise RuntimeError("精确求解要求技能通过 context.chance/randint 发起随机分支，而不是直接调用 context.rng")
+
+
+class BranchingContext(BattleContext):
+    """按给定的分支路径回放随机结果，并记录途经的每个分支点。"""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.rng = _ForbiddenRng()  # type: ignore[assignment]
+        self._path: Sequence[int] = ()
+        self.trace: List[Tuple[int, int]] = []
+        self.probability = 1.0
+
+    def replay(self, path: Sequence[int]) -> None:
+        self._path = path
+        self.trace = []
+        self.probability = 1.0
+
+    def chance(self, probability: float, skill: str | None = None) -> bool:
+        if probability >= 1.0:
+            return True
+        if probability <= 0.0:
+            return False
+        if self._choose(2) == 0:
+            self.probability *= probability
+            return True
+        self.probability *= 1.0 - probability
+        return False
+
+    def randint(self, low: int, high: int) -> int:
+        count = high - low + 1
+        index = self._choose(count)
+        self.probability /= count
+        return low + index
+
+    def _choose(self, count: int) -> int:
+        position = len(self.trace)
+        index = self._path[position] if position < len(self._path) else 0
+        self.trace.append((index, count))
+        return index
+
+
+class ExactSolver:
+    """逐回合传播战斗状态的概率分布，得到不含采样误差的胜负概率。
+
+    状态包括双方的 HP、common_status、unique_status 与回合钩子（见 Character.capture_state），
+    相同状态会被合并，单个行动的所有随机结局也会缓存。求解要求角色的全部随机性都通过
+    context.chance/randint 表达，并且不依赖 context.turn_index。
+    """
+
+    def __init__(self, factory_a: "CharacterFactory", factory_b: "CharacterFactory", max_rounds: int) -> None:
+        self.fighter_a = factory_a()
+        self.fighter_b = factory_b()
+        self.max_rounds = max_rounds
+        self._context = BranchingContext()
+        self._transitions: Dict[Tuple[StatePair, bool], Transitions] = {}
+
+    def solve(self) -> Dict[str, float]:
+        fighter_a, fighter_b = self.fighter_a, self.fighter_b
+        results = {fighter_a.name: 0.0, fighter_b.name: 0.0, "draw": 0.0}
+        distribution: Dict[StatePair, float] = {
+            (fighter_a.capture_state(), fighter_b.capture_state()): 1.0
+        }
+
+        for _ in range(self.max_rounds):
+            if not distribution:
+                break
+            next_distribution: Dict[StatePair, float] = {}
+            for state, probability in distribution.items():
+                for a_first, order_probability in self._turn_orders(state):
+                    self._play_round(state, probability * order_probability, a_first, results, next_distribution)
+            distribution = next_distribution
+
+        for (state_a, state_b), probability in distribution.items():
+            hp_a, hp_b = state_a[0], state_b[0]
+            if hp_a == hp_b:
+                results["draw"] += probability
+            elif hp_a > hp_b:
+                results[fighter_a.name] += probability
+            else:
+                results[fighter_b.name] += probability
+        return results
+
+    def _turn_orders(self, state: StatePair) -> List[Tuple[bool, float]]:
+        self._restore(state)
+        speed_a = self.fighter_a.get_effective_speed()
+        speed_b = self.fighter_b.get_effective_speed()
+        if speed_a == speed_b:
+            return [(True, 0.5), (False, 0.5)]
+        return [(speed_a > speed_b, 1.0)]
+
+    def _play_round(
+        self,
+        state: StatePair,
+        probability: float,
+        a_first: bool,
+        results: Dict[str, float],
+        next_distribution: Dict[StatePair, float],
+    ) -> None:
+        for middle, first_probability in self._expand_turn(state, a_first):
+            mass = probability * first_probability
+            if self._settle(middle, mass, results):
+                continue
+            for final, second_probability in self._expand_turn(middle, not a_first):
+                final_mass = mass * second_probability
+                if self._settle(final, final_mass, results):
+                    continue
+                next_distribution[final] = next_distribution.get(final, 0.0) + final_mass
+
+    def _settle(self, state: StatePair, probability: float, results: Dict[str, float]) -> bool:
+        """与 BattleEngine.fight 相同的结算顺序：同归于尽为平局，否则存活者获胜。"""
+        alive_a = state[0][0] > 0
+        alive_b = state[1][0] > 0
+        if alive_a and alive_b:
+            return False
+        if not alive_a and not alive_b:
+            results["draw"] += probability
+        elif alive_a:
+            results[self.fighter_a.name] += probability
+        else:
+            results[self.fighter_b.name] += probability
+        return True
+
+    def _expand_turn(self, state: StatePair, attacker_is_a: bool) -> Transitions:
+        key = (state, attacker_is_a)
+        cached = self._transitions.get(key)
+        if cached is not None:
+            return cached
+
+        context = self._context
+        outcomes: Dict[StatePair, float] = {}
+        path: List[int] = []
+        while True:
+            self._restore(state)
+            context.replay(path)
+            if attacker_is_a:
+                self.fighter_a.take_turn(self.fighter_b, context)
+            else:
+                self.fighter_b.take_turn(self.fighter_a, context)
+            result = (self.fighter_a.capture_state(), self.fighter_b.capture_state())
+            outcomes[result] = outcomes.get(result, 0.0) + context.probability
+
+            trace = context.trace
+            while trace and trace[-1][0] + 1 >= trace[-1][1]:
+                trace.pop()
+            if not trace:
+                break
+            path = [index for index, _ in trace[:-1]]
+            path.append(trace[-1][0] + 1)
+
+        transitions = list(outcomes.items())
+        self._transitions[key] = transitions
+        return transitions
+
+    def _restore(self, state: StatePair) -> None:
+        self.fighter_a.restore_state(state[0])
+        self.fighter_b.restore_state(state[1])
+
+
+def solve_exact(
+    factory_a: "CharacterFactory", factory_b: "CharacterFactory", max_rounds: int
+) -> Dict[str, float]:
+    return ExactSolver(factory_a, factory_b, max_rounds).solve()
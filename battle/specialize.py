@@ -0,0 +1,193 @@
+"""按对局双方的角色类生成专用的静默对局主循环。
+
+通用路径中每次行动都要经过 Character.take_turn 的完整流程：回合开始日志、被动封锁、
+回合钩子、三次阵亡检查、主动技能判定、普通攻击目标选择等，即使角色根本没有覆写相应的
+方法。这里在第一次遇到某一对角色类时检查双方实际覆写了哪些方法，生成一份只包含必要
+步骤的主循环源码并编译，按 (类, 类) 缓存：
+
+- 未覆写的 passive_skill、can_use_active_skill 整段省略；
+- 未覆写的 on_turn_start/on_turn_end、阵亡检查、行动顺序与目标选择直接内联；
+- 攻击方使用默认普通攻击、防守方未覆写 receive_damage 时，伤害结算内联为一次 HP 扣减。
+
+限时效果仍在运行时判定（对手随时可能施加），但没有效果时只需一次列表判空。属性（Stats）
+在战斗中允许被技能改写，因此伤害按原式现算而不是预先算好。生成的循环与通用路径消耗的
+随机数与结果完全一致，只在不输出日志、不收集指标、不做性能分析时使用；这些情况下
+context.phase 也不再更新。
+"""
+
+from __future__ import annotations
+
+import linecache
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Type
+
+from characters.base import Character
+from characters.effects import PASSIVE, TURN_END, TURN_START, Confusion, DamageReduction, Slow
+
+# (fighter_a, fighter_b, context, rng, max_rounds[, 已完成的回合数]) -> 结果
+MatchupLoop = Callable[..., str]
+
+# 覆写了任一方法的角色按原样调用 take_turn
+_OPAQUE = ("take_turn", "_abort_turn_if_dead")
+# EffectTable 中各时机对应的列表属性
+_PHASE_LISTS = {PASSIVE: "passive", TURN_START: "turn_start", TURN_END: "turn_end"}
+
+
+def _overrides(cls: Type[Character], method: str) -> bool:
+    return getattr(cls, method) is not getattr(Character, method)
+
+
+@lru_cache(maxsize=None)
+def matchup_loop(cls_a: Type[Character], cls_b: Type[Character]) -> MatchupLoop | None:
+    """返回 cls_a 对 cls_b 的专用主循环，同一对类只生成一次。
+
+    任一方覆写了 is_alive 时主循环无法内联存活判断，返回 None，由调用方走通用路径。
+    """
+    if _overrides(cls_a, "is_alive") or _overrides(cls_b, "is_alive"):
+        return None
+    writer = _LoopWriter(cls_a, cls_b)
+    source = writer.source()
+    filename = f"<matchup {cls_a.__module__}.{cls_a.__qualname__} vs {cls_b.__module__}.{cls_b.__qualname__}>"
+    linecache.cache[filename] = (len(source), None, source.splitlines(True), filename)
+    scope: Dict[str, Any] = {
+        "PASSIVE": PASSIVE,
+        "TURN_START": TURN_START,
+        "TURN_END": TURN_END,
+        "CONFUSION": Confusion.kind,
+        "DAMAGE_REDUCTION": DamageReduction.kind,
+        "SLOW": Slow.kind,
+    }
+    exec(compile(source, filename, "exec"), scope)
+    play = scope["play"]
+    play.source = source
+    return play
+
+
+class _LoopWriter:
+    def __init__(self, cls_a: Type[Character], cls_b: Type[Character]) -> None:
+        self.lines: List[str] = []
+        self._turn("turn_ab", cls_a, cls_b)
+        self._turn("turn_ba", cls_b, cls_a)
+        self._loop(cls_a, cls_b)
+
+    def source(self) -> str:
+        return "\n".join(self.lines) + "\n"
+
+    def _emit(self, depth: int, text: str) -> None:
+        self.lines.append("    " * depth + text)
+
+    # 单次行动，与 Character.take_turn 在静默模式下等价
+
+    def _turn(self, name: str, cls: Type[Character], target_cls: Type[Character]) -> None:
+        if any(_overrides(cls, method) for method in _OPAQUE):
+            self._emit(0, f"def {name}(self, target, context):")
+            self._emit(1, "self.take_turn(target, context)")
+            self._emit(0, "")
+            return
+        has_passive = _overrides(cls, "passive_skill")
+        self._emit(0, f"def {name}(self, target, context):")
+        self._emit(1, "effects = self.effects")
+        if has_passive:
+            self._emit(1, "passive_blocked = bool(effects.passive) and effects.tick(PASSIVE, self, context)")
+        else:
+            self._emit(1, "if effects.passive:")
+            self._emit(2, "effects.tick(PASSIVE, self, context)")
+
+        if _overrides(cls, "on_turn_start"):
+            self._emit(1, "if not self.on_turn_start(context):")
+        else:
+            self._emit(1, "if self._turn_hooks:")
+            self._emit(2, 'self._run_turn_hooks("start", context)')
+            self._emit(1, f"if effects.{_PHASE_LISTS[TURN_START]} and effects.tick(TURN_START, self, context):")
+        self._turn_end(2, cls)
+        self._emit(2, "return")
+        self._abort(1)
+
+        if has_passive:
+            self._emit(1, "if not passive_blocked:")
+            self._emit(2, "self.passive_skill(context)")
+            self._abort(2)
+        if _overrides(cls, "can_use_active_skill"):
+            self._emit(1, "if self.can_use_active_skill(target, context):")
+            self._emit(2, "self.active_skill(target, context)")
+            self._abort(2)
+
+        self._normal_attack(cls, target_cls)
+        self._abort(1)
+        self._turn_end(1, cls)
+        self._emit(0, "")
+
+    def _abort(self, depth: int) -> None:
+        self._emit(depth, "if self.hp <= 0:")
+        self._emit(depth + 1, "return")
+
+    def _turn_end(self, depth: int, cls: Type[Character]) -> None:
+        if _overrides(cls, "on_turn_end"):
+            self._emit(depth, "self.on_turn_end(context)")
+            return
+        self._emit(depth, f"if effects.{_PHASE_LISTS[TURN_END]}:")
+        self._emit(depth + 1, "effects.tick(TURN_END, self, context)")
+        self._emit(depth, "if self._turn_hooks:")
+        self._emit(depth + 1, 'self._run_turn_hooks("end", context)')
+
+    def _normal_attack(self, cls: Type[Character], target_cls: Type[Character]) -> None:
+        if _overrides(cls, "get_normal_attack_target"):
+            self._emit(1, "self.perform_normal_attack(self.get_normal_attack_target(target, context), context)")
+            return
+        confused = f"effects.{_PHASE_LISTS[Confusion.phase]} and effects.remaining(CONFUSION) > 0"
+        inline = not (
+            _overrides(cls, "perform_normal_attack")
+            or _overrides(cls, "basic_attack")
+            or _overrides(target_cls, "receive_damage")
+        )
+        if not inline:
+            self._emit(1, f"self.perform_normal_attack(self if {confused} else target, context)")
+            return
+        # 混乱时打自己，走通用路径；否则内联 basic_attack 与 receive_damage
+        self._emit(1, f"if {confused}:")
+        self._emit(2, "self.perform_normal_attack(self, context)")
+        self._emit(1, "else:")
+        self._emit(2, "amount = max(1.0, self.stats.attack - target.stats.defense)")
+        self._emit(2, "target_effects = target.effects")
+        self._emit(2, f"if target_effects.{_PHASE_LISTS[DamageReduction.phase]}:")
+        self._emit(3, "amount = max(0.0, amount - target_effects.value(DAMAGE_REDUCTION))")
+        self._emit(2, "target.hp -= amount")
+
+    # 主循环，与 BattleEngine._play 在静默模式下等价
+
+    def _speed(self, var: str, fighter: str, cls: Type[Character]) -> None:
+        if _overrides(cls, "get_effective_speed"):
+            self._emit(2, f"{var} = {fighter}.get_effective_speed()")
+            return
+        self._emit(2, f"{var} = {fighter}.stats.speed + {fighter}.common_status.speed_bonus")
+        self._emit(2, f"if {fighter}.effects.{_PHASE_LISTS[Slow.phase]}:")
+        self._emit(3, f"{var} -= {fighter}.effects.remaining(SLOW)")
+        self._emit(2, f"{var} = max(1.0, {var})")
+
+    def _play_turn(self, depth: int, turn: str, attacker: str, defender: str) -> None:
+        self._emit(depth, "context.turn_index += 1")
+        self._emit(depth, f"context.actor = {attacker}")
+        self._emit(depth, f"{turn}({attacker}, {defender}, context)")
+        self._emit(depth, f"if {defender}.hp <= 0:")
+        self._emit(depth + 1, f'return "draw" if {attacker}.hp <= 0 else {attacker}.name')
+        self._emit(depth, f"if {attacker}.hp <= 0:")
+        self._emit(depth + 1, f"return {defender}.name")
+
+    def _loop(self, cls_a: Type[Character], cls_b: Type[Character]) -> None:
+        self._emit(0, "def play(fighter_a, fighter_b, context, rng, max_rounds, rounds=0):")
+        self._emit(1, "while fighter_a.hp > 0 and fighter_b.hp > 0 and rounds < max_rounds:")
+        self._emit(2, "rounds += 1")
+        self._emit(2, "context.round_index = rounds")
+        self._speed("speed_a", "fighter_a", cls_a)
+        self._speed("speed_b", "fighter_b", cls_b)
+        self._emit(2, "a_first = rng.random() < 0.5 if speed_a == speed_b else speed_a > speed_b")
+        self._emit(2, "if a_first:")
+        # 先手行动后双方都还存活才会轮到后手，因此无需再判断后手是否存活
+        self._play_turn(3, "turn_ab", "fighter_a", "fighter_b")
+        self._play_turn(3, "turn_ba", "fighter_b", "fighter_a")
+        self._emit(2, "else:")
+        self._play_turn(3, "turn_ba", "fighter_b", "fighter_a")
+        self._play_turn(3, "turn_ab", "fighter_a", "fighter_b")
+        self._emit(1, "if fighter_a.hp == fighter_b.hp:")
+        self._emit(2, 'return "draw"')
+        self._emit(1, "return fighter_a.name if fighter_a.hp > fighter_b.hp else fighter_b.name")
@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+import csv
+import io
+import json
+import os
+from dataclasses import asdict, dataclass, field
+from typing import TYPE_CHECKING, BinaryIO, Dict, Sequence
+
+from .factory import CharacterFactory
+from .tracing import BattleSummary, SummarySink
+
+if TYPE_CHECKING:
+    from .engine import BattleEngine
+
+SINK_BUFFER_SIZE = 1 << 20
+CSV_FIELDS = ("index", "seed", "winner", "rounds", "hp_a", "hp_b")
+
+
+@dataclass
+class SimulationProgress:
+    """流式模拟每完成一批对局产出一次的累计结果。"""
+
+    battles: int
+    total: int
+    counts: Dict[str, int]
+    base_seed: int
+
+    @property
+    def done(self) -> bool:
+        return self.battles >= self.total
+
+    def win_rate(self, name: str) -> float:
+        return self.counts.get(name, 0) / self.battles if self.battles else 0.0
+
+
+@dataclass
+class StreamCheckpoint:
+    """恢复一次流式模拟所需的全部状态；sink_offset 为输出文件在该检查点时的字节长度。
+
+    rng 为随机源名（见 battle.rng），缺少该字段的旧检查点按默认的 "mt" 处理。
+    """
+
+    name_a: str
+    name_b: str
+    max_rounds: int
+    base_seed: int
+    battles: int
+    counts: Dict[str, int] = field(default_factory=dict)
+    sink_offset: int | None = None
+    rng: str = "mt"
+
+    def save(self, path: str) -> None:
+        """先写临时文件再替换，中途崩溃时旧检查点保持完整。"""
+        temp = f"{path}.tmp"
+        with open(temp, "w", encoding="utf-8") as handle:
+            json.dump(asdict(self), handle, ensure_ascii=False)
+        os.replace(temp, path)
+
+    @classmethod
+    def load(cls, path: str) -> "StreamCheckpoint":
+        with open(path, encoding="utf-8") as handle:
+            return cls(**json.load(handle))
+
+
+class RecordFileSink(SummarySink):
+    """把每场对局的概要成批写入文件的输出端，以二进制模式写入以便按字节截断续写。"""
+
+    def __init__(self, path: str, *, buffer_size: int = SINK_BUFFER_SIZE) -> None:
+        self.path = path
+        self.buffer_size = buffer_size
+        self._handle: BinaryIO | None = None
+
+    def open(self, offset: int | None = None) -> None:
+        """offset 为 None 时新建文件，否则截断到 offset 处继续追加（用于从检查点恢复）。"""
+        if self._handle is not None:
+            return
+        if offset is None:
+            self._handle = open(self.path, "wb", buffering=self.buffer_size)
+            self._handle.write(self.header().encode("utf-8"))
+            return
+        self._handle = open(self.path, "r+b", buffering=self.buffer_size)
+        self._handle.truncate(offset)
+        self._handle.seek(offset)
+
+    def close(self) -> None:
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
+
+    def position(self) -> int:
+        """落盘后的文件长度，写入检查点。"""
+        assert self._handle is not None
+        self._handle.flush()
+        return self._handle.tell()
+
+    def write_batch(
+        self,
+        summaries: Sequence[BattleSummary],
+        factory_a: CharacterFactory,
+        factory_b: CharacterFactory,
+        engine: "BattleEngine",
+    ) -> None:
+        assert self._handle is not None
+        self._handle.write(self.format(summaries).encode("utf-8"))
+
+    def header(self) -> str:
+        return ""
+
+    def format(self, summaries: Sequence[BattleSummary]) -> str:
+        raise NotImplementedError
+
+
+class JsonlSink(RecordFileSink):
+    """每行一个 JSON 对象：index、seed、winner、rounds、hp_a、hp_b。"""
+
+    def format(self, summaries: Sequence[BattleSummary]) -> str:
+        return "".join(
+            json.dumps(
+                {
+                    "index": summary.index,
+                    "seed": summary.seed,
+                    "winner": summary.winner,
+                    "rounds": summary.rounds,
+                    "hp_a": summary.hp_a,
+                    "hp_b": summary.hp_b,
+                },
+                ensure_ascii=False,
+            )
+            + "\n"
+            for summary in summaries
+        )
+
+
+class CsvSink(RecordFileSink):
+    def header(self) -> str:
+        return ",".join(CSV_FIELDS) + "\r\n"
+
+    def format(self, summaries: Sequence[BattleSummary]) -> str:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerows(
+            (summary.index, summary.seed, summary.winner, summary.rounds, summary.hp_a, summary.hp_b)
+            for summary in summaries
+        )
+        return buffer.getvalue()
@@ -0,0 +1,207 @@
+from __future__ import annotations
+
+import argparse
+import csv
+import inspect
+import json
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, List, Sequence, Tuple, Type
+
+from characters.base import Character
+from characters.registry import CLASS, REGISTRY
+
+from .cache import PendingRun, ResultCache
+from .engine import BattleEngine
+from .parallel import (
+    CHUNKS_PER_WORKER,
+    derive_seed,
+    merge_counts,
+    plan_chunks,
+    resolve_workers,
+    simulate_range,
+    simulate_chunk,
+)
+
+Pair = Tuple[int, int]
+
+
+def discover_roster() -> List[Type[Character]]:
+    """按注册顺序（同一模块内即定义顺序）返回注册表中所有可以无参构造的角色类。
+
+    只导入登记的模块，不构造角色，也不收入其他途径导入的 Character 子类；__init__ 有
+    必需参数的类与抽象类跳过。由规格编译出的角色（characters.specs）需显式加载，不在此列。
+    """
+    roster: List[Type[Character]] = []
+    for info in REGISTRY.entries(CLASS):
+        cls = info.load()
+        if cls not in roster and _constructible(cls):
+            roster.append(cls)
+    return roster
+
+
+def _constructible(cls: Type[Character]) -> bool:
+    if inspect.isabstract(cls):
+        return False
+    try:
+        parameters = inspect.signature(cls).parameters.values()
+    except (TypeError, ValueError):
+        return False
+    return all(
+        parameter.default is not parameter.empty or parameter.kind in (parameter.VAR_POSITIONAL, parameter.VAR_KEYWORD)
+        for parameter in parameters
+    )
+
+
+@dataclass
+class MatchupMatrix:
+    """循环赛结果：win_rates[i][j] 为 names[i] 对 names[j] 的胜率，对角线为 None。"""
+
+    names: List[str]
+    battles: int
+    win_rates: List[List[float | None]]
+    draw_rates: List[List[float | None]]
+    counts: Dict[Pair, Dict[str, int]] = field(default_factory=dict)
+
+    def win_rate(self, name_a: str, name_b: str) -> float | None:
+        return self.win_rates[self.names.index(name_a)][self.names.index(name_b)]
+
+    def average_win_rates(self) -> Dict[str, float]:
+        """每个角色对其余所有角色的平均胜率。"""
+        averages: Dict[str, float] = {}
+        for name, row in zip(self.names, self.win_rates):
+            rates = [rate for rate in row if rate is not None]
+            averages[name] = sum(rates) / len(rates) if rates else 0.0
+        return averages
+
+    def to_csv(self, path: str) -> None:
+        with open(path, "w", newline="", encoding="utf-8") as handle:
+            writer = csv.writer(handle)
+            writer.writerow(["", *self.names])
+            for name, row in zip(self.names, self.win_rates):
+                writer.writerow([name, *("" if rate is None else f"{rate:.4f}" for rate in row)])
+
+    def to_json(self, path: str) -> None:
+        payload = {
+            "names": self.names,
+            "battles": self.battles,
+            "win_rates": self.win_rates,
+            "draw_rates": self.draw_rates,
+        }
+        with open(path, "w", encoding="utf-8") as handle:
+            json.dump(payload, handle, ensure_ascii=False, indent=2)
+
+    def format_table(self) -> str:
+        width = max(8, *(len(name) * 2 for name in self.names))
+        lines = ["".ljust(width) + "".join(name.ljust(width) for name in self.names)]
+        for name, row in zip(self.names, self.win_rates):
+            cells = "".join(("-" if rate is None else f"{rate:.2%}").ljust(width) for rate in row)
+            lines.append(name.ljust(width) + cells)
+        return "\n".join(lines)
+
+
+def run_tournament(
+    engine: BattleEngine,
+    roster: Sequence[Type[Character]] | None = None,
+    *,
+    battles: int = 2_000,
+    workers: int | None = None,
+    cache: ResultCache | None = None,
+) -> MatchupMatrix:
+    """对 roster 中每一对不同角色各模拟 battles 场，填充 N×N 胜率矩阵。
+
+    A 对 B 与 B 对 A 只模拟一次，反向胜率直接由同一批对局得到。所有对局的分块
+    共用一个进程池；固定引擎 seed 时结果与 workers 无关。传入 cache 时只补跑
+    源码或配置变化过的对局，其余直接读取缓存。
+    """
+    roster = list(roster) if roster is not None else discover_roster()
+    names = [cls.name for cls in roster]
+    if len(set(names)) != len(names):
+        raise ValueError("参赛角色的 name 必须互不相同")
+
+    pairs: List[Pair] = [(i, j) for i in range(len(roster)) for j in range(i + 1, len(roster))]
+    worker_count = resolve_workers(workers)
+    tournament_seed = engine.spawn_seed()
+    chunks_per_pair = max(1, worker_count * CHUNKS_PER_WORKER // max(1, len(pairs)))
+
+    # 每组对局需要运行的 (先手方, 后手方, 基准种子, 起止编号)
+    runs: Dict[Pair, Tuple[Type[Character], Type[Character], int, int, int]] = {}
+    pending: Dict[Pair, PendingRun] = {}
+    for index, (i, j) in enumerate(pairs):
+        if cache is None:
+            runs[(i, j)] = (roster[i], roster[j], derive_seed(tournament_seed, index), 0, battles)
+            continue
+        run = cache.pending(engine, roster[i], roster[j], battles)
+        if run is not None:
+            pending[(i, j)] = run
+            runs[(i, j)] = (run.first, run.second, run.base_seed, run.start, run.stop)
+
+    counts: Dict[Pair, Dict[str, int]] = {pair: {} for pair in runs}
+    tasks = [
+        (pair, first, second, base_seed, start, stop)
+        for pair, (first, second, base_seed, lower, upper) in runs.items()
+        for start, stop in plan_chunks(lower, upper, chunks_per_pair)
+    ]
+    if worker_count <= 1:
+        for pair, first, second, base_seed, start, stop in tasks:
+            merge_counts(counts[pair], simulate_range(engine, first, second, base_seed, start, stop))
+    else:
+        with ProcessPoolExecutor(max_workers=worker_count) as pool:
+            futures = [
+                (pair, pool.submit(simulate_chunk, engine, first, second, base_seed, start, stop))
+                for pair, first, second, base_seed, start, stop in tasks
+            ]
+            for pair, future in futures:
+                future.result().merge_into(engine, counts[pair])
+
+    if cache is not None:
+        for pair, run in pending.items():
+            cache.store(engine, run, counts[pair])
+        counts = {pair: cache.lookup(engine, roster[pair[0]], roster[pair[1]]) or {} for pair in pairs}
+    return build_matrix(names, battles, counts)
+
+
+def build_matrix(names: List[str], battles: int, counts: Dict[Pair, Dict[str, int]]) -> MatchupMatrix:
+    size = len(names)
+    win_rates: List[List[float | None]] = [[None] * size for _ in range(size)]
+    draw_rates: List[List[float | None]] = [[None] * size for _ in range(size)]
+    for (i, j), result in counts.items():
+        total = sum(result.values())
+        if not total:
+            continue
+        win_rates[i][j] = result.get(names[i], 0) / total
+        win_rates[j][i] = result.get(names[j], 0) / total
+        draw_rates[i][j] = draw_rates[j][i] = result.get("draw", 0) / total
+    return MatchupMatrix(names=names, battles=battles, win_rates=win_rates, draw_rates=draw_rates, counts=counts)
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="全角色循环赛，输出胜率矩阵")
+    parser.add_argument("--battles", type=int, default=2_000, help="每组对局的模拟场数")
+    parser.add_argument("--max-rounds", type=int, default=150)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--workers", type=int, default=None, help="进程数，默认使用全部 CPU 核心")
+    parser.add_argument("--csv", help="导出胜率矩阵为 CSV")
+    parser.add_argument("--json", help="导出胜率与平局矩阵为 JSON")
+    parser.add_argument("--cache", metavar="PATH", help="使用 SQLite 结果缓存，只重算改动过的对局")
+    args = parser.parse_args(argv)
+
+    engine = BattleEngine(max_rounds=args.max_rounds, seed=args.seed)
+    cache = ResultCache(args.cache) if args.cache else None
+    try:
+        matrix = run_tournament(engine, battles=args.battles, workers=args.workers, cache=cache)
+    finally:
+        if cache is not None:
+            cache.close()
+    print(matrix.format_table())
+    print("-" * 40)
+    for name, rate in sorted(matrix.average_win_rates().items(), key=lambda item: -item[1]):
+        print(f"{name} 平均胜率: {rate:.2%}")
+    if args.csv:
+        matrix.to_csv(args.csv)
+    if args.json:
+        matrix.to_json(args.json)
+
+
+if __name__ == "__main__":
+    main()
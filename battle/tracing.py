@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Callable, Sequence, TextIO
+
+from .factory import CharacterFactory
+
+if TYPE_CHECKING:
+    from .engine import BattleEngine
+
+# 默认 1 MiB 写缓冲，避免逐行落盘
+TRACE_BUFFER_SIZE = 1 << 20
+
+
+@dataclass(frozen=True)
+class BattleSummary:
+    """一场对局结束后的概要，供追踪谓词判断是否需要完整日志。"""
+
+    index: int
+    seed: int
+    winner: str
+    rounds: int
+    max_rounds: int
+    name_a: str
+    name_b: str
+    hp_a: float
+    hp_b: float
+
+    @property
+    def timed_out(self) -> bool:
+        """打满 max_rounds 仍未分出胜负（按剩余 HP 判定）。"""
+        return self.rounds >= self.max_rounds and self.hp_a > 0 and self.hp_b > 0
+
+    @property
+    def winner_hp(self) -> float | None:
+        if self.winner == self.name_a:
+            return self.hp_a
+        if self.winner == self.name_b:
+            return self.hp_b
+        return None
+
+
+TracePredicate = Callable[[BattleSummary], bool]
+
+
+# 以下谓词定义在模块级（或为可 pickle 的实例），可以随引擎一起发送到进程池。
+
+
+def is_draw(summary: BattleSummary) -> bool:
+    return summary.winner == "draw"
+
+
+def hit_max_rounds(summary: BattleSummary) -> bool:
+    return summary.timed_out
+
+
+@dataclass(frozen=True)
+class NarrowWin:
+    """胜者剩余 HP 低于 threshold 的对局。"""
+
+    threshold: float = 10.0
+
+    def __call__(self, summary: BattleSummary) -> bool:
+        hp = summary.winner_hp
+        return hp is not None and hp < self.threshold
+
+
+@dataclass(frozen=True)
+class AnyOf:
+    predicates: tuple
+
+    def __call__(self, summary: BattleSummary) -> bool:
+        return any(predicate(summary) for predicate in self.predicates)
+
+
+def select_all(summary: BattleSummary) -> bool:
+    return True
+
+
+class SummarySink:
+    """接收对局概要的输出端。
+
+    模拟时每场对局结束后调用 predicate，命中的概要按对局编号顺序分批交给 write_batch
+    （在主进程中执行）。子类需实现 write_batch，文件类输出端在 open/close 中管理句柄。
+    """
+
+    predicate: TracePredicate = staticmethod(select_all)
+
+    def open(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+    def write_batch(
+        self,
+        summaries: Sequence[BattleSummary],
+        factory_a: CharacterFactory,
+        factory_b: CharacterFactory,
+        engine: "BattleEngine",
+    ) -> None:
+        raise NotImplementedError
+
+    def __enter__(self) -> "SummarySink":
+        self.open()
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+
+class BattleTracer(SummarySink):
+    """静默模拟时按谓词挑出对局，再用其种子重跑一遍，把完整日志写入带缓冲的文件。
+
+    只有命中的对局需要 verbose 重跑，其余对局的额外开销仅为构造概要与调用谓词。
+    进程池模式下 predicate 需可 pickle；重跑在主进程按对局编号顺序进行。
+    """
+
+    def __init__(self, predicate: TracePredicate, path: str, *, limit: int | None = None) -> None:
+        self.predicate = predicate
+        self.path = path
+        self.limit = limit
+        self.matched = 0
+        self.written = 0
+        self._handle: TextIO | None = None
+
+    def open(self) -> None:
+        if self._handle is None:
+            self._handle = open(self.path, "w", encoding="utf-8", buffering=TRACE_BUFFER_SIZE)
+
+    def close(self) -> None:
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
+
+    def write_batch(
+        self,
+        summaries: Sequence[BattleSummary],
+        factory_a: CharacterFactory,
+        factory_b: CharacterFactory,
+        engine: "BattleEngine",
+    ) -> None:
+        for summary in summaries:
+            self.write(summary, factory_a, factory_b, engine)
+
+    def write(
+        self,
+        summary: BattleSummary,
+        factory_a: CharacterFactory,
+        factory_b: CharacterFactory,
+        engine: "BattleEngine",
+    ) -> None:
+        """以 summary 的种子重跑该局并写出完整日志，超过 limit 后只计数。
+
+        重跑使用 engine 的随机源，与模拟时的随机流一致。
+        """
+        self.matched += 1
+        if self.limit is not None and self.written >= self.limit:
+            return
+        self.open()
+        handle = self._handle
+        assert handle is not None
+        handle.write(
+            f"##### 第 {summary.index} 场 seed={summary.seed} "
+            f"{summary.name_a} vs {summary.name_b} -> {summary.winner}，{summary.rounds} 回合 #####\n"
+        )
+        engine.replay(factory_a, factory_b, summary.seed, out=handle)
+        handle.write("\n")
+        self.written += 1
@@ -1,10 +1,22 @@
+from typing import Any
+
 from .base import BattleContext, Character, Stats
-from .sample import Bronya, BronyaTest, ChenXue, ChenXueCopy, DreamSeeker, Kiana, LiSushang, Theresa
+from .effects import EffectTable, TimedEffect
+from .registry import REGISTRY, CharacterInfo, CharacterRegistry
+
+# 按需导入：角色类经注册表在第一次访问时导入所在模块，规格编译器在用到时才导入
+_LAZY_MODULES = {"SpecCharacter": ".declarative", "compile_spec": ".declarative"}
 
 __all__ = [
     "BattleContext",
     "Character",
+    "CharacterInfo",
+    "CharacterRegistry",
+    "EffectTable",
+    "REGISTRY",
+    "SpecCharacter",
     "Stats",
+    "TimedEffect",
     "Bronya",
     "BronyaTest",
     "ChenXue",
@@ -13,4 +25,22 @@ __all__ = [
     "Kiana",
     "LiSushang",
     "Theresa",
+    "compile_spec",
 ]
+
+
+def __getattr__(name: str) -> Any:
+    if name in _LAZY_MODULES:
+        import importlib
+
+        value = getattr(importlib.import_module(_LAZY_MODULES[name], __name__), name)
+    elif name.startswith("_") or name == "specs":
+        raise AttributeError(name)
+    else:
+        try:
+            info = REGISTRY.get(name)
+        except KeyError:
+            raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+        value = info.load()
+    globals()[name] = value
+    return value
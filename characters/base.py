@@ -1,11 +1,36 @@
 from __future__ import annotations
 
 import random
+from collections.abc import MutableMapping
 from dataclasses import dataclass
-from typing import Any, Callable, Dict
-
-
-@dataclass
+from typing import Any, Callable, Dict, Iterable, Iterator, Sequence
+
+from . import events
+from .effects import (
+    PASSIVE,
+    TURN_END,
+    TURN_START,
+    Bleed,
+    Confusion,
+    DamageReduction,
+    EffectTable,
+    PassiveDisable,
+    Slow,
+    Stun,
+)
+
+COMMON_STATE_KEYS = (
+    "speed_bonus",
+    "speed_penalty",
+    "stunned_turns",
+    "confused_turns",
+    "damage_reduction_value",
+    "damage_reduction_turns",
+)
+_COMMON_STATE_KEY_SET = frozenset(COMMON_STATE_KEYS)
+
+
+@dataclass(slots=True)
 class Stats:
     max_hp: float
     attack: float
@@ -13,29 +38,115 @@ class Stats:
     speed: float
 
 
+def _timed_state(effect_type: type, field: str) -> property:
+    """把 CommonStatus 的一个键映射到效果表中对应效果的 turns 或 value。"""
+
+    def getter(self: "CommonStatus") -> float:
+        effect = self._effects.get(effect_type.kind)
+        return getattr(effect, field) if effect is not None else 0.0
+
+    def setter(self: "CommonStatus", amount: float) -> None:
+        self._effects.set(effect_type, field, amount)
+
+    return property(getter, setter)
+
+
+class CommonStatus(MutableMapping):
+    """通用状态的字典视图。
+
+    限时状态（减速、控制、混乱、减伤）实际存放在角色的 EffectTable 中，这里按原有的键名
+    读写对应效果；speed_bonus 存放在 slot 中。旧代码按键访问 common_status 仍然可用。
+    子类额外声明的状态键存放在 _extra 字典中。
+    """
+
+    __slots__ = ("speed_bonus", "_effects", "_extra")
+
+    speed_penalty = _timed_state(Slow, "turns")
+    stunned_turns = _timed_state(Stun, "turns")
+    confused_turns = _timed_state(Confusion, "turns")
+    damage_reduction_value = _timed_state(DamageReduction, "value")
+    damage_reduction_turns = _timed_state(DamageReduction, "turns")
+
+    def __init__(self, keys: Iterable[str] = COMMON_STATE_KEYS, effects: EffectTable | None = None) -> None:
+        self.speed_bonus = 0.0
+        self._effects = effects if effects is not None else EffectTable()
+        self._extra: Dict[str, Any] | None = None
+        if keys is not COMMON_STATE_KEYS:
+            for key in keys:
+                if key not in _COMMON_STATE_KEY_SET:
+                    self[key] = 0.0
+
+    def __getitem__(self, key: str) -> Any:
+        if key in _COMMON_STATE_KEY_SET:
+            return getattr(self, key)
+        if self._extra is not None and key in self._extra:
+            return self._extra[key]
+        raise KeyError(key)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        if key in _COMMON_STATE_KEY_SET:
+            return getattr(self, key)
+        if self._extra is not None:
+            return self._extra.get(key, default)
+        return default
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        if key in _COMMON_STATE_KEY_SET:
+            setattr(self, key, value)
+            return
+        if self._extra is None:
+            self._extra = {}
+        self._extra[key] = value
+
+    def __delitem__(self, key: str) -> None:
+        """定长状态无法删除，只会归零。"""
+        if key in _COMMON_STATE_KEY_SET:
+            setattr(self, key, 0.0)
+            return
+        if self._extra is None or key not in self._extra:
+            raise KeyError(key)
+        del self._extra[key]
+
+    def __iter__(self) -> Iterator[str]:
+        yield from COMMON_STATE_KEYS
+        if self._extra:
+            yield from self._extra
+
+    def __len__(self) -> int:
+        return len(COMMON_STATE_KEYS) + (len(self._extra) if self._extra else 0)
+
+    def __repr__(self) -> str:
+        return f"CommonStatus({dict(self.items())!r})"
+
+    def snapshot(self) -> tuple:
+        """返回可哈希的状态快照，不含限时状态（由 EffectTable.snapshot 负责）。"""
+        extra = tuple(self._extra.items()) if self._extra else ()
+        return (self.speed_bonus, extra)
+
+    def restore(self, snapshot: tuple) -> None:
+        self.speed_bonus, extra = snapshot
+        self._extra = dict(extra) if extra else None
+
+
 class Character:
     """角色基类，包含基础属性与技能钩子。"""
 
-    COMMON_STATE_KEYS = (
-        "speed_bonus",
-        "speed_penalty",
-        "stunned_turns",
-        "confused_turns",
-        "damage_reduction_value",
-        "damage_reduction_turns",
-    )
+    __slots__ = ("stats", "hp", "effects", "common_status", "unique_status", "_turn_hooks", "_initial_state")
+
+    COMMON_STATE_KEYS = COMMON_STATE_KEYS
 
     name: str = "Unnamed"
 
     def __init__(self, stats: Stats) -> None:
         self.stats = stats
         self.hp = float(stats.max_hp)
-        self.common_status: Dict[str, float] = {key: 0.0 for key in self.COMMON_STATE_KEYS}
+        # 减速、控制、混乱、减伤、被动封锁与持续伤害等限时效果
+        self.effects = EffectTable()
+        self.common_status = CommonStatus(self.COMMON_STATE_KEYS, self.effects)
         self.unique_status: Dict[str, Any] = {}
-        self._turn_hooks: Dict[str, list[Callable[["Character", "BattleContext"], None]]] = {
-            "start": [],
-            "end": [],
-        }
+        # 按需创建各时机的钩子元组；注册与移除时整体替换，执行时无需复制
+        self._turn_hooks: Dict[str, tuple[Callable[["Character", "BattleContext"], None], ...]] = {}
+        self._initial_state: tuple | None = None
 
     # 可以由子类覆写的方法
     def active_skill(self, target: "Character", context: "BattleContext") -> None:
@@ -54,44 +165,70 @@ class Character:
 
     # 战斗行为
     def take_turn(self, target: "Character", context: "BattleContext") -> None:
-        context.log(f"{self.name} 行动开始，HP {self.hp:.1f}")
-        passive_blocked = self._consume_passive_disable_turn(context)
+        context.log(events.TURN_START, self.name, self.hp)
+        context.phase = "turn_start"
+        effects = self.effects
+        passive_blocked = bool(effects.passive) and effects.tick(PASSIVE, self, context)
         if not self.on_turn_start(context):
-            context.log(f"{self.name} 因异常状态而跳过回合")
+            context.log(events.TURN_SKIPPED, self.name)
+            context.phase = "turn_end"
             self.on_turn_end(context)
             return
         if self._abort_turn_if_dead(context):
             return
         if not passive_blocked:
+            context.phase = "passive"
             self.passive_skill(context)
             if self._abort_turn_if_dead(context):
                 return
         if self.can_use_active_skill(target, context):
-            context.log(f"{self.name} 释放主动技能")
+            context.log(events.ACTIVE_SKILL, self.name)
+            if context.metrics is not None:
+                context.metrics.on_trigger(self.name, "主动技能", True)
+            context.phase = "active"
             self.active_skill(target, context)
             if self._abort_turn_if_dead(context):
                 return
+        context.phase = "normal"
         normal_target = self.get_normal_attack_target(target, context)
         self.perform_normal_attack(normal_target, context)
         if self._abort_turn_if_dead(context):
             return
+        context.phase = "turn_end"
         self.on_turn_end(context)
 
     def is_alive(self) -> bool:
         return self.hp > 0
 
     def get_effective_speed(self) -> float:
-        bonus = float(self.common_status.get("speed_bonus", 0.0))
-        penalty = float(self.common_status.get("speed_penalty", 0.0))
-        return max(1.0, self.stats.speed + bonus - penalty)
+        return max(1.0, self.stats.speed + self.common_status.speed_bonus - self.effects.remaining(Slow.kind))
 
     def get_normal_attack_target(self, intended_target: "Character", context: "BattleContext") -> "Character":
-        confusion = self.common_status.get("confused_turns", 0.0)
-        if confusion > 0:
-            context.log(f"{self.name} 处于混乱，普通攻击改为自己")
+        if self.effects.remaining(Confusion.kind) > 0:
+            context.log(events.CONFUSED_SELF_TARGET, self.name)
             return self
         return intended_target
 
+    def select_target(self, enemies: Sequence["Character"], context: "BattleContext") -> "Character":
+        """多人对局中选择本回合的目标，默认为 HP 最低的存活敌人。
+
+        HP 并列时用对局随机流在并列者中等概率选取（蓄水池抽样，只在出现并列时抽取），
+        结果随种子固定，但不偏向排在前面的敌人。
+        """
+        chosen = None
+        ties = 0
+        for enemy in enemies:
+            if not enemy.is_alive():
+                continue
+            if chosen is None or enemy.hp < chosen.hp:
+                chosen = enemy
+                ties = 1
+            elif enemy.hp == chosen.hp:
+                ties += 1
+                if context.randint(1, ties) == 1:
+                    chosen = enemy
+        return chosen if chosen is not None else enemies[0]
+
     def basic_attack(
         self,
         target: "Character",
@@ -106,19 +243,29 @@ class Character:
         attack_value = base_damage if base_damage is not None else self.stats.attack * multiplier + flat_bonus
         defense = 0.0 if ignore_defense else target.stats.defense
         raw_damage = max(1.0, attack_value - defense)
-        dealt = target.receive_damage(raw_damage, ignore_reduction=ignore_reduction)
-        context.log(f"{self.name} 对 {target.name} 造成 {dealt:.1f} 点伤害，{target.name} 当前 HP {max(target.hp, 0):.1f}")
+        dealt = target.receive_damage(raw_damage, ignore_reduction=ignore_reduction, context=context)
+        context.log(events.DAMAGE_DEALT, self.name, target.name, dealt, max(target.hp, 0))
         return dealt
 
-    def receive_damage(self, amount: float, *, ignore_reduction: bool = False, pure_damage: bool = False) -> float:
+    def receive_damage(
+        self,
+        amount: float,
+        *,
+        ignore_reduction: bool = False,
+        pure_damage: bool = False,
+        context: "BattleContext" | None = None,
+    ) -> float:
+        """结算一次伤害；传入 context 时该伤害会计入 context 上挂载的指标收集器。"""
         if amount <= 0:
             return 0.0
         if pure_damage:
-            self.hp -= amount
-            return amount
-        reduction = 0.0 if ignore_reduction else float(self.common_status.get("damage_reduction_value", 0.0))
-        actual = max(0.0, amount - reduction)
+            actual = amount
+        else:
+            reduction = 0.0 if ignore_reduction else self.effects.value(DamageReduction.kind)
+            actual = max(0.0, amount - reduction)
         self.hp -= actual
+        if context is not None and context.metrics is not None:
+            context.metrics.on_damage(context, self, actual)
         return actual
 
     def heal(self, amount: float, context: "BattleContext" | None = None) -> float:
@@ -128,64 +275,67 @@ class Character:
         self.hp = min(self.stats.max_hp, self.hp + amount)
         recovered = self.hp - before
         if recovered > 0 and context:
-            context.log(f"{self.name} 回复 {recovered:.1f} 点生命")
+            context.log(events.HEALED, self.name, recovered)
+            if context.metrics is not None:
+                context.metrics.on_heal(self, recovered)
         return recovered
 
     def on_turn_start(self, context: "BattleContext") -> bool:
-        self._run_turn_hooks("start", context)
-        acted = True
-        penalty_before = self.common_status.get("speed_penalty", 0.0)
-        if penalty_before > 0:
-            remaining = self._decay_common_status("speed_penalty")
-            context.log(f"{self.name} 的减速效果剩余 {remaining:.1f} 回合")
-        stun_before = self.common_status.get("stunned_turns", 0.0)
-        if stun_before > 0:
-            remaining = self._decay_common_status("stunned_turns")
-            context.log(f"{self.name} 被控制，剩余 {remaining:.1f} 回合无法行动")
-            acted = False
-        dr_turns = self.common_status.get("damage_reduction_turns", 0.0)
-        if dr_turns > 0:
-            remaining = self._decay_common_status("damage_reduction_turns")
-            if remaining == 0.0:
-                self.common_status["damage_reduction_value"] = 0.0
-                context.log(f"{self.name} 的减伤效果结束")
-        return acted
+        """结算回合开始时的钩子与效果，返回 False 表示本回合被控制而跳过。"""
+        if self._turn_hooks:
+            self._run_turn_hooks("start", context)
+        effects = self.effects
+        if effects.turn_start:
+            return not effects.tick(TURN_START, self, context)
+        return True
 
     def on_turn_end(self, context: "BattleContext") -> None:
-        confusion = self.common_status.get("confused_turns", 0.0)
-        if confusion > 0:
-            remaining = self._decay_common_status("confused_turns")
-            if remaining > 0:
-                context.log(f"{self.name} 仍处于混乱，剩余 {remaining:.1f} 回合")
-            else:
-                context.log(f"{self.name} 恢复了清醒")
-        self._run_turn_hooks("end", context)
+        effects = self.effects
+        if effects.turn_end:
+            effects.tick(TURN_END, self, context)
+        if self._turn_hooks:
+            self._run_turn_hooks("end", context)
 
     def apply_confusion(self, turns: float, context: "BattleContext" | None = None) -> None:
-        new_turns = max(self.common_status.get("confused_turns", 0.0), max(0.0, turns))
-        self.common_status["confused_turns"] = new_turns
+        new_turns = self.effects.add(Confusion, max(0.0, turns)).turns
         if context:
-            context.log(f"{self.name} 陷入混乱 {new_turns:.1f} 回合")
+            context.log(events.CONFUSION_APPLIED, self.name, new_turns)
         self.on_negative_state("confusion", context)
 
+    def apply_stun(self, turns: float, context: "BattleContext" | None = None) -> None:
+        new_turns = self.effects.add(Stun, max(0.0, turns)).turns
+        if context:
+            context.log(events.STUN_APPLIED, self.name, new_turns)
+        self.on_negative_state("stun", context)
+
+    def apply_slow(self, turns: float, context: "BattleContext" | None = None) -> None:
+        """减速幅度等于剩余回合数（见 effects.Slow）。"""
+        new_turns = self.effects.add(Slow, max(0.0, turns)).turns
+        if context:
+            context.log(events.SLOW_APPLIED, self.name, new_turns)
+        self.on_negative_state("slow", context)
+
+    def apply_bleed(self, stacks: float, turns: float, context: "BattleContext" | None = None) -> None:
+        """叠加流血层数并刷新持续时间。"""
+        bleed = self.effects.add(Bleed, turns, stacks)
+        if context:
+            context.log(events.BLEED_APPLIED, self.name, bleed.value, bleed.turns)
+
     def apply_damage_reduction(self, value: float, turns: float, context: "BattleContext" | None = None) -> None:
-        self.common_status["damage_reduction_value"] = max(0.0, value)
-        self.common_status["damage_reduction_turns"] = max(0.0, turns)
+        self.effects.add(DamageReduction, turns, value)
         if context:
-            context.log(f"{self.name} 获得减伤 {value:.1f}，持续 {turns:.1f} 回合")
+            context.log(events.DAMAGE_REDUCTION_APPLIED, self.name, value, turns)
 
     def disable_passive(self, turns: float, context: "BattleContext" | None = None) -> None:
         if turns <= 0:
             return
-        current = float(self.unique_status.get("passive_disabled_turns", 0.0))
-        updated = max(current, float(turns))
-        self.unique_status["passive_disabled_turns"] = updated
+        updated = self.effects.add(PassiveDisable, float(turns)).turns
         if context:
-            context.log(f"{self.name} 的被动被封锁 {updated:.1f} 回合")
+            context.log(events.PASSIVE_DISABLED, self.name, updated)
 
     def get_passive_disabled_turns(self) -> float:
         """返回被动被封锁的剩余回合数，0 表示未被封锁。"""
-        return float(self.unique_status.get("passive_disabled_turns", 0.0))
+        return self.effects.remaining(PassiveDisable.kind)
 
     def can_trigger_passive_effect(
         self, context: "BattleContext" | None = None, *, announce: bool = True
@@ -195,52 +345,77 @@ class Character:
         if remaining <= 0:
             return True
         if context and announce:
-            context.log(f"{self.name} 的被动被封锁，剩余 {remaining:.1f} 回合")
+            context.log(events.PASSIVE_DISABLED_REMAINING, self.name, remaining)
         return False
 
 
     def on_negative_state(self, state: str, context: "BattleContext" | None = None) -> None:
         """子类可覆写：受到控制或属性降低时触发。"""
 
-    def _decay_common_status(self, key: str, amount: float = 1.0) -> float:
-        value = self.common_status.get(key, 0.0)
-        if value <= 0:
-            return 0.0
-        value = max(0.0, value - amount)
-        self.common_status[key] = value
-        return value
-
     def add_turn_hook(self, when: str, hook: Callable[["Character", "BattleContext"], None]) -> None:
-        hooks = self._turn_hooks.setdefault(when, [])
+        """注册回合钩子（when 为 "start" 或 "end"）；限时效果应优先使用 effects.add。"""
+        hooks = self._turn_hooks.get(when, ())
         if hook not in hooks:
-            hooks.append(hook)
+            self._turn_hooks[when] = hooks + (hook,)
 
     def remove_turn_hook(self, when: str, hook: Callable[["Character", "BattleContext"], None]) -> None:
         hooks = self._turn_hooks.get(when)
-        if not hooks:
+        if not hooks or hook not in hooks:
             return
-        if hook in hooks:
-            hooks.remove(hook)
+        self._turn_hooks[when] = tuple(registered for registered in hooks if registered != hook)
 
     def _run_turn_hooks(self, when: str, context: "BattleContext") -> None:
-        for hook in list(self._turn_hooks.get(when, [])):
+        # 钩子元组在执行期间被替换也不影响本次遍历
+        for hook in self._turn_hooks.get(when, ()):
             hook(self, context)
 
-    def _consume_passive_disable_turn(self, context: "BattleContext") -> bool:
-        remaining = float(self.unique_status.get("passive_disabled_turns", 0.0))
-        if remaining <= 0:
-            return False
-        remaining = max(0.0, remaining - 1.0)
-        self.unique_status["passive_disabled_turns"] = remaining
-        context.log(f"{self.name} 的被动被封锁，剩余 {remaining:.1f} 回合")
-        return True
-
     def _abort_turn_if_dead(self, context: "BattleContext") -> bool:
         if self.is_alive():
             return False
-        context.log(f"{self.name} 无法继续行动，已经倒下")
+        context.log(events.DEFEATED, self.name)
         return True
 
+    def capture_state(self) -> tuple:
+        """返回角色可变状态的快照，可哈希、可 pickle，用于精确求解时的状态去重。"""
+        stats = self.stats
+        return (
+            self.hp,
+            (stats.max_hp, stats.attack, stats.defense, stats.speed),
+            self.common_status.snapshot(),
+            self.effects.snapshot(),
+            _freeze(self.unique_status),
+            tuple((when, hooks) for when, hooks in self._turn_hooks.items() if hooks),
+        )
+
+    def restore_state(self, state: tuple) -> None:
+        """把角色原地恢复到 capture_state 得到的快照，不重新分配状态容器。"""
+        hp, stats, common, effects, unique, hooks = state
+        self.hp = hp
+        self.stats.max_hp, self.stats.attack, self.stats.defense, self.stats.speed = stats
+        self.common_status.restore(common)
+        self.effects.restore(effects)
+        unique_status = self.unique_status
+        unique_status.clear()
+        for key, value in unique:
+            unique_status[key] = _thaw(value)
+        turn_hooks = self._turn_hooks
+        turn_hooks.clear()
+        for when, registered in hooks:
+            turn_hooks[when] = registered
+
+    def save_initial_state(self) -> None:
+        """记录当前状态作为 reset 的目标，应在构造完成、战斗开始前调用。"""
+        self._initial_state = self.capture_state()
+
+    def reset(self) -> None:
+        """原地恢复到 save_initial_state 时的状态，包括 HP、属性、状态与回合钩子。
+
+        子类在 __init__ 中对属性的调整（如晨雪的生存强化）已包含在快照中，不会被重复应用。
+        """
+        if self._initial_state is None:
+            raise RuntimeError(f"{self.name} 尚未调用 save_initial_state，无法重置")
+        self.restore_state(self._initial_state)
+
     def clone(self) -> "Character":
         """以初始状态复制角色，供新的战斗使用。"""
         try:
@@ -255,25 +430,74 @@ class Character:
             return cloned
 
 
+class _FrozenDict(tuple):
+    """capture_state 中字典的不可变形式，按键排序以便相同内容得到相同哈希。"""
+
+
+class _FrozenList(tuple):
+    """capture_state 中列表的不可变形式。"""
+
+
+def _freeze(value: Any) -> Any:
+    if isinstance(value, dict):
+        return _FrozenDict(sorted((key, _freeze(item)) for key, item in value.items()))
+    if isinstance(value, list):
+        return _FrozenList(_freeze(item) for item in value)
+    return value
+
+
+def _thaw(value: Any) -> Any:
+    if isinstance(value, _FrozenDict):
+        return {key: _thaw(item) for key, item in value}
+    if isinstance(value, _FrozenList):
+        return [_thaw(item) for item in value]
+    return value
+
+
 class BattleContext:
     """为技能提供额外信息。"""
 
     def __init__(self, rng: random.Random | None = None) -> None:
         self.turn_index = 0
+        self.round_index = 0
         self.rng = rng or random.Random()
         self.logging_enabled = False
-        self.turn_log: list[str] = []
+        self.turn_log: list[tuple[str, tuple[Any, ...]]] = []
+        # 当前行动方与其所处的 take_turn 阶段，供指标收集器归类伤害
+        self.actor: Character | None = None
+        self.phase = ""
+        # battle.metrics.MetricsCollector，为 None 时各回调点只多一次属性判断
+        self.metrics: Any = None
+
+    def chance(self, probability: float, skill: str | None = None) -> bool:
+        """以 probability 的概率返回 True。
+
+        技能的随机分支应统一通过 chance/randint 发起，精确求解器会覆写这两个方法来枚举分支。
+        skill 为技能名时，本次判定计入当前行动方的触发统计。
+        """
+        hit = self.rng.random() < probability
+        if skill is not None and self.metrics is not None:
+            self.metrics.on_trigger(self.actor.name if self.actor is not None else "", skill, hit)
+        return hit
+
+    def randint(self, low: int, high: int) -> int:
+        """返回 [low, high] 间的均匀随机整数。"""
+        return self.rng.randint(low, high)
 
     def set_logging(self, enabled: bool) -> None:
         self.logging_enabled = enabled
 
-    def log(self, message: str) -> None:
+    def log(self, event: str, *args: Any) -> None:
+        """记录日志事件，event 为 events 模块中的模板，args 为原始参数。
+
+        未开启日志时直接返回，不生成任何字符串；文本在 consume_turn_log 时才格式化。
+        """
         if self.logging_enabled:
-            self.turn_log.append(message)
+            self.turn_log.append((event, args))
 
     def consume_turn_log(self) -> list[str]:
         if not self.turn_log:
             return []
-        logs = self.turn_log[:]
+        logs = [event.format(*args) if args else event for event, args in self.turn_log]
         self.turn_log.clear()
         return logs
@@ -0,0 +1,471 @@
+from __future__ import annotations
+
+import hashlib
+import inspect
+import json
+import linecache
+import math
+import sys
+import tomllib
+from dataclasses import fields
+from string import Formatter
+from typing import Any, Dict, List, Mapping, Sequence, Set, Tuple, Type
+
+from . import events
+from .base import Character, Stats
+
+STAT_FIELDS = tuple(item.name for item in fields(Stats))
+# 日志模板中的占位符及其在生成代码中对应的表达式
+LOG_FIELDS = {
+    "self": "self.name",
+    "target": "target.name",
+    "hp": "max(target.hp, 0)",
+    "self_hp": "max(self.hp, 0)",
+    "dealt": "dealt",
+    "total": "total",
+    "value": "value",
+    "index": "index",
+}
+# 需要在生成的方法开头初始化的局部变量
+_LOCALS = {"dealt": "0.0", "total": "0.0", "value": "0", "index": "0"}
+# 效果名 -> (Character 上的施加方法, 是否需要 value 参数)
+EFFECTS = {
+    "confusion": ("apply_confusion", False),
+    "stun": ("apply_stun", False),
+    "slow": ("apply_slow", False),
+    "damage_reduction": ("apply_damage_reduction", True),
+    "passive_disable": ("disable_passive", False),
+    "bleed": ("apply_bleed", True),
+}
+
+_TOP_KEYS = {"name", "stats", "procs", "active", "normal", "passive"}
+_STEP_KEYS = {
+    "log": {"type", "log"},
+    "attack": {
+        "type", "base_damage", "multiplier", "flat_bonus", "ignore_defense", "ignore_reduction", "hits", "hit_log", "log",
+    },
+    "damage": {"type", "amount", "lost_hp", "target_hp", "minus_defense", "min", "pure", "ignore_reduction", "log"},
+    "heal": {"type", "amount", "log"},
+    "effect": {"type", "effect", "turns", "value", "chance", "label", "target", "log"},
+}
+_PROC_KEYS = {"chance", "label", "log", "ignore_defense", "ignore_reduction"}
+_ACTIVE_KEYS = {"every", "steps", "replaces_normal", "skip_log"}
+_PASSIVE_KEYS = {"below", "heal", "log"}
+_SKIP_NORMAL_KEY = "skip_normal"
+
+
+class SpecCharacter(Character):
+    """由 compile_spec 生成的角色类的基类，不能直接实例化。"""
+
+    __slots__ = ()
+
+    # 规格内容与编译器源码的哈希，供结果缓存判断角色定义是否改动
+    spec_hash = ""
+    spec: Mapping[str, Any] = {}
+    # 生成的方法源码，便于调试
+    spec_source = ""
+    _stats: Tuple[float, float, float, float] | None = None
+    _initial_hp: float | None = None
+    _cycled = False
+
+    def __init__(self) -> None:
+        if self._stats is None:
+            raise TypeError("SpecCharacter 需由 compile_spec 生成具体的角色类")
+        super().__init__(Stats(*self._stats))
+        if self._initial_hp is not None:
+            self.hp = self._initial_hp
+        if self._cycled:
+            self.unique_status["attack_cycle"] = 0.0
+
+
+def load_spec_file(path: str) -> Dict[str, Any]:
+    with open(path, "rb") as handle:
+        return tomllib.load(handle)
+
+
+def spec_hash(spec: Mapping[str, Any]) -> str:
+    digest = hashlib.sha256()
+    digest.update(json.dumps(spec, sort_keys=True, ensure_ascii=False, default=str).encode())
+    digest.update(inspect.getsource(sys.modules[__name__]).encode())
+    return digest.hexdigest()
+
+
+def compile_spec(
+    spec: Mapping[str, Any],
+    *,
+    class_name: str = "CompiledCharacter",
+    module: str = __name__,
+) -> Type[SpecCharacter]:
+    """把角色规格编译为 Character 子类。
+
+    规格格式见 characters.specs 的模块文档。各技能按规格生成专用的方法源码再编译：数值
+    直接写成常量，不依赖目标的伤害在编译时算好，概率为 0 或 1 的判定折叠掉、不消耗随机数，
+    日志只在开启时才构造参数。编译出的类需能按 module 与 class_name 导入才能 pickle
+    （见 characters.specs）。
+    """
+    _check_keys(spec, _TOP_KEYS, "角色规格")
+    if not isinstance(spec.get("name"), str):
+        raise ValueError("角色规格缺少 name")
+    stats = spec.get("stats")
+    if not isinstance(stats, Mapping):
+        raise ValueError(f"{spec['name']} 缺少 stats")
+    _check_keys(stats, set(STAT_FIELDS) | {"hp"}, "stats")
+    missing = [key for key in STAT_FIELDS if key not in stats]
+    if missing:
+        raise ValueError(f"{spec['name']} 的 stats 缺少 {', '.join(missing)}")
+    stat_values = {key: _number(stats, key, 0.0, "stats") for key in stats}
+
+    procs = [_parse_proc(proc, f"procs[{index}]") for index, proc in enumerate(spec.get("procs", ()))]
+    procs = [proc for proc in procs if proc is not None]
+    writer = _MethodWriter()
+
+    active = spec.get("active")
+    replaces_normal = False
+    if active is not None:
+        _check_keys(active, _ACTIVE_KEYS, "active")
+        every = _count(active, "every", 1, "active")
+        replaces_normal = bool(active.get("replaces_normal", False))
+        writer.cycle(every)
+        writer.action("active_skill", active.get("steps", ()), procs, "active.steps", skip_normal=replaces_normal)
+
+    normal = spec.get("normal", {})
+    _check_keys(normal, {"steps"}, "normal")
+    normal_steps = normal.get("steps")
+    if normal_steps is None:
+        normal_steps = [{"type": "attack"}]
+    skip_log = active.get("skip_log") if replaces_normal and active is not None else None
+    writer.action(
+        "perform_normal_attack", normal_steps, procs, "normal.steps", skippable=replaces_normal, skip_log=skip_log
+    )
+
+    passive = spec.get("passive")
+    if passive is not None:
+        _check_keys(passive, _PASSIVE_KEYS, "passive")
+        below = _number(passive, "below", 0.0, "passive")
+        writer.passive(below, _number(passive, "heal", 0.0, "passive"), passive.get("log"))
+
+    source = writer.source()
+    filename = f"<spec {module}.{class_name}>"
+    linecache.cache[filename] = (len(source), None, source.splitlines(True), filename)
+    scope: Dict[str, Any] = {"__name__": module}
+    exec(compile(source, filename, "exec"), scope)
+
+    namespace: Dict[str, Any] = {
+        "__slots__": (),
+        "__module__": module,
+        "__qualname__": class_name,
+        "name": spec["name"],
+        "spec": spec,
+        "spec_hash": spec_hash(spec),
+        "spec_source": source,
+        "_stats": tuple(stat_values[key] for key in STAT_FIELDS),
+        "_initial_hp": stat_values.get("hp"),
+        "_cycled": active is not None,
+    }
+    for method in writer.methods:
+        namespace[method] = scope[method]
+    return type(class_name, (SpecCharacter,), namespace)
+
+
+def _check_keys(section: Mapping[str, Any], allowed: set, where: str) -> None:
+    unknown = sorted(set(section) - allowed)
+    if unknown:
+        raise ValueError(f"{where} 中有未知的字段：{', '.join(unknown)}")
+
+
+def _number(section: Mapping[str, Any], key: str, default: float, where: str) -> float:
+    """读取数值字段；数值会原样写进生成的源码，inf/nan 在那里不是合法的常量。"""
+    value = section.get(key, default)
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        number = math.nan
+    if isinstance(value, bool) or not math.isfinite(number):
+        raise ValueError(f"{where}.{key} 必须为有限的数值：{value!r}")
+    return number
+
+
+def _count(section: Mapping[str, Any], key: str, default: int, where: str) -> int:
+    value = section.get(key, default)
+    if isinstance(value, bool) or not isinstance(value, int) or value <= 0:
+        raise ValueError(f"{where}.{key} 必须为正整数：{value!r}")
+    return value
+
+
+def _probability(params: Mapping[str, Any], where: str) -> float | None:
+    """None 表示必定触发；0 表示永不触发。"""
+    probability = _number(params, "chance", 1.0, where)
+    if probability >= 1.0:
+        return None
+    return max(0.0, probability)
+
+
+def _parse_proc(params: Mapping[str, Any], where: str) -> Dict[str, Any] | None:
+    _check_keys(params, _PROC_KEYS, where)
+    probability = _probability(params, where)
+    if probability == 0.0:
+        return None
+    return {
+        "chance": probability,
+        "label": params.get("label"),
+        "log": params.get("log"),
+        "ignore_defense": bool(params.get("ignore_defense", False)),
+        "ignore_reduction": bool(params.get("ignore_reduction", False)),
+    }
+
+
+def _rewrite_template(template: str) -> Tuple[str, List[str]]:
+    """把 "{self} 造成 {dealt:.1f} 点伤害" 改写为按位置取参的事件模板，返回 (模板, 占位符列表)。"""
+    names: List[str] = []
+    literal_parts: List[str] = []
+    parts: List[str] = []
+    for literal, field, format_spec, conversion in Formatter().parse(template):
+        literal_parts.append(literal)
+        parts.append(literal.replace("{", "{{").replace("}", "}}"))
+        if field is None:
+            continue
+        if field not in LOG_FIELDS:
+            raise ValueError(f"日志模板 {template!r} 中有未知的占位符 {field!r}，可选：{', '.join(LOG_FIELDS)}")
+        if field not in names:
+            names.append(field)
+        suffix = (f"!{conversion}" if conversion else "") + (f":{format_spec}" if format_spec else "")
+        parts.append(f"{{{names.index(field)}{suffix}}}")
+    # 没有参数时 BattleContext 不会格式化模板，需保留原始的花括号
+    return ("".join(parts) if names else "".join(literal_parts)), names
+
+
+class _MethodWriter:
+    """逐行生成角色方法的源码。"""
+
+    def __init__(self) -> None:
+        self.lines: List[str] = []
+        self.methods: List[str] = []
+        self._body: List[Tuple[str, str | None]] = []
+        self._used: Set[str] = set()
+        self._proc_count = 0
+
+    def source(self) -> str:
+        return "\n".join(self.lines) + "\n"
+
+    # 方法
+
+    def cycle(self, every: int) -> None:
+        self._begin()
+        self._emit(1, "status = self.unique_status")
+        self._emit(1, 'cycle = int(status["attack_cycle"] + 1.0)')
+        self._emit(1, 'status["attack_cycle"] = float(cycle)')
+        self._emit(1, "if context.logging_enabled:")
+        self._emit(2, f"context.log({events.ATTACK_CYCLE!r}, self.name, cycle)")
+        self._emit(1, f"return cycle % {every} == 0")
+        self._finish("can_use_active_skill", "self, target, context")
+
+    def action(
+        self,
+        method: str,
+        steps: Sequence[Mapping[str, Any]],
+        procs: Sequence[Mapping[str, Any]],
+        where: str,
+        *,
+        skip_normal: bool = False,
+        skippable: bool = False,
+        skip_log: str | None = None,
+    ) -> None:
+        self._begin()
+        if skippable:
+            # 主动技能与被其取代的普通攻击总在同一回合内先后发生，标记不会跨回合保留
+            self._emit(1, f"if self.unique_status.pop({_SKIP_NORMAL_KEY!r}, False):")
+            self._log(2, skip_log)
+            self._emit(2, "return")
+        for index, params in enumerate(steps):
+            self._step(params, procs, f"{where}[{index}]")
+        if skip_normal:
+            self._emit(1, f"self.unique_status[{_SKIP_NORMAL_KEY!r}] = True")
+        self._finish(method, "self, target, context")
+
+    def passive(self, below: float, heal: float, log: str | None) -> None:
+        """HP 低于 max_hp × below 时回复 heal 点生命。"""
+        self._begin()
+        self._emit(1, "target = self")
+        self._emit(1, f"if self.hp < self.stats.max_hp * {below!r}:")
+        self._log(2, log)
+        self._emit(2, f"self.heal({heal!r}, context)")
+        self._finish("passive_skill", "self, context")
+
+    # 步骤
+
+    def _step(self, params: Mapping[str, Any], procs: Sequence[Mapping[str, Any]], where: str) -> None:
+        """where 为该步骤在规格中的位置（如 active.steps[0]），用于报错。"""
+        kind = params.get("type")
+        if kind not in _STEP_KEYS:
+            raise ValueError(f"{where} 的步骤类型 {kind!r} 未知，可选：{', '.join(_STEP_KEYS)}")
+        _check_keys(params, _STEP_KEYS[kind], f"{where}（{kind} 步骤）")
+        if kind == "log":
+            self._log(1, params.get("log"))
+        elif kind == "attack":
+            self._attack(params, procs, where)
+        elif kind == "damage":
+            self._damage(params, where)
+        elif kind == "heal":
+            self._emit(1, f"value = self.heal({_number(params, 'amount', 0.0, where)!r}, context)")
+            self._log(1, params.get("log"))
+        else:
+            self._effect(params, where)
+
+    def _attack(self, params: Mapping[str, Any], procs: Sequence[Mapping[str, Any]], where: str) -> None:
+        hits = _count(params, "hits", 1, where)
+        depth = 1
+        if hits > 1:
+            self._emit(1, f"for index in range(1, {hits + 1}):")
+            depth = 2
+        else:
+            self._emit(1, "index = 1", only_if="index")
+        self._log(depth, params.get("hit_log"))
+
+        ignore_defense = bool(params.get("ignore_defense", False))
+        ignore_reduction = bool(params.get("ignore_reduction", False))
+        defense_flags: List[str] = []
+        reduction_flags: List[str] = []
+        for proc in procs:
+            if proc["chance"] is None:
+                self._log(depth, proc["log"])
+                ignore_defense = ignore_defense or proc["ignore_defense"]
+                ignore_reduction = ignore_reduction or proc["ignore_reduction"]
+                continue
+            flag = f"proc{self._proc_count}"
+            self._proc_count += 1
+            self._emit(depth, f"{flag} = context.chance({proc['chance']!r}, {proc['label']!r})")
+            if proc["log"]:
+                self._emit(depth, f"if {flag}:")
+                self._log(depth + 1, proc["log"])
+            if proc["ignore_defense"]:
+                defense_flags.append(flag)
+            if proc["ignore_reduction"]:
+                reduction_flags.append(flag)
+
+        base_damage = _number(params, "base_damage", 0.0, where) if "base_damage" in params else None
+        multiplier = _number(params, "multiplier", 1.0, where)
+        flat_bonus = _number(params, "flat_bonus", 0.0, where)
+        if base_damage is not None:
+            attack = repr(base_damage)
+        elif multiplier == 1.0 and flat_bonus == 0.0:
+            attack = "self.stats.attack"
+        else:
+            attack = f"self.stats.attack * {multiplier!r} + {flat_bonus!r}"
+        if ignore_defense:
+            raw = repr(max(1.0, base_damage - 0.0)) if base_damage is not None else f"max(1.0, {attack} - 0.0)"
+        elif defense_flags:
+            raw = f"max(1.0, {attack} - (0.0 if {' or '.join(defense_flags)} else target.stats.defense))"
+        else:
+            raw = f"max(1.0, {attack} - target.stats.defense)"
+        if ignore_reduction:
+            reduction = ", ignore_reduction=True"
+        elif reduction_flags:
+            reduction = f", ignore_reduction={' or '.join(reduction_flags)}"
+        else:
+            reduction = ""
+        self._emit(depth, f"dealt = target.receive_damage({raw}{reduction}, context=context)")
+        self._emit(depth, "if context.logging_enabled:")
+        self._emit(
+            depth + 1, f"context.log({events.DAMAGE_DEALT!r}, self.name, target.name, dealt, max(target.hp, 0))"
+        )
+        self._accumulate(depth)
+        if hits > 1:
+            self._emit(depth, "if not target.is_alive():")
+            self._emit(depth + 1, "break")
+        self._log(1, params.get("log"))
+
+    def _damage(self, params: Mapping[str, Any], where: str) -> None:
+        """直接结算的伤害：amount + 自身已损失 HP × lost_hp + 目标当前 HP × target_hp，再按需减去目标防御。"""
+        amount = _number(params, "amount", 0.0, where)
+        lost_hp = _number(params, "lost_hp", 0.0, where)
+        target_hp = _number(params, "target_hp", 0.0, where)
+        minimum = _number(params, "min", 1.0, where)
+        pure = bool(params.get("pure", False))
+        terms = []
+        if lost_hp:
+            terms.append(f"max(0.0, self.stats.max_hp - self.hp) * {lost_hp!r}")
+        if target_hp:
+            terms.append(f"max(0.0, target.hp) * {target_hp!r}")
+        if amount or not terms:
+            terms.append(repr(amount))
+        value = " + ".join(terms)
+        if params.get("minus_defense", False):
+            value = f"{value} - target.stats.defense"
+        elif len(terms) == 1 and not (lost_hp or target_hp):
+            value = repr(max(minimum, amount))
+            minimum = None
+        amount_expr = f"max({minimum!r}, {value})" if minimum is not None else value
+        if pure:
+            flags = ", ignore_reduction=True, pure_damage=True"
+        elif params.get("ignore_reduction", False):
+            flags = ", ignore_reduction=True"
+        else:
+            flags = ""
+        self._emit(1, f"dealt = target.receive_damage({amount_expr}{flags}, context=context)")
+        self._accumulate(1)
+        self._log(1, params.get("log"))
+
+    def _effect(self, params: Mapping[str, Any], where: str) -> None:
+        effect = params.get("effect")
+        if effect not in EFFECTS:
+            raise ValueError(f"{where} 的效果 {effect!r} 未知，可选：{', '.join(EFFECTS)}")
+        probability = _probability(params, where)
+        if probability == 0.0:
+            return
+        depth = 1
+        if probability is not None:
+            self._emit(1, f"if context.chance({probability!r}, {params.get('label')!r}):")
+            depth = 2
+        method, takes_value = EFFECTS[effect]
+        receiver = "self" if params.get("target", "target") == "self" else "target"
+        turns = repr(_number(params, "turns", 1.0, where))
+        value = params.get("value", 0.0)
+        if isinstance(value, (list, tuple)):
+            # [low, high]：每次施加取区间内的随机整数（如流血层数）
+            if len(value) != 2 or not all(isinstance(bound, int) and not isinstance(bound, bool) for bound in value):
+                raise ValueError(f"{where}.value 必须为两个整数 [low, high]：{value!r}")
+            low, high = value
+            if low > high:
+                raise ValueError(f"{where}.value 的区间为空：{value!r}")
+            self._emit(depth, f"value = context.randint({low}, {high})")
+            amount = "float(value)"
+        else:
+            amount = repr(_number(params, "value", 0.0, where))
+            self._emit(depth, f"value = {amount}", only_if="value")
+        arguments = f"{amount}, {turns}" if takes_value else turns
+        self._emit(depth, f"{receiver}.{method}({arguments}, context)")
+        self._log(depth, params.get("log"))
+
+    # 源码拼接
+
+    def _begin(self) -> None:
+        self._body = []
+        self._used = set()
+        self._proc_count = 0
+
+    def _emit(self, depth: int, text: str, only_if: str | None = None) -> None:
+        """only_if 为局部变量名时，仅在日志读取该变量时才保留这一行。"""
+        self._body.append(("    " * depth + text, only_if))
+
+    def _accumulate(self, depth: int) -> None:
+        self._emit(depth, "total += dealt", only_if="total")
+
+    def _log(self, depth: int, template: str | None) -> None:
+        if not template:
+            return
+        event, names = _rewrite_template(template)
+        self._used.update(names)
+        args = "".join(f", {LOG_FIELDS[name]}" for name in names)
+        self._emit(depth, "if context.logging_enabled:")
+        self._emit(depth + 1, f"context.log({event!r}{args})")
+
+    def _finish(self, method: str, signature: str) -> None:
+        self.lines.append(f"def {method}({signature}):")
+        for name, initial in _LOCALS.items():
+            # 日志读取的局部变量先初始化，模板引用尚未赋值的变量时也不会出错
+            if name in self._used:
+                self.lines.append(f"    {name} = {initial}")
+        body = [line for line, only_if in self._body if only_if is None or only_if in self._used]
+        self.lines.extend(body or ["    pass"])
+        self.lines.append("")
+        self.methods.append(method)
@@ -0,0 +1,283 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Dict, Iterator, List, Type
+
+from . import events
+
+if TYPE_CHECKING:
+    from .base import BattleContext, Character
+
+# 结算时机：被动判定（take_turn 开头）、回合开始（on_turn_start）、回合结束（on_turn_end）
+PASSIVE = "passive"
+TURN_START = "turn_start"
+TURN_END = "turn_end"
+PHASES = (PASSIVE, TURN_START, TURN_END)
+
+
+class TimedEffect:
+    """持续若干回合的状态效果。
+
+    turns 为剩余回合数，value 为效果强度（减伤值、流血层数等，不需要时为 0）。
+    每个持有者身上同一 kind 最多一个实例，再次施加时按 stack 叠加。phase 决定在行动的
+    哪个时机结算，同一时机内按 order 从小到大依次结算。blocks 为 True 的效果在结算前
+    仍有剩余回合时，会阻止该时机对应的行动（回合开始时跳过回合，被动判定时封锁被动）。
+    """
+
+    __slots__ = ("turns", "value")
+
+    kind = ""
+    phase = TURN_START
+    order = 0
+    blocks = False
+
+    def __init__(self, turns: float = 0.0, value: float = 0.0) -> None:
+        self.turns = turns
+        self.value = value
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(turns={self.turns!r}, value={self.value!r})"
+
+    @property
+    def expired(self) -> bool:
+        return self.turns <= 0 and self.value == 0
+
+    def stack(self, turns: float, value: float) -> None:
+        """默认取较长的持续时间与较高的强度。"""
+        self.turns = max(self.turns, turns)
+        self.value = max(self.value, value)
+
+    def tick(self, owner: "Character", context: "BattleContext") -> bool:
+        """结算一次，返回 False 表示效果结束、应从持有者身上移除。"""
+        if self.turns <= 0:
+            return False
+        self.turns = remaining = max(0.0, self.turns - 1.0)
+        self.on_tick(owner, context, remaining)
+        return remaining > 0
+
+    def on_tick(self, owner: "Character", context: "BattleContext", remaining: float) -> None:
+        """子类可覆写：每次结算后输出日志。"""
+
+
+class Slow(TimedEffect):
+    """减速：速度降低值等于剩余回合数，每回合衰减 1。"""
+
+    __slots__ = ()
+    kind = "slow"
+    order = 10
+
+    def on_tick(self, owner: "Character", context: "BattleContext", remaining: float) -> None:
+        context.log(events.SLOW_REMAINING, owner.name, remaining)
+
+
+class Stun(TimedEffect):
+    __slots__ = ()
+    kind = "stun"
+    order = 20
+    blocks = True
+
+    def on_tick(self, owner: "Character", context: "BattleContext", remaining: float) -> None:
+        context.log(events.STUN_REMAINING, owner.name, remaining)
+
+
+class DamageReduction(TimedEffect):
+    """减伤：每次受到的非纯粹伤害减少 value；turns 为 0 时不衰减，一直生效。"""
+
+    __slots__ = ()
+    kind = "damage_reduction"
+    order = 30
+
+    def stack(self, turns: float, value: float) -> None:
+        """新的减伤覆盖旧的。"""
+        self.turns = max(0.0, turns)
+        self.value = max(0.0, value)
+
+    def tick(self, owner: "Character", context: "BattleContext") -> bool:
+        if self.turns <= 0:
+            return True
+        self.turns = max(0.0, self.turns - 1.0)
+        if self.turns == 0.0:
+            self.value = 0.0
+            context.log(events.DAMAGE_REDUCTION_ENDED, owner.name)
+            return False
+        return True
+
+
+class DamageOverTime(TimedEffect):
+    """持续伤害：每回合开始时受到 value 点纯粹伤害，持续 turns 回合。
+
+    层数累加、持续时间刷新为最新施加的值；层数或回合数耗尽时在下次结算时结束。
+    """
+
+    __slots__ = ()
+    kind = "dot"
+    # 在其他回合开始效果之前结算
+    order = 0
+    tick_event = events.BLEED_TICK
+    end_event = events.BLEED_ENDED
+
+    def stack(self, turns: float, value: float) -> None:
+        self.value = max(0.0, self.value + value)
+        self.turns = float(turns)
+
+    def tick(self, owner: "Character", context: "BattleContext") -> bool:
+        if self.value <= 0 or self.turns <= 0:
+            context.log(self.end_event, owner.name)
+            return False
+        dealt = owner.receive_damage(self.value, ignore_reduction=True, pure_damage=True, context=context)
+        context.log(self.tick_event, owner.name, dealt, max(owner.hp, 0))
+        self.turns -= 1.0
+        if self.turns <= 0:
+            context.log(self.end_event, owner.name)
+            return False
+        return True
+
+
+class Bleed(DamageOverTime):
+    __slots__ = ()
+    kind = "bleed"
+
+
+class PassiveDisable(TimedEffect):
+    __slots__ = ()
+    kind = "passive_disable"
+    phase = PASSIVE
+    blocks = True
+
+    def on_tick(self, owner: "Character", context: "BattleContext", remaining: float) -> None:
+        context.log(events.PASSIVE_DISABLED_REMAINING, owner.name, remaining)
+
+
+class Confusion(TimedEffect):
+    __slots__ = ()
+    kind = "confusion"
+    phase = TURN_END
+
+    def on_tick(self, owner: "Character", context: "BattleContext", remaining: float) -> None:
+        if remaining > 0:
+            context.log(events.CONFUSION_REMAINING, owner.name, remaining)
+        else:
+            context.log(events.CONFUSION_ENDED, owner.name)
+
+
+class EffectTable:
+    """一个角色身上的限时效果。
+
+    按结算时机分为三个列表，列表内按 (order, kind) 排好序，结算时只遍历生效中的效果，
+    结束的效果当场移除；没有效果的时机只需一次列表判空。
+    """
+
+    __slots__ = ("passive", "turn_start", "turn_end", "_by_kind")
+
+    def __init__(self) -> None:
+        self.passive: List[TimedEffect] = []
+        self.turn_start: List[TimedEffect] = []
+        self.turn_end: List[TimedEffect] = []
+        self._by_kind: Dict[str, TimedEffect] = {}
+
+    def __len__(self) -> int:
+        return len(self._by_kind)
+
+    def __iter__(self) -> Iterator[TimedEffect]:
+        """按结算顺序遍历。"""
+        yield from self.passive
+        yield from self.turn_start
+        yield from self.turn_end
+
+    def __contains__(self, kind: str) -> bool:
+        return kind in self._by_kind
+
+    def __repr__(self) -> str:
+        return f"EffectTable({list(self)!r})"
+
+    def get(self, kind: str) -> TimedEffect | None:
+        return self._by_kind.get(kind)
+
+    def remaining(self, kind: str) -> float:
+        effect = self._by_kind.get(kind)
+        return effect.turns if effect is not None else 0.0
+
+    def value(self, kind: str) -> float:
+        effect = self._by_kind.get(kind)
+        return effect.value if effect is not None else 0.0
+
+    def add(self, effect_type: Type[TimedEffect], turns: float, value: float = 0.0) -> TimedEffect:
+        """施加效果并返回叠加后的实例；叠加后已无效（回合与强度均为 0）的效果不会留在表中。"""
+        effect = self._by_kind.get(effect_type.kind)
+        if effect is None:
+            effect = effect_type()
+            effect.stack(turns, value)
+            if not effect.expired:
+                self._insert(effect)
+            return effect
+        effect.stack(turns, value)
+        if effect.expired:
+            self.remove(effect.kind)
+        return effect
+
+    def set(self, effect_type: Type[TimedEffect], field: str, amount: float) -> None:
+        """直接改写 turns 或 value，供 CommonStatus 的按键写入使用。"""
+        effect = self._by_kind.get(effect_type.kind)
+        if effect is None:
+            effect = effect_type()
+            setattr(effect, field, amount)
+            if not effect.expired:
+                self._insert(effect)
+            return
+        setattr(effect, field, amount)
+        if effect.expired:
+            self.remove(effect.kind)
+
+    def remove(self, kind: str) -> TimedEffect | None:
+        effect = self._by_kind.pop(kind, None)
+        if effect is not None:
+            self._phase_list(effect.phase).remove(effect)
+        return effect
+
+    def clear(self) -> None:
+        self.passive.clear()
+        self.turn_start.clear()
+        self.turn_end.clear()
+        self._by_kind.clear()
+
+    def tick(self, phase: str, owner: "Character", context: "BattleContext") -> bool:
+        """结算 phase 时机的全部效果，返回是否有效果阻止了本时机的行动。"""
+        effects = self._phase_list(phase)
+        blocked = False
+        index = 0
+        while index < len(effects):
+            effect = effects[index]
+            if effect.blocks and effect.turns > 0:
+                blocked = True
+            if effect.tick(owner, context):
+                index += 1
+            else:
+                del effects[index]
+                del self._by_kind[effect.kind]
+        return blocked
+
+    def snapshot(self) -> tuple:
+        """可哈希的快照，内容相同的表得到相同的快照。"""
+        return tuple((type(effect), effect.turns, effect.value) for effect in self)
+
+    def restore(self, snapshot: tuple) -> None:
+        self.clear()
+        for effect_type, turns, value in snapshot:
+            self._insert(effect_type(turns, value))
+
+    def _phase_list(self, phase: str) -> List[TimedEffect]:
+        if phase == TURN_START:
+            return self.turn_start
+        if phase == TURN_END:
+            return self.turn_end
+        if phase == PASSIVE:
+            return self.passive
+        raise ValueError(f"未知的结算时机 {phase!r}")
+
+    def _insert(self, effect: TimedEffect) -> None:
+        effects = self._phase_list(effect.phase)
+        key = (effect.order, effect.kind)
+        index = len(effects)
+        while index > 0 and (effects[index - 1].order, effects[index - 1].kind) > key:
+            index -= 1
+        effects.insert(index, effect)
+        self._by_kind[effect.kind] = effect
@@ -0,0 +1,60 @@
+"""战斗日志事件模板。
+
+技能调用 ``context.log(EVENT, *args)`` 时只传递事件模板与原始参数，
+只有开启日志后读取回合日志时才会按 ``str.format`` 生成文本。
+"""
+
+# 通用回合流程
+TURN_START = "{0} 行动开始，HP {1:.1f}"
+TURN_SKIPPED = "{0} 因异常状态而跳过回合"
+ACTIVE_SKILL = "{0} 释放主动技能"
+CONFUSED_SELF_TARGET = "{0} 处于混乱，普通攻击改为自己"
+DAMAGE_DEALT = "{0} 对 {1} 造成 {2:.1f} 点伤害，{1} 当前 HP {3:.1f}"
+HEALED = "{0} 回复 {1:.1f} 点生命"
+SLOW_REMAINING = "{0} 的减速效果剩余 {1:.1f} 回合"
+STUN_REMAINING = "{0} 被控制，剩余 {1:.1f} 回合无法行动"
+DAMAGE_REDUCTION_ENDED = "{0} 的减伤效果结束"
+CONFUSION_REMAINING = "{0} 仍处于混乱，剩余 {1:.1f} 回合"
+CONFUSION_ENDED = "{0} 恢复了清醒"
+CONFUSION_APPLIED = "{0} 陷入混乱 {1:.1f} 回合"
+STUN_APPLIED = "{0} 被控制 {1:.1f} 回合"
+SLOW_APPLIED = "{0} 被减速 {1:.1f} 回合"
+DAMAGE_REDUCTION_APPLIED = "{0} 获得减伤 {1:.1f}，持续 {2:.1f} 回合"
+PASSIVE_DISABLED = "{0} 的被动被封锁 {1:.1f} 回合"
+PASSIVE_DISABLED_REMAINING = "{0} 的被动被封锁，剩余 {1:.1f} 回合"
+DEFEATED = "{0} 无法继续行动，已经倒下"
+
+# 角色技能
+ATTACK_CYCLE = "{0} 进入第 {1} 次攻击流程"
+SPECIAL_ATTACK = "{0} 触发特殊攻击"
+LOW_HP_SELF_HEAL = "{0} 低血激发自愈"
+
+BRONYA_COMBO_START = "{0} 触发主动额外打击"
+BRONYA_COMBO_HIT = "{0} 额外打击第 {1} 次"
+BRONYA_COMBO_TOTAL = "{0} 额外打击总伤害 {1:.1f}"
+BRONYA_IGNORE_DEFENSE = "{0} 的被动触发，忽视防御与减伤"
+BRONYA_TEST_ACTIVE = "{0} [测试] 主动必中混乱"
+BRONYA_TEST_PASSIVE = "{0} [测试] 被动必定触发"
+
+KIANA_SHOT = "极限射击造成 {0:.1f} 点伤害，{1} 当前 HP {2:.1f}"
+KIANA_PURE_FOLLOW_UP = "追击追加真伤 {0:.1f} 点，{1} 当前 HP {2:.1f}"
+
+LISUSHANG_ACTIVE = "{0} 释放凌厉剑舞"
+LISUSHANG_ACTIVE_RESULT = "{0} 主动技造成 {1:.1f} 点伤害并施加 {2} 层流血，{3} 当前 HP {4:.1f}"
+LISUSHANG_NORMAL_SKIPPED = "{0} 主动技能覆盖本回合普通攻击"
+LISUSHANG_PASSIVE_BLEED = "{0} 被动触发，额外附加流血"
+BLEED_APPLIED = "{0} 流血层数 {1:.0f}，持续 {2:.0f} 回合"
+BLEED_TICK = "{0} 因流血承受 {1:.1f} 点伤害，当前 HP {2:.1f}"
+BLEED_ENDED = "{0} 的流血效果结束"
+
+CHENXUE_FROST_BLADE = "{0} 将失血化为霜刃，额外造成 {1:.1f} 点伤害，{2} 当前 HP {3:.1f}"
+
+THERESA_BURST_SUCCESS = "{0} 集中火力爆发成功"
+THERESA_BURST_MISSED = "{0} 攻击落空，仅造成象征性伤害"
+THERESA_RECOVER = "{0} 借机恢复气息"
+THERESA_NEGATIVE_STATE_HEAL = "{0} 因 {1} 被动触发恢复"
+
+DREAMSEEKER_DREAM_STRIKE = "{0} 将信念化作梦境冲击，强行突破防御"
+DREAMSEEKER_PASSIVE_MISSED = "{0} 被动未触发，攻击力保持 {1:.1f}"
+DREAMSEEKER_LOW_HP_PASSIVE = "{0} 低血被动触发，攻击力临时提升至 {1:.1f}"
+DREAMSEEKER_PASSIVE = "{0} 被动触发，攻击力临时提升至 {1:.1f}"
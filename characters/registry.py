@@ -0,0 +1,225 @@
+"""角色注册表：按需导入的角色类及其静态元数据。
+
+角色来自三处，按以下顺序查找，先找到者为准：
+
+1. CHARACTER_MODULES 中列出的模块；
+2. 已安装发行包在 ``bh3_duel_sim.characters`` 组下声明的入口点，值为 ``模块:类名``
+   （登记单个类，入口点名即注册名）或 ``模块``（登记其中所有角色类）；
+3. characters.specs 搜索路径中的 TOML 规格，注册名为 ``specs.<文件名>``。
+
+列出角色与读取元数据（名字、基础属性）只解析模块源码或规格文件，不导入模块、不构造
+角色；load 时才导入该类所在的模块。进程池按类的限定名 pickle factory，工作进程因此只会
+导入对局实际用到的模块。
+"""
+
+from __future__ import annotations
+
+import ast
+import importlib
+import importlib.util
+import os
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterator, List, Tuple, Type
+
+from .base import Character, Stats
+
+ENTRY_POINT_GROUP = "bh3_duel_sim.characters"
+CHARACTER_MODULES: List[str] = ["characters.sample"]
+
+CLASS = "class"
+SPEC = "spec"
+
+
+@dataclass(frozen=True)
+class CharacterInfo:
+    """注册表中的一个角色。
+
+    name 为角色显示名，stats 为构造时传给 Stats 的基础属性（__init__ 中的后续调整，
+    如晨雪的生存强化，不计在内）；无法静态读取时为 None，可改用 load 后的类。
+    """
+
+    key: str
+    kind: str
+    target: str
+    name: str | None
+    stats: Stats | None
+
+    def load(self) -> Type[Character]:
+        if self.kind == SPEC:
+            from . import specs
+
+            return specs.load(self.target)
+        module_name, _, qualname = self.target.partition(":")
+        target = importlib.import_module(module_name)
+        for part in qualname.split("."):
+            target = getattr(target, part)
+        return target
+
+
+class CharacterRegistry:
+    """注册名到 CharacterInfo 的映射；各来源在第一次需要时才扫描。"""
+
+    def __init__(self, modules: List[str] | None = None, *, entry_points: bool = True, specs: bool = True) -> None:
+        self._entries: Dict[str, CharacterInfo] = {}
+        self._sources: List[Callable[[], None]] = [
+            lambda: self._scan_modules(CHARACTER_MODULES if modules is None else modules)
+        ]
+        if entry_points:
+            self._sources.append(self._scan_entry_points)
+        if specs:
+            self._sources.append(self._scan_specs)
+        self._scanned = 0
+
+    def register(self, info: CharacterInfo) -> None:
+        existing = self._entries.get(info.key)
+        if existing is not None and existing.target != info.target:
+            raise ValueError(f"角色注册名 {info.key} 冲突：{existing.target} 与 {info.target}")
+        self._entries[info.key] = info
+
+    def register_module(self, module_name: str) -> List[str]:
+        """登记模块中的所有角色类，返回新登记的注册名。"""
+        keys = []
+        for info in scan_module(module_name):
+            self.register(info)
+            keys.append(info.key)
+        return keys
+
+    def get(self, key: str) -> CharacterInfo:
+        info = self._entries.get(key)
+        while info is None and self._scan_next():
+            info = self._entries.get(key)
+        if info is None:
+            raise KeyError(f"未注册的角色 {key}，可选：{', '.join(self.keys())}")
+        return info
+
+    def load(self, key: str) -> Type[Character]:
+        return self.get(key).load()
+
+    def __contains__(self, key: str) -> bool:
+        try:
+            self.get(key)
+        except KeyError:
+            return False
+        return True
+
+    def entries(self, kind: str | None = None) -> List[CharacterInfo]:
+        while self._scan_next():
+            pass
+        return [info for info in self._entries.values() if kind is None or info.kind == kind]
+
+    def keys(self, kind: str | None = None) -> List[str]:
+        return [info.key for info in self.entries(kind)]
+
+    def __iter__(self) -> Iterator[CharacterInfo]:
+        return iter(self.entries())
+
+    def _scan_next(self) -> bool:
+        if self._scanned >= len(self._sources):
+            return False
+        source = self._sources[self._scanned]
+        self._scanned += 1
+        source()
+        return True
+
+    def _scan_modules(self, modules: List[str]) -> None:
+        for module_name in modules:
+            self.register_module(module_name)
+
+    def _scan_entry_points(self) -> None:
+        from importlib.metadata import entry_points
+
+        for point in entry_points(group=ENTRY_POINT_GROUP):
+            module_name, _, qualname = point.value.partition(":")
+            module_name = module_name.strip()
+            if not qualname:
+                self.register_module(module_name)
+                continue
+            qualname = qualname.strip()
+            scanned = {info.target: info for info in scan_module(module_name)}
+            found = scanned.get(f"{module_name}:{qualname}")
+            name, stats = (found.name, found.stats) if found is not None else (None, None)
+            self.register(CharacterInfo(point.name, CLASS, f"{module_name}:{qualname}", name, stats))
+
+    def _scan_specs(self) -> None:
+        from . import specs
+        from .declarative import STAT_FIELDS, load_spec_file
+
+        for stem in specs.available():
+            path = specs.find(stem)
+            if path is None:
+                continue
+            try:
+                spec = load_spec_file(path)
+            except (OSError, ValueError):
+                continue
+            stats = spec.get("stats", {})
+            base = None
+            if all(key in stats for key in STAT_FIELDS):
+                base = Stats(*(float(stats[key]) for key in STAT_FIELDS))
+            self.register(CharacterInfo(f"specs.{stem}", SPEC, stem, spec.get("name"), base))
+
+
+def scan_module(module_name: str) -> List[CharacterInfo]:
+    """解析模块源码，找出其中（直接或间接）继承 Character 的类，不导入该模块。
+
+    name 取类体中的字符串常量赋值，stats 取 __init__ 中 Stats(...) 调用的常量参数，
+    子类未声明时沿用同一模块内父类的值。源码不可用时退化为导入模块后读取。
+    """
+    spec = importlib.util.find_spec(module_name)
+    origin = spec.origin if spec is not None else None
+    if origin is None or not origin.endswith(".py") or not os.path.isfile(origin):
+        return _inspect_module(module_name)
+    with open(origin, encoding="utf-8") as handle:
+        tree = ast.parse(handle.read(), origin)
+
+    known: Dict[str, Tuple[str | None, Stats | None]] = {"Character": (None, None)}
+    infos: List[CharacterInfo] = []
+    for node in tree.body:
+        if not isinstance(node, ast.ClassDef):
+            continue
+        parents = [base.id for base in node.bases if isinstance(base, ast.Name) and base.id in known]
+        if not parents:
+            continue
+        name, stats = known[parents[0]]
+        for item in node.body:
+            if isinstance(item, ast.Assign) and _assigns(item, "name") and isinstance(item.value, ast.Constant):
+                name = item.value.value if isinstance(item.value.value, str) else name
+            elif isinstance(item, ast.AnnAssign) and isinstance(item.target, ast.Name) and item.target.id == "name":
+                if isinstance(item.value, ast.Constant) and isinstance(item.value.value, str):
+                    name = item.value.value
+            elif isinstance(item, ast.FunctionDef) and item.name == "__init__":
+                stats = _stats_call(item, stats)
+        known[node.name] = (name, stats)
+        infos.append(CharacterInfo(node.name, CLASS, f"{module_name}:{node.name}", name, stats))
+    return infos
+
+
+def _assigns(node: ast.Assign, attribute: str) -> bool:
+    return any(isinstance(target, ast.Name) and target.id == attribute for target in node.targets)
+
+
+def _stats_call(function: ast.FunctionDef, inherited: Stats | None) -> Stats | None:
+    """__init__ 中没有 Stats(...) 调用时沿用父类的基础属性，参数不是常量时为 None。"""
+    for node in ast.walk(function):
+        if not (isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id == "Stats"):
+            continue
+        try:
+            values = [float(ast.literal_eval(arg)) for arg in node.args]
+            keywords = {item.arg: float(ast.literal_eval(item.value)) for item in node.keywords}
+            return Stats(*values, **keywords)
+        except (ValueError, TypeError):
+            return None
+    return inherited
+
+
+def _inspect_module(module_name: str) -> List[CharacterInfo]:
+    """导入模块后读取类属性（无源码的模块）；stats 需构造角色才能得到，记为 None。"""
+    module = importlib.import_module(module_name)
+    return [
+        CharacterInfo(value.__name__, CLASS, f"{module_name}:{value.__qualname__}", getattr(value, "name", None), None)
+        for value in vars(module).values()
+        if isinstance(value, type) and issubclass(value, Character) and value.__module__ == module_name
+    ]
+
+
+REGISTRY = CharacterRegistry()
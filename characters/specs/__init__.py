@@ -0,0 +1,113 @@
+"""按需从 TOML 规格文件编译的角色。
+
+访问 ``characters.specs.<名字>`` 时才在搜索路径中查找 ``<名字>.toml`` 并编译为角色类，
+结果缓存在本模块中。搜索路径为本目录，再加上环境变量 BH3_CHARACTER_SPECS 中以
+os.pathsep 分隔的目录；进程池的工作进程继承该变量，按同一名字重新加载，因此编译出的
+类可以随 factory 一起 pickle。
+
+规格格式（字段均可省略，除非注明）::
+
+    name = "角色名"                      # 必填
+    [stats]                              # 必填 max_hp、attack、defense、speed；hp 为开局 HP，默认等于 max_hp
+    [[procs]]                            # 每次 attack 步骤的每一段之前判定
+    chance、label、log、ignore_defense、ignore_reduction
+    [active]                             # 每 every 次攻击流程释放一次
+    every、steps、replaces_normal（释放后跳过本回合普通攻击）、skip_log
+    [normal]                             # 默认为一次普通攻击
+    steps
+    [passive]                            # 每回合 HP 低于 max_hp × below 时回复 heal
+    below、heal、log
+
+steps 中的步骤按 type 区分：
+
+- ``log``：log
+- ``attack``：base_damage 或 multiplier/flat_bonus、ignore_defense、ignore_reduction、hits、hit_log、log
+- ``damage``：amount、lost_hp、target_hp、minus_defense、min、pure、ignore_reduction、log
+- ``heal``：amount、log
+- ``effect``：effect（confusion、stun、slow、damage_reduction、passive_disable、bleed）、turns、
+  value（数值或 [最小, 最大] 随机整数）、chance、label、target（target 或 self）、log
+
+日志模板可使用 {self}、{target}、{hp}、{self_hp}、{dealt}、{total}、{value}、{index} 占位符，
+格式说明与 str.format 相同，如 {dealt:.1f}。
+"""
+
+from __future__ import annotations
+
+import os
+from typing import Dict, List, Type
+
+from ..declarative import SpecCharacter, compile_spec, load_spec_file
+
+SPEC_PATH_ENV = "BH3_CHARACTER_SPECS"
+SPEC_SUFFIX = ".toml"
+
+_sources: Dict[str, str] = {}
+
+
+def search_path() -> List[str]:
+    extra = os.environ.get(SPEC_PATH_ENV, "")
+    return [os.path.dirname(os.path.abspath(__file__)), *(path for path in extra.split(os.pathsep) if path)]
+
+
+def add_path(path: str) -> None:
+    """把目录加入搜索路径（写入环境变量，之后创建的工作进程同样可见）。"""
+    path = os.path.abspath(path)
+    if path in search_path():
+        return
+    extra = os.environ.get(SPEC_PATH_ENV, "")
+    os.environ[SPEC_PATH_ENV] = os.pathsep.join(item for item in (extra, path) if item)
+
+
+def available() -> List[str]:
+    """搜索路径中所有规格的名字（不编译）；同名时以靠前的目录为准。"""
+    names: List[str] = []
+    for directory in search_path():
+        if not os.path.isdir(directory):
+            continue
+        for entry in sorted(os.listdir(directory)):
+            stem, suffix = os.path.splitext(entry)
+            if suffix == SPEC_SUFFIX and stem.isidentifier() and stem not in names:
+                names.append(stem)
+    return names
+
+
+def find(name: str) -> str | None:
+    for directory in search_path():
+        path = os.path.join(directory, name + SPEC_SUFFIX)
+        if os.path.isfile(path):
+            return path
+    return None
+
+
+def load(name_or_path: str) -> Type[SpecCharacter]:
+    """按名字或文件路径加载角色类；传入路径时其所在目录会加入搜索路径。"""
+    if name_or_path.endswith(SPEC_SUFFIX):
+        path = os.path.abspath(name_or_path)
+        name = os.path.splitext(os.path.basename(path))[0]
+        if not name.isidentifier():
+            raise ValueError(f"规格文件名 {name!r} 不是合法的标识符")
+        add_path(os.path.dirname(path))
+        found = find(name)
+        if found is not None and os.path.abspath(found) != path:
+            raise ValueError(f"规格 {name} 已由 {found} 定义")
+        return _compile(name, path)
+    return __getattr__(name_or_path)
+
+
+def _compile(name: str, path: str) -> Type[SpecCharacter]:
+    cls = globals().get(name)
+    if cls is not None and _sources.get(name) == path:
+        return cls
+    cls = compile_spec(load_spec_file(path), class_name=name, module=__name__)
+    globals()[name] = cls
+    _sources[name] = path
+    return cls
+
+
+def __getattr__(name: str) -> Type[SpecCharacter]:
+    if name.startswith("_"):
+        raise AttributeError(name)
+    path = find(name)
+    if path is None:
+        raise AttributeError(f"找不到角色规格 {name}{SPEC_SUFFIX}（搜索路径：{os.pathsep.join(search_path())}）")
+    return _compile(name, path)